@@ -0,0 +1,429 @@
+"""
+DF95 AIWorker – Benchmark-Suite: Engines mit synthetischen Jobs
+==============================================================
+
+Erzeugt einen synthetischen Job (DF95_AIWorker_UCS_V1) mit N Dateien
+(realistische Fieldrec-/Drum-Namen, kurze Rausch-WAVs) und misst jedes
+Szenario in einem frischen Python-Prozess:
+
+    drumrole        df95_aiworker_drumrole_engine.process_job   (worker_mode drum_role)
+    drumrole_dsp    dito mit backend "dsp" (NumPy-Features, batchweise)
+    ucs_generic     df95_aiworker_ucsv1_example.process_job     (worker_mode generic)
+    ucs_drone       df95_aiworker_ucsv1_example.process_job     (worker_mode drone)
+    ucs_material    df95_aiworker_ucsv1_example.process_job     (worker_mode material)
+    material_file   df95_aiworker_material_model.predict_for_file
+    material_batch  df95_aiworker_material_model.predict_for_files (DEFAULT_BATCH_SIZE)
+    material_numpy  dito mit RUNTIME "numpy" (exportiertes .npz, torch wird nicht importiert)
+    material_ts     dito mit RUNTIME "torchscript" (exportiertes .ts.pt: fusioniert, channels_last, int8-Head)
+
+Pro Szenario:
+    files_per_sec         Dateien / Sekunde (nur Verarbeitung)
+    p50_ms / p95_ms       Latenz pro Datei (Batch-Szenarien: Batch-Zeit / Batch-Größe)
+    first_file_ms         Latenz der ersten Einheit (Lazy-Loads)
+    peak_rss_mb           maximaler RSS des Kind-Prozesses
+    import_s              Import der Worker-Module (Start-Kosten des Modus)
+    torch                 torch bis zum Ende des Laufs geladen? (Heuristik-/Dummy-Modi: nein)
+    cold_start_s / _share Interpreter-Start/-Ende + Imports + Warmup, Anteil an der Wandzeit
+
+Result-Cache und Feature Store sind aus, damit jede Messung die volle Arbeit
+enthält. Ist torch/torchaudio installiert, wird ein zufällig initialisierter,
+fest geseedeter Checkpoint im Temp-Ordner benutzt (wie bench_material_batch.py),
+daneben sein .npz- und TorchScript-Export für material_numpy/material_ts; der
+echte Checkpoint unter checkpoints/ wird nicht angefasst. material_file und
+material_batch rechnen immer das Eager-Modell (RUNTIME "torch"), ucs_material
+wie der Worker mit RUNTIME "auto" (also mit dem TorchScript-Artefakt).
+material_batch vs. material_ts / material_numpy zeigt Latenz, RSS und
+Kaltstart der Runtimes auf demselben Modell.
+
+Ergebnisse landen als JSON (Commit, Umgebung, Parameter, Szenarien) in
+bench/results/bench_aiworker_<commit>.json und lassen sich über Commits
+vergleichen:
+
+    python bench/bench_aiworker.py --compare bench/results/bench_aiworker_<alt>.json
+
+Regressionen (files/sec schlechter bzw. p95 oder Kaltstart höher als
+--threshold) werden markiert, der Exit-Code ist dann 1.
+
+Usage:
+    python bench/bench_aiworker.py [--files N] [--seconds S] [--repeat R] [--seed N]
+                                   [--scenarios drumrole,ucs_material,...] [--out PATH]
+                                   [--compare BASE.json] [--threshold 0.10]
+"""
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from importlib import metadata, util
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+AIWORKER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, AIWORKER_DIR)
+
+from bench_name_classifier import make_names  # noqa: E402
+
+RESULT_VERSION = "DF95_AIWorker_Bench_V1"
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+SCENARIOS = ("drumrole", "drumrole_dsp", "ucs_generic", "ucs_drone", "ucs_material", "material_file",
+             "material_batch", "material_numpy", "material_ts")
+UCS_MODES = {"ucs_generic": "generic", "ucs_drone": "drone", "ucs_material": "material"}
+COLD_START_SLACK_S = 0.05
+
+# Fieldrec-Session-Ordner, auf die die Dateien verteilt werden
+SESSION_DIRS = ["ZOOM_F6_Take01", "ZOOM_F6_Take02", "Drums_Close", "Foley_Kitchen", "Street_Amb"]
+
+
+# ------------------------------------------------------------
+# Synthetischer Job
+# ------------------------------------------------------------
+
+def make_job(root: str, num_files: int, seconds: float, seed: int) -> str:
+    """Schreibt N WAVs + Job-JSON unter root und gibt den Job-Pfad zurück."""
+    from bench_material_batch import write_noise_wav
+
+    audio_root = os.path.join(root, "Audio")
+    files = []
+    for i, name in enumerate(make_names(num_files, seed=seed)):
+        stem, ext = os.path.splitext(name)
+        rel = f"{SESSION_DIRS[i % len(SESSION_DIRS)]}/{stem}_{i:05d}{ext}"
+        full = os.path.join(audio_root, rel)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        write_noise_wav(full, seconds=seconds, seed=seed + i)
+        files.append({"rel_path": rel, "full_path": full})
+
+    job = {
+        "version": "DF95_AIWorker_UCS_V1",
+        "job_id": f"bench_{num_files}_{seed}",
+        "audio_root": audio_root,
+        "worker_mode": "generic",
+        "requested_tasks": [],
+        "files": files,
+    }
+    jobs_dir = os.path.join(root, "Jobs")
+    os.makedirs(jobs_dir, exist_ok=True)
+    job_path = os.path.join(jobs_dir, "DF95_AIWorker_Bench_Job.json")
+    with open(job_path, "w", encoding="utf-8") as f:
+        json.dump(job, f, indent=2)
+    return job_path
+
+
+def have_torch() -> bool:
+    return util.find_spec("torch") is not None and util.find_spec("torchaudio") is not None
+
+
+# ------------------------------------------------------------
+# Kind-Prozess (ein Szenario)
+# ------------------------------------------------------------
+
+def peak_rss_mb() -> Optional[float]:
+    # Linux: VmHWM gilt ab exec() – ru_maxrss erbt den Höchststand des Eltern-Prozesses
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KiB, macOS: Bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_child(scenario: str, job_path: str, ckpt_path: str, out_path: str) -> None:
+    t_start = time.perf_counter()
+    with open(job_path, "r", encoding="utf-8") as f:
+        job = json.load(f)
+    files = job["files"]
+    models: Counter = Counter()
+
+    if scenario in ("drumrole", "drumrole_dsp"):
+        import df95_aiworker_drumrole_engine as drumrole
+        t_import = time.perf_counter()
+        cfg = drumrole.load_config(os.path.join(AIWORKER_DIR, "df95_aiworker_drumrole_config.json"))
+        chunk = 1
+        if scenario == "drumrole_dsp":
+            cfg["backend"] = "dsp"
+            chunk = drumrole.dsp_batch_size(cfg)
+        drumrole.warmup(cfg)
+
+        def unit(entries):
+            payload = drumrole.process_job({**job, "worker_mode": "drum_role", "files": entries}, cfg)
+            models[payload.get("backend", "")] += len(payload["results"])
+    else:
+        import df95_aiworker_material_model as mm
+        if scenario in UCS_MODES:
+            import df95_aiworker_ucsv1_example as ucs_worker
+        t_import = time.perf_counter()
+        mm.USE_FEATURE_STORE = False
+        if ckpt_path:
+            mm._DEFAULT_CKPT_PATH = ckpt_path
+            mm._DEFAULT_NPZ_PATH = os.path.splitext(ckpt_path)[0] + ".npz"
+            mm._DEFAULT_TS_PATH = os.path.splitext(ckpt_path)[0] + ".ts.pt"
+        if scenario in ("material_file", "material_batch", "material_numpy", "material_ts"):
+            mm.RUNTIME = {"material_numpy": "numpy", "material_ts": "torchscript"}.get(scenario, "torch")
+        if scenario not in ("ucs_generic", "ucs_drone"):
+            # generic/drone berühren kein Modell – Warmup würde torch nur künstlich laden
+            mm.warmup()
+        chunk = mm.DEFAULT_BATCH_SIZE if scenario in ("ucs_material", "material_batch", "material_numpy",
+                                                      "material_ts") else 1
+
+        if scenario in UCS_MODES:
+            mode_job = {**job, "worker_mode": UCS_MODES[scenario]}
+
+            def unit(entries):
+                out = ucs_worker.process_job({**mode_job, "files": entries}, job_path)
+                models.update(r.get("ai_model", "") for r in out["results"])
+        elif scenario == "material_file":
+            def unit(entries):
+                models[mm.predict_for_file(entries[0]["full_path"])["ai_model"]] += 1
+        else:
+            def unit(entries):
+                preds = mm.predict_for_files([e["full_path"] for e in entries], batch_size=len(entries))
+                models.update(p["ai_model"] for p in preds)
+    t_ready = time.perf_counter()
+
+    latencies: List[float] = []
+    for start in range(0, len(files), chunk):
+        entries = files[start:start + chunk]
+        t0 = time.perf_counter()
+        unit(entries)
+        dt = time.perf_counter() - t0
+        latencies.extend([dt / len(entries)] * len(entries))
+    t_end = time.perf_counter()
+
+    out = {
+        "import_s": t_import - t_start,
+        "warmup_s": t_ready - t_import,
+        "run_s": t_end - t_ready,
+        "child_s": t_end - t_start,
+        "chunk": chunk,
+        "latencies_s": latencies,
+        "first_unit_s": latencies[0] * min(chunk, len(files)) if latencies else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "torch_loaded": "torch" in sys.modules,
+        "models": dict(models),
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(out, f)
+
+
+# ------------------------------------------------------------
+# Messung / Auswertung
+# ------------------------------------------------------------
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    """Nearest-rank-Perzentil (q in 0..100) einer sortierten Liste."""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(q / 100.0 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+
+def measure(scenario: str, job_path: str, ckpt_path: str, tmp: str) -> Dict[str, Any]:
+    """Ein Szenario in einem frischen Interpreter ausführen und auswerten."""
+    out_path = os.path.join(tmp, f"child_{scenario}.json")
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", scenario, job_path, ckpt_path or "", out_path]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=AIWORKER_DIR, capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0 or not os.path.isfile(out_path):
+        tail = "\n".join((proc.stderr or proc.stdout or "").strip().splitlines()[-10:])
+        raise RuntimeError(f"Szenario {scenario} fehlgeschlagen (rc={proc.returncode}):\n{tail}")
+    with open(out_path, "r", encoding="utf-8") as f:
+        child = json.load(f)
+    os.remove(out_path)
+
+    lat = sorted(child["latencies_s"])
+    n = len(lat)
+    # Interpreter-Start/-Ende + Prozess-Overhead = Wandzeit minus gemessene Zeit im Kind
+    interpreter = max(0.0, wall - child["child_s"])
+    cold = interpreter + child["import_s"] + child["warmup_s"]
+    return {
+        "files": n,
+        "chunk": child["chunk"],
+        "files_per_sec": n / child["run_s"] if child["run_s"] > 0 else 0.0,
+        "p50_ms": percentile(lat, 50) * 1000.0,
+        "p95_ms": percentile(lat, 95) * 1000.0,
+        "first_file_ms": child["first_unit_s"] * 1000.0,
+        "peak_rss_mb": child["peak_rss_mb"],
+        "interpreter_s": interpreter,
+        "import_s": child["import_s"],
+        "warmup_s": child["warmup_s"],
+        "run_s": child["run_s"],
+        "wall_s": wall,
+        "cold_start_s": cold,
+        "cold_start_share": cold / wall if wall > 0 else 0.0,
+        "torch_loaded": child.get("torch_loaded", False),
+        "models": child["models"],
+    }
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def git_info() -> Dict[str, Any]:
+    def git(*args) -> str:
+        try:
+            return subprocess.run(["git", *args], cwd=AIWORKER_DIR, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(git("status", "--porcelain", "--", ".")),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": _package_version("numpy"),
+        "torch": _package_version("torch"),
+        "torchaudio": _package_version("torchaudio"),
+    }
+
+
+# ------------------------------------------------------------
+# Vergleich
+# ------------------------------------------------------------
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[str]:
+    """Druckt die Deltas je Szenario, gibt die Liste der Regressionen zurück."""
+    regressions: List[str] = []
+    base_commit = base.get("git", {}).get("commit") or "?"
+    print(f"Vergleich mit {base_commit} (Schwelle {threshold:.0%}):")
+    for name, cur in new["scenarios"].items():
+        old = base.get("scenarios", {}).get(name)
+        if not old:
+            print(f"  {name:15s} (neu)")
+            continue
+        fps_ratio = cur["files_per_sec"] / old["files_per_sec"] if old["files_per_sec"] else 1.0
+        p95_ratio = cur["p95_ms"] / old["p95_ms"] if old["p95_ms"] else 1.0
+        cold_ratio = cur["cold_start_s"] / old["cold_start_s"] if old.get("cold_start_s") else 1.0
+        flags = []
+        if fps_ratio < 1.0 - threshold:
+            flags.append("files/s")
+        if p95_ratio > 1.0 + threshold:
+            flags.append("p95")
+        # Kaltstart: zusätzlich mind. COLD_START_SLACK_S absolut (Rauschen beim Prozessstart)
+        if cold_ratio > 1.0 + threshold and cur["cold_start_s"] - old["cold_start_s"] > COLD_START_SLACK_S:
+            flags.append("Kaltstart")
+        if flags:
+            regressions.append(name)
+        mark = "  REGRESSION: " + ", ".join(flags) if flags else ""
+        print(f"  {name:15s} files/s {fps_ratio:6.2f}x   p95 {p95_ratio:6.2f}x   Kaltstart {cold_ratio:6.2f}x{mark}")
+    return regressions
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+
+def _parse_args(argv: List[str]) -> Dict[str, Any]:
+    opts: Dict[str, Any] = {
+        "files": 200, "seconds": 0.5, "repeat": 1, "seed": 95,
+        "scenarios": list(SCENARIOS), "out": "", "compare": "", "threshold": 0.10,
+    }
+    it = iter(argv)
+    for a in it:
+        if a in ("--files", "--repeat", "--seed"):
+            opts[a[2:]] = int(next(it))
+        elif a in ("--seconds", "--threshold"):
+            opts[a[2:]] = float(next(it))
+        elif a in ("--out", "--compare"):
+            opts[a[2:]] = next(it)
+        elif a == "--scenarios":
+            opts["scenarios"] = [s.strip() for s in next(it).split(",") if s.strip()]
+        else:
+            raise SystemExit(f"Unbekanntes Argument: {a}\n{__doc__}")
+    unknown = [s for s in opts["scenarios"] if s not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unbekannte Szenarien: {', '.join(unknown)} (verfügbar: {', '.join(SCENARIOS)})")
+    return opts
+
+
+def main(argv: List[str]) -> int:
+    if argv[1:2] == ["--child"]:
+        run_child(*argv[2:6])
+        return 0
+    if argv[1:2] == ["--make-ckpt"]:
+        from bench_material_batch import make_checkpoint
+        from df95_aiworker_material_numpy import export_npz
+        from df95_aiworker_material_torchscript import export_torchscript, ts_path_for
+        make_checkpoint(argv[2])
+        export_npz(argv[2], os.path.splitext(argv[2])[0] + ".npz")
+        export_torchscript(argv[2], ts_path_for(argv[2]))
+        return 0
+
+    opts = _parse_args(argv[1:])
+    result: Dict[str, Any] = {
+        "version": RESULT_VERSION,
+        "created_utc": datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+        "git": git_info(),
+        "env": environment(),
+        "params": {k: opts[k] for k in ("files", "seconds", "repeat", "seed")},
+        "scenarios": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="df95_bench_aiworker_") as tmp:
+        t0 = time.perf_counter()
+        job_path = make_job(tmp, opts["files"], opts["seconds"], opts["seed"])
+        ckpt_path = ""
+        if have_torch() and any(s not in ("drumrole", "drumrole_dsp", "ucs_generic", "ucs_drone") for s in opts["scenarios"]):
+            # Eigener Prozess: torch bleibt aus dem Eltern-Prozess (und dessen RSS) heraus
+            ckpt_path = os.path.join(tmp, "material_ckpt.pt")
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--make-ckpt", ckpt_path],
+                           cwd=AIWORKER_DIR, check=True, capture_output=True)
+        print(f"Job: {opts['files']} Dateien à {opts['seconds']:.2f} s erzeugt in {time.perf_counter() - t0:.1f} s"
+              f"  (Checkpoint: {'zufällig, seed 95' if ckpt_path else 'keiner – Heuristik'})")
+
+        print(f"{'Szenario':15s} {'files/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} {'RSS MB':>7s} "
+              f"{'Import ms':>9s} {'torch':>5s} {'Kaltstart':>10s}")
+        for name in opts["scenarios"]:
+            runs = [measure(name, job_path, ckpt_path, tmp) for _ in range(max(1, opts["repeat"]))]
+            # Median-Lauf nach Durchsatz
+            runs.sort(key=lambda r: r["files_per_sec"])
+            res = runs[len(runs) // 2]
+            result["scenarios"][name] = res
+            rss = f"{res['peak_rss_mb']:7.0f}" if res["peak_rss_mb"] is not None else "      -"
+            print(f"{name:15s} {res['files_per_sec']:9.1f} {res['p50_ms']:8.2f} {res['p95_ms']:8.2f} {rss} "
+                  f"{res['import_s'] * 1000.0:9.1f} {'ja' if res['torch_loaded'] else 'nein':>5s} "
+                  f"{res['cold_start_s']:5.2f} s {res['cold_start_share']:4.0%}")
+
+    out_path = opts["out"] or os.path.join(
+        DEFAULT_RESULTS_DIR, f"bench_aiworker_{result['git']['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    print(f"Ergebnis: {out_path}")
+
+    if opts["compare"]:
+        with open(opts["compare"], "r", encoding="utf-8") as f:
+            base = json.load(f)
+        if base.get("params") != result["params"]:
+            print(f"WARN: andere Parameter als die Basis ({base.get('params')}) – Werte nur bedingt vergleichbar")
+        if compare(base, result, opts["threshold"]):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,129 @@
+"""
+DF95 AIWorker – Micro-Benchmark: Material-Modell, Batch-Inferenz
+================================================================
+
+Misst Dateien/Sekunde auf CPU für
+
+    - predict_for_file()  pro Datei (bisheriger Weg)
+    - predict_for_files() mit batch_size 1 / 16 / 64
+    - predict_for_files() bs=16 mit Feature Store (kalt / warm)
+
+Dazu werden synthetische WAVs (Rauschen, 1 s, 44.1 kHz) und ein zufällig
+initialisierter SimpleConvNetV2-Checkpoint in einem Temp-Ordner erzeugt; der
+echte Checkpoint unter checkpoints/ wird nicht angefasst. Zusätzlich wird
+geprüft, dass beide Wege dieselben Ergebnisse liefern.
+
+Usage:
+    python bench/bench_material_batch.py [num_files]
+"""
+
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import df95_aiworker_material_model as mm  # noqa: E402
+import df95_aiworker_material_train_template as train_template  # noqa: E402
+
+BATCH_SIZES = (1, 16, 64)
+CLASSES = ["DRUM", "GLASS", "METAL", "STONE", "WATER", "WOOD"]
+
+
+def write_noise_wav(path: str, seconds: float = 1.0, sr: int = 44100, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    n = int(seconds * sr)
+    decay = 5.0 / n
+    frames = struct.pack(
+        f"<{n}h",
+        *(int(12000 * math.exp(-i * decay) * (rnd.random() * 2 - 1)) for i in range(n)),
+    )
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(frames)
+
+
+def make_checkpoint(path: str) -> None:
+    from df95_aiworker_material_train_template import ARCH_V2, build_model
+
+    train_template.require_torch()
+    train_template.torch.manual_seed(95)
+    model = build_model(ARCH_V2, len(CLASSES))
+    train_template.torch.save({
+        "model_state": model.state_dict(),
+        "material_classes": CLASSES,
+        "config": {"sample_rate": 44100, "mono": True, "arch": ARCH_V2, "window_frames": 64},
+    }, path)
+
+
+def count_same(out, reference) -> int:
+    return sum(
+        1 for a, b in zip(out, reference)
+        if a["df95_material"] == b["df95_material"]
+        and abs(a["ai_confidence"] - b["ai_confidence"]) < 1e-4
+    )
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main(argv):
+    if not train_template.require_torch():
+        print("torch/torchaudio nicht installiert – Benchmark übersprungen.")
+        return 1
+
+    num_files = int(argv[1]) if len(argv) > 1 else 256
+    train_template.torch.set_num_threads(max(1, os.cpu_count() or 1))
+
+    with tempfile.TemporaryDirectory(prefix="df95_bench_material_") as tmp:
+        paths = []
+        for i in range(num_files):
+            p = os.path.join(tmp, f"hit_{i:05d}.wav")
+            write_noise_wav(p, seed=i)
+            paths.append(p)
+
+        # Hauptmessung ohne Feature Store (Decode + Mel + Modell)
+        mm.USE_FEATURE_STORE = False
+        mm.FEATURE_STORE_DIR = os.path.join(tmp, "features")
+        mm._DEFAULT_CKPT_PATH = os.path.join(tmp, "material_ckpt.pt")
+        make_checkpoint(mm._DEFAULT_CKPT_PATH)
+        if not mm.warmup():
+            print("Modell konnte nicht geladen werden – Benchmark übersprungen.")
+            return 1
+
+        print(f"files={num_files}  torch threads={train_template.torch.get_num_threads()}")
+
+        reference, dt = timed(lambda: [mm.predict_for_file(p) for p in paths])
+        print(f"  predict_for_file      {num_files / dt:9.1f} files/s")
+        if all(r["ai_model"] != "DF95_AIWorker_MaterialModel_v1" for r in reference):
+            print("  WARN: Modell lieferte für keine Datei ein Ergebnis (Audio-Decoder verfügbar?)")
+
+        for bs in BATCH_SIZES:
+            out, dt = timed(lambda: mm.predict_for_files(paths, batch_size=bs))
+            same = count_same(out, reference)
+            print(f"  predict_for_files bs={bs:<3d} {num_files / dt:9.1f} files/s   gleich: {same}/{num_files}")
+
+        mm.USE_FEATURE_STORE = True
+        for label in ("kalt", "warm"):
+            out, dt = timed(lambda: mm.predict_for_files(paths, batch_size=16))
+            same = count_same(out, reference)
+            print(f"  feature store {label:<7s} {num_files / dt:9.1f} files/s   gleich: {same}/{num_files}")
+        if mm._FEATURE_STORE:
+            mm._FEATURE_STORE.close()
+            mm._FEATURE_STORE = None
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
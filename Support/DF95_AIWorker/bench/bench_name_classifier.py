@@ -0,0 +1,152 @@
+"""
+DF95 AIWorker – Micro-Benchmark: Dateinamen-Heuristik
+=====================================================
+
+Vergleicht den kompilierten Single-Pass-Klassifikator
+(df95_aiworker_name_rules.classify_name) mit den früheren, sequentiellen
+`in`-Kaskaden (hier als Referenz eingefroren) und prüft dabei, dass beide
+für jeden Namen dasselbe Ergebnis liefern.
+
+Usage:
+    python bench/bench_name_classifier.py [num_names]
+
+Ausgabe: Sekunden pro 1 Mio. Dateinamen (Role + Material + Instrument).
+"""
+
+import os
+import random
+import sys
+import time
+from typing import Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from df95_aiworker_name_rules import classify_name  # noqa: E402
+
+
+# ------------------------------------------------------------
+# Referenz: bisherige Implementierung (unverändert übernommen)
+# ------------------------------------------------------------
+
+def legacy_drum_role(name: str) -> Tuple[str, float]:
+    s = name.lower()
+    if "kick" in s or " bd" in s or "bassdrum" in s or "_bd_" in s:
+        return "KICK", 0.75
+    if "snare" in s or " sd" in s or "snr" in s:
+        return "SNARE", 0.75
+    if "hihat" in s or "hi-hat" in s or " hat" in s or " hh" in s:
+        return "HIHAT", 0.7
+    if "tom" in s or "tomh" in s or "tomm" in s or "toml" in s or "floor" in s:
+        return "TOM", 0.7
+    if "ride" in s:
+        return "RIDE", 0.65
+    if "crash" in s or "splash" in s or "china" in s:
+        return "CRASH", 0.65
+    if "amb" in s or "room" in s or "atmo" in s or "reverb" in s:
+        return "AMBIENCE", 0.6
+    if "fx" in s or "impact" in s or "hit" in s or "whoosh" in s or "rise" in s:
+        return "FX", 0.6
+    if "perc" in s or "clap" in s or "shaker" in s or "snap" in s:
+        return "PERC", 0.6
+    return "", 0.0
+
+
+def legacy_material(name: str) -> Optional[str]:
+    n = name.lower()
+    if any(k in n for k in ["wood", "holz", "branch", "stick"]):
+        return "WOOD"
+    if any(k in n for k in ["metal", "metall", "iron", "steel", "clang"]):
+        return "METAL"
+    if any(k in n for k in ["glass", "glas", "bottle", "shard"]):
+        return "GLASS"
+    if any(k in n for k in ["water", "rain", "river", "wave"]):
+        return "WATER"
+    if any(k in n for k in ["stone", "rock", "gravel"]):
+        return "STONE"
+    if any(k in n for k in ["drum", "snare", "kick", "tom", "hihat", "hi-hat", "cymbal", "ride", "crash"]):
+        return "DRUM"
+    return None
+
+
+def legacy_instrument(name: str) -> Optional[str]:
+    n = name.lower()
+    if "snare" in n:
+        return "SNARE"
+    if "kick" in n or "bd_" in n or "bassdrum" in n:
+        return "KICK"
+    if "tom" in n:
+        return "TOM"
+    if "hihat" in n or "hi-hat" in n or "hat_" in n:
+        return "HIHAT"
+    if "cymbal" in n or "ride" in n or "crash" in n:
+        return "CYMBAL"
+    if "bell" in n:
+        return "BELL"
+    return None
+
+
+# ------------------------------------------------------------
+# Testdaten
+# ------------------------------------------------------------
+
+_WORDS = [
+    "Kick", "kick", "BD", "bd", "Snare", "snr", "SD", "HiHat", "hi-hat", "hat", "HH", "Tom", "TomH",
+    "floor", "Ride", "Crash", "splash", "China", "Amb", "Room", "atmo", "Reverb", "FX", "Impact",
+    "Hit", "Whoosh", "Rise", "Perc", "Clap", "Shaker", "Snap", "Wood", "Holz", "Metal", "Glass",
+    "Bottle", "Water", "Rain", "Stone", "Rock", "Gravel", "Cymbal", "Bell", "ZOOM0042", "TR1",
+    "Take", "Mix", "Loop", "Field", "Street", "Forest", "Close", "Far", "v2", "Final", "Drum",
+]
+_SEPS = [" ", "_", "-", ""]
+
+
+def make_names(n: int, seed: int = 95):
+    rnd = random.Random(seed)
+    names = []
+    for i in range(n):
+        parts = rnd.sample(_WORDS, rnd.randint(1, 4))
+        sep = rnd.choice(_SEPS)
+        names.append(sep.join(parts) + f"{sep}{i % 100:03d}.wav")
+    return names
+
+
+def _run(fn, names) -> float:
+    t0 = time.perf_counter()
+    for n in names:
+        fn(n)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    names = make_names(num)
+
+    def legacy(n):
+        return legacy_drum_role(n), legacy_material(n), legacy_instrument(n)
+
+    mismatches = 0
+    for n in names:
+        g = classify_name(n)
+        role, conf = legacy_drum_role(n)
+        if (g.drum_role, g.drum_confidence, g.material or None, g.instrument or None) != (
+            role, conf, legacy_material(n), legacy_instrument(n)
+        ):
+            mismatches += 1
+
+    classify_name(names[0])  # Kompilierung nicht mitmessen
+    t_legacy = _run(legacy, names)
+    t_new = _run(classify_name, names)
+
+    scale = 1_000_000 / num
+    print("============================================================")
+    print(" DF95 AIWorker – Filename Classifier Benchmark")
+    print("============================================================")
+    print(f"Names            : {num}")
+    print(f"Mismatches       : {mismatches}")
+    print(f"Legacy (3 scans) : {t_legacy * scale:7.2f} s / 1M names  ({num / t_legacy:,.0f} names/s)")
+    print(f"Compiled (1 pass): {t_new * scale:7.2f} s / 1M names  ({num / t_new:,.0f} names/s)")
+    print(f"Speedup          : {t_legacy / t_new:5.2f}x")
+    print("============================================================")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+DF95 AIWorker – Audio I/O (Header-Probe + memmap-Fenster)
+=========================================================
+
+Gemeinsamer Audio-Zugriff für Material-Modell, Training/Evaluation und das
+Drum-Role-DSP-Backend. Bisher hat `torchaudio.load` jede Datei komplett
+dekodiert, auch wenn nur die ersten Sekunden (Attack) oder nur der Header
+gebraucht wurden – bei langen Field-Recordings der Großteil der Laufzeit.
+
+    probe(path)                        -> AudioInfo | None   (nur Header)
+    read_window(path, start, dur)      -> (float32 [C, N], sr) | None
+    memmap_frames(info)                -> np.memmap [frames, C(, 3)] (Rohdaten, zero-copy)
+
+WAV-Dateien werden nur mit der Standardbibliothek geparst:
+
+    - RIFF/WAVE und RF64 (ds64-Chunk mit 64-bit-Größen)
+    - fmt: PCM 8/16/24/32 bit, IEEE-Float 32/64, WAVE_FORMAT_EXTENSIBLE
+    - BWF: bext-Chunk (Description, Originator, Datum/Uhrzeit, TimeReference)
+    - abgebrochene Aufnahmen: data-Größe 0 oder größer als die Datei ->
+      bis Dateiende (wie Recorder-Recovery-Tools)
+
+Der data-Chunk wird als NumPy-memmap eingeblendet; read_window() kopiert und
+konvertiert nur das angeforderte Fenster nach float32 (Wertebereich wie
+torchaudio.load: PCM / 2^(bits-1)). Alles andere (FLAC, MP3, OGG, ...) geht
+über torchaudio – erst dann wird torchaudio importiert.
+
+Usage (CLI):
+    python df95_aiworker_audio_io.py datei.wav [...]     (Header ausgeben)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# (format_tag, bits) -> NumPy-Dtype der Rohdaten (24 bit: Bytes, siehe _to_float32)
+_RAW_DTYPES = {
+    (WAVE_FORMAT_PCM, 8): "u1",
+    (WAVE_FORMAT_PCM, 16): "<i2",
+    (WAVE_FORMAT_PCM, 24): "u1",
+    (WAVE_FORMAT_PCM, 32): "<i4",
+    (WAVE_FORMAT_IEEE_FLOAT, 32): "<f4",
+    (WAVE_FORMAT_IEEE_FLOAT, 64): "<f8",
+}
+
+# Header-Suche bricht nach so vielen Chunks ab (kaputte Dateien)
+MAX_CHUNKS = 64
+
+
+@dataclass
+class AudioInfo:
+    path: str
+    container: str  # "RIFF" | "RF64" | "" (über torchaudio geprobt)
+    sample_rate: int
+    channels: int
+    num_frames: int
+    format_tag: int = 0
+    bits: int = 0
+    block_align: int = 0
+    data_offset: int = -1
+    data_size: int = 0
+    bext: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.num_frames / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def mappable(self) -> bool:
+        """Daten können per memmap gelesen werden (unkomprimiertes WAV, bekanntes Sample-Format)."""
+        return (self.data_offset >= 0 and (self.format_tag, self.bits) in _RAW_DTYPES
+                and self.block_align == self.channels * self.bits // 8)
+
+
+# ------------------------------------------------------------
+# Header (stdlib)
+# ------------------------------------------------------------
+
+def _parse_bext(body: bytes) -> Dict[str, Any]:
+    def text(raw: bytes) -> str:
+        return raw.split(b"\0", 1)[0].decode("latin-1").strip()
+
+    if len(body) < 346:
+        return {}
+    lo, hi = struct.unpack("<II", body[338:346])
+    return {
+        "description": text(body[0:256]),
+        "originator": text(body[256:288]),
+        "originator_reference": text(body[288:320]),
+        "origination_date": text(body[320:330]),
+        "origination_time": text(body[330:338]),
+        "time_reference": (hi << 32) | lo,  # Samples seit Mitternacht
+    }
+
+
+def _probe_wav(path: str) -> Optional[AudioInfo]:
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(12)
+            if len(head) < 12 or head[:4] not in (b"RIFF", b"RF64") or head[8:12] != b"WAVE":
+                return None
+            container = head[:4].decode("ascii")
+            fmt = None
+            data = None
+            ds64_data_size = None
+            bext: Dict[str, Any] = {}
+            for _ in range(MAX_CHUNKS):
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    break
+                cid, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+                if cid == b"data":
+                    data_size = size
+                    if size == 0xFFFFFFFF and ds64_data_size is not None:
+                        data_size = ds64_data_size
+                    data = (f.tell(), data_size)
+                    if fmt is not None:
+                        break
+                    f.seek(min(data_size, file_size) + (data_size & 1), 1)
+                    continue
+                if cid == b"fmt ":
+                    body = f.read(size)
+                    if len(body) < 16:
+                        return None
+                    fmt = struct.unpack("<HHIIHH", body[:16])
+                    if fmt[0] == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                        # SubFormat-GUID beginnt mit dem eigentlichen Format-Tag
+                        fmt = (struct.unpack("<H", body[24:26])[0],) + fmt[1:]
+                elif cid == b"ds64":
+                    body = f.read(size)
+                    if len(body) >= 16:
+                        ds64_data_size = struct.unpack("<Q", body[8:16])[0]
+                elif cid == b"bext":
+                    bext = _parse_bext(f.read(size))
+                else:
+                    f.seek(size, 1)
+                    if size & 1:
+                        f.seek(1, 1)
+                    continue
+                if size & 1:
+                    f.seek(1, 1)
+                if fmt is not None and data is not None:
+                    break
+    except OSError:
+        return None
+    if fmt is None or data is None:
+        return None
+
+    tag, channels, sr, _byte_rate, block_align, bits = fmt
+    offset, data_size = data
+    if data_size == 0 or offset + data_size > file_size:
+        # Abgebrochene Aufnahme / falsche Größe im Header: bis Dateiende
+        data_size = file_size - offset
+    frames = data_size // block_align if block_align else 0
+    return AudioInfo(
+        path=path, container=container, sample_rate=sr, channels=channels, num_frames=frames,
+        format_tag=tag, bits=bits, block_align=block_align, data_offset=offset,
+        data_size=frames * block_align, bext=bext,
+    )
+
+
+def _torchaudio():
+    try:
+        import torchaudio
+    except ImportError:
+        return None
+    return torchaudio
+
+
+def probe(path: str) -> Optional[AudioInfo]:
+    """Header lesen, ohne Audio zu dekodieren (WAV: stdlib; sonst torchaudio.info)."""
+    info = _probe_wav(path)
+    if info is not None:
+        return info
+    ta = _torchaudio()
+    if ta is None:
+        return None
+    try:
+        meta = ta.info(path)
+    except Exception:
+        return None
+    return AudioInfo(path=path, container="", sample_rate=int(meta.sample_rate),
+                     channels=int(meta.num_channels), num_frames=int(meta.num_frames),
+                     bits=int(getattr(meta, "bits_per_sample", 0) or 0))
+
+
+# ------------------------------------------------------------
+# Daten (memmap / torchaudio)
+# ------------------------------------------------------------
+
+def memmap_frames(info: AudioInfo) -> "np.memmap":
+    """Zero-copy-View auf den data-Chunk: [frames, channels] (24 bit: [frames, channels, 3] Bytes)."""
+    dtype = _RAW_DTYPES[(info.format_tag, info.bits)]
+    shape: Tuple[int, ...] = (info.num_frames, info.channels)
+    if info.bits == 24:
+        shape += (3,)
+    return np.memmap(info.path, dtype=dtype, mode="r", offset=info.data_offset, shape=shape)
+
+
+def _to_float32(raw: "np.ndarray", info: AudioInfo) -> "np.ndarray":
+    """Rohdaten [N, C(, 3)] -> float32 [C, N] (nur das Fenster wird kopiert)."""
+    if info.bits == 24:
+        # 3 Bytes in die oberen Bytes eines int32 -> Vorzeichen stimmt, dann skalieren
+        wide = np.zeros(raw.shape[:2] + (4,), dtype=np.uint8)
+        wide[..., 1:] = raw
+        out = wide.view("<i4")[..., 0].astype(np.float32) / float(1 << 31)
+    elif info.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        out = raw.astype(np.float32)
+    elif info.bits == 8:
+        out = (raw.astype(np.float32) - 128.0) / 128.0
+    else:
+        out = raw.astype(np.float32) / float(1 << (info.bits - 1))
+    return np.ascontiguousarray(out.T)
+
+
+def read_window(path: str, start: float = 0.0, dur: Optional[float] = None, mono: bool = False,
+                info: Optional[AudioInfo] = None) -> Optional[Tuple["np.ndarray", int]]:
+    """Ausschnitt [start, start+dur) in Sekunden als float32 [C, N] (mono: [1, N]) + Samplerate.
+
+    dur=None liest bis Dateiende. None, wenn die Datei nicht gelesen werden kann.
+    """
+    if np is None:
+        return None
+    info = info or probe(path)
+    if info is None:
+        return None
+    first = max(0, int(round(start * info.sample_rate)))
+    count = None if dur is None else max(0, int(round(dur * info.sample_rate)))
+
+    if info.mappable:
+        if info.num_frames == 0:
+            return None
+        try:
+            frames = memmap_frames(info)
+        except (OSError, ValueError):
+            return None
+        last = info.num_frames if count is None else min(info.num_frames, first + count)
+        data = _to_float32(frames[first:last], info)
+        del frames
+    else:
+        data = _read_window_torchaudio(path, first, count)
+        if data is None:
+            return None
+    if data.shape[1] == 0:
+        return None
+    if mono and data.shape[0] > 1:
+        data = data.mean(axis=0, keepdims=True)
+    return data, info.sample_rate
+
+
+def _read_window_torchaudio(path: str, first: int, count: Optional[int]) -> Optional["np.ndarray"]:
+    ta = _torchaudio()
+    if ta is None:
+        return None
+    try:
+        wav, _sr = ta.load(path, frame_offset=first, num_frames=-1 if count is None else count)
+    except Exception:
+        return None
+    return wav.numpy().astype(np.float32, copy=False)
+
+
+def main(argv) -> int:
+    if len(argv) < 2:
+        print("Usage: python df95_aiworker_audio_io.py datei.wav [...]")
+        return 1
+    for path in argv[1:]:
+        info = probe(path)
+        if info is None:
+            print(f"[DF95 AudioIO] nicht lesbar: {path}")
+            continue
+        out = asdict(info)
+        out["duration"] = round(info.duration, 3)
+        out["mappable"] = info.mappable
+        print(json.dumps(out, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
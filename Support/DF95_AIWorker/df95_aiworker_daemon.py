@@ -0,0 +1,469 @@
+"""
+DF95 AIWorker – Persistenter Worker (Jobs-Ordner überwachen)
+============================================================
+
+Statt für jeden Job einen kalten `python df95_aiworker_*.py job.json`-Start
+(Interpreter, `import torch`, Checkpoint laden) läuft dieser Worker dauerhaft,
+hält Modelle/Config im Speicher und arbeitet neue Job-Files ab, sobald sie im
+Jobs-Ordner auftauchen.
+
+Ordner (wie von den Lua-Skripten angelegt, z.B.
+DF95_Fieldrec_AIWorker_Bridge_FromProject.lua):
+
+    Support/DF95_AIWorker/Jobs/      <- Job-JSONs (DF95_AIWorker_UCS_V1)
+    Support/DF95_AIWorker/Results/   <- Result-JSONs
+
+Ablauf pro Job:
+    1) Claim: atomisch über eine Lock-Datei <job>.json.lock (O_CREAT|O_EXCL).
+       Das Job-File selbst bleibt liegen, damit es im AIWorker Hub sichtbar ist.
+    2) Dispatch:
+         - worker_mode generic/drone/material -> df95_aiworker_ucsv1_example
+           (Result: DF95_AIWorker_UCSResult_<ts>.json)
+         - requested_tasks enthält "classify_drum_role" -> zusätzlich
+           df95_aiworker_drumrole_engine; drum_role/drum_confidence werden in
+           die UCS-Results gemerged (ApplyToItems liest sie dort), mit
+           --stream pro Ergebnis vor dem Schreiben in die Partial-JSONL.
+         - worker_mode "drum_role" -> nur Drum-Role-Engine
+           (Result: DF95_AIWorker_DrumRoleResult_<ts>.json)
+       Mit --stream liegt die Partial-JSONL pro Job unter
+       Results/<JobName>.partial.jsonl bzw. <JobName>.drumrole.partial.jsonl,
+       damit ein abgebrochener Job beim nächsten Claim fortgesetzt wird.
+    3) Marker <job>.json.done (bzw. .failed) mit Result-Pfad/Fehler,
+       Lock wird entfernt. Jobs mit Marker werden nicht erneut angefasst.
+
+Queue / Shutdown:
+    Geclaimte Jobs laufen über eine begrenzte Queue (--queue N) zu den
+    Job-Threads (--jobs N). SIGINT/SIGTERM: es werden keine neuen Jobs mehr
+    geclaimt, laufende Jobs laufen zu Ende, noch wartende Jobs werden wieder
+    freigegeben (Lock gelöscht).
+
+Usage:
+    python df95_aiworker_daemon.py [aiworker_root] [--poll 1.0] [--queue 8] [--jobs 1]
+                                   [--workers N] [--stream] [--no-cache] [--once]
+
+    aiworker_root  Default: Ordner dieses Scripts (Support/DF95_AIWorker)
+    --workers N    Prozess-Pool-Größe für die Drum-Role-Engine
+    --once         vorhandene Jobs abarbeiten und beenden
+"""
+
+import datetime
+import functools
+import json
+import os
+import queue
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+import df95_aiworker_ucsv1_example as ucs_worker
+import df95_aiworker_drumrole_engine as drumrole
+import df95_aiworker_material_model as material_model
+from df95_aiworker_result_cache import cache_from_config
+
+DEFAULT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+LOCK_SUFFIX = ".lock"
+DONE_SUFFIX = ".done"
+FAILED_SUFFIX = ".failed"
+
+# Job-Files, die jünger sind, werden noch nicht angefasst (Lua schreibt evtl. noch)
+SETTLE_SEC = 1.0
+# Nicht parsebare Job-Files jünger als das werden erneut versucht statt als .failed markiert
+PARSE_GRACE_SEC = 30.0
+# Locks ohne lebenden Prozess auf diesem Host bzw. älter als das gelten als verwaist
+STALE_LOCK_SEC = 24 * 3600
+
+
+def log(msg: str) -> None:
+    ts = datetime.datetime.now().strftime("%H:%M:%S")
+    print(f"[DF95 AIWorker Daemon {ts}] {msg}", flush=True)
+
+
+# ------------------------------------------------------------
+# Claim / Marker
+# ------------------------------------------------------------
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        # Ohne pywin32 keine verlässliche Prüfung – Alter entscheidet
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _lock_is_stale(lock_path: str) -> bool:
+    try:
+        age = time.time() - os.path.getmtime(lock_path)
+        with open(lock_path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if age > STALE_LOCK_SEC:
+        return True
+    return info.get("host") == socket.gethostname() and not _pid_alive(int(info.get("pid") or 0))
+
+
+def try_claim(job_path: str) -> bool:
+    """Legt <job>.lock exklusiv an. True, wenn dieser Prozess den Job besitzt."""
+    lock_path = job_path + LOCK_SUFFIX
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if _lock_is_stale(lock_path):
+                log(f"verwaisten Lock entfernt: {os.path.basename(lock_path)}")
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    return False
+                continue
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({
+                "pid": os.getpid(),
+                "host": socket.gethostname(),
+                "claimed_utc": datetime.datetime.utcnow().isoformat() + "Z",
+            }, f)
+        return True
+    return False
+
+
+def release(job_path: str) -> None:
+    try:
+        os.remove(job_path + LOCK_SUFFIX)
+    except OSError:
+        pass
+
+
+def mark(job_path: str, suffix: str, info: Dict[str, Any]) -> None:
+    tmp = job_path + suffix + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, job_path + suffix)
+    release(job_path)
+
+
+def _age(path: str) -> float:
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def is_finished(job_path: str) -> bool:
+    return os.path.exists(job_path + DONE_SUFFIX) or os.path.exists(job_path + FAILED_SUFFIX)
+
+
+def list_pending_jobs(jobs_dir: str) -> List[str]:
+    """Job-JSONs ohne Lock/Marker, die älter als SETTLE_SEC sind (älteste zuerst)."""
+    try:
+        entries = list(os.scandir(jobs_dir))
+    except OSError:
+        return []
+    names = {e.name for e in entries}
+    now = time.time()
+    pending = []
+    for e in entries:
+        if not e.name.lower().endswith(".json") or not e.is_file():
+            continue
+        if (e.name + LOCK_SUFFIX) in names or (e.name + DONE_SUFFIX) in names or (e.name + FAILED_SUFFIX) in names:
+            continue
+        try:
+            mtime = e.stat().st_mtime
+        except OSError:
+            continue
+        if now - mtime < SETTLE_SEC:
+            continue
+        pending.append((mtime, e.path))
+    pending.sort()
+    return [p for _, p in pending]
+
+
+# ------------------------------------------------------------
+# Dispatch
+# ------------------------------------------------------------
+
+def _unique_result_path(results_dir: str, prefix: str) -> str:
+    ts = datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(results_dir, f"{prefix}_{ts}.json")
+    n = 2
+    while os.path.exists(path):
+        path = os.path.join(results_dir, f"{prefix}_{ts}_{n}.json")
+        n += 1
+    return path
+
+
+class Daemon:
+    def __init__(self, root: str, poll_sec: float = 1.0, queue_size: int = 8, job_threads: int = 1,
+                 workers: int = 1, stream: bool = False, use_cache: bool = True, once: bool = False):
+        self.root = os.path.abspath(root)
+        self.jobs_dir = os.path.join(self.root, "Jobs")
+        self.results_dir = os.path.join(self.root, "Results")
+        self.poll_sec = max(0.1, float(poll_sec))
+        self.job_threads = max(1, int(job_threads))
+        self.workers = max(1, int(workers))
+        self.stream = stream
+        self.use_cache = use_cache
+        self.once = once
+
+        self.queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.stop = threading.Event()
+        self.stats = {"done": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+        self._drum_cfg_path = os.path.join(self.root, "df95_aiworker_drumrole_config.json")
+        self._drum_cfg: Optional[Dict[str, Any]] = None
+        self._drum_cfg_mtime: Optional[float] = None
+        self._cfg_lock = threading.Lock()
+
+    # -- Ressourcen (einmal laden, bei Änderung neu) ----------
+
+    def drum_config(self) -> Dict[str, Any]:
+        with self._cfg_lock:
+            try:
+                mtime = os.path.getmtime(self._drum_cfg_path)
+            except OSError:
+                mtime = None
+            if self._drum_cfg is None or mtime != self._drum_cfg_mtime:
+                self._drum_cfg = drumrole.load_config(self._drum_cfg_path)
+                self._drum_cfg_mtime = mtime
+                log(f"Drum-Role-Config geladen (backend={self._drum_cfg.get('backend', 'heuristic')})")
+            return self._drum_cfg
+
+    def warmup(self) -> None:
+        drumrole.warmup(self.drum_config())
+        if material_model.warmup():
+            log("Material-Modell geladen und resident")
+
+    # -- Job-Verarbeitung --------------------------------------
+
+    def run_job(self, job_path: str) -> str:
+        job = ucs_worker.load_json(job_path)
+        worker_mode = (job.get("worker_mode") or "generic").lower()
+        tasks = [str(t).lower() for t in (job.get("requested_tasks") or [])]
+        job_name = os.path.splitext(os.path.basename(job_path))[0]
+
+        cfg = self.drum_config()
+        cache = cache_from_config(cfg.get("cache")) if self.use_cache else None
+        try:
+            if worker_mode in ("drum_role", "drumrole"):
+                out_path = _unique_result_path(self.results_dir, "DF95_AIWorker_DrumRoleResult")
+                if self.stream:
+                    # Partial am Job festmachen, nicht am (zeitgestempelten) Result-Namen
+                    partial = os.path.join(self.results_dir, job_name + ".drumrole.partial.jsonl")
+                    drumrole.process_job_streaming(job, cfg, out_path, workers=self.workers, cache=cache,
+                                                   partial_path=partial)
+                else:
+                    drum_payload = drumrole.process_job(job, cfg, workers=self.workers, cache=cache)
+                    drumrole.write_result(out_path, drum_payload)
+                return out_path
+
+            # Drum-Rollen vorab (Pool-Batch, über den Result-Cache bei Neustart billig),
+            # dann pro UCS-Ergebnis mergen – auch im Streaming-Pfad
+            drum_payload = None
+            if "classify_drum_role" in tasks:
+                drum_payload = drumrole.process_job(job, cfg, workers=self.workers, cache=cache)
+
+            out_path = _unique_result_path(self.results_dir, "DF95_AIWorker_UCSResult")
+            if self.stream:
+                enrich, extra = None, None
+                if drum_payload is not None:
+                    enrich = functools.partial(apply_drum_role, by_path=drum_role_index(drum_payload))
+                    extra = {"drum_role_backend": drum_payload.get("backend", "")}
+                ucs_worker.process_job_streaming(job, job_path, out_path, cache=cache, enrich=enrich, extra=extra)
+                return out_path
+
+            out = ucs_worker.process_job(job, job_path, cache=cache)
+            if drum_payload is not None:
+                merge_drum_roles(out, drum_payload)
+            ucs_worker.save_json(out, out_path)
+            return out_path
+        finally:
+            if cache is not None:
+                cache.close()
+
+    def _job_thread(self) -> None:
+        while True:
+            job_path = self.queue.get()
+            try:
+                if job_path is None:
+                    return
+                if self.stop.is_set():
+                    # Noch nicht begonnen -> freigeben, ein späterer Lauf übernimmt
+                    release(job_path)
+                    continue
+                self._process(job_path)
+            finally:
+                self.queue.task_done()
+
+    def _process(self, job_path: str) -> None:
+        name = os.path.basename(job_path)
+        t0 = time.perf_counter()
+        log(f"Job gestartet: {name}")
+        try:
+            out_path = self.run_job(job_path)
+        except json.JSONDecodeError as e:
+            if _age(job_path) < PARSE_GRACE_SEC:
+                # Vermutlich noch nicht fertig geschrieben -> freigeben, nächster Poll versucht erneut
+                release(job_path)
+                log(f"Job noch nicht lesbar, später erneut: {name}")
+                return
+            self._fail(job_path, e)
+            return
+        except Exception as e:
+            self._fail(job_path, e)
+            return
+
+        dt = time.perf_counter() - t0
+        mark(job_path, DONE_SUFFIX, {
+            "result": out_path,
+            "seconds": round(dt, 3),
+            "finished_utc": datetime.datetime.utcnow().isoformat() + "Z",
+        })
+        with self._stats_lock:
+            self.stats["done"] += 1
+        log(f"Job fertig: {name} -> {os.path.basename(out_path)} ({dt:.2f}s)")
+
+    def _fail(self, job_path: str, e: Exception) -> None:
+        mark(job_path, FAILED_SUFFIX, {
+            "error": str(e),
+            "traceback": traceback.format_exc(),
+            "finished_utc": datetime.datetime.utcnow().isoformat() + "Z",
+        })
+        with self._stats_lock:
+            self.stats["failed"] += 1
+        log(f"Job fehlgeschlagen: {os.path.basename(job_path)} ({e})")
+
+    # -- Hauptschleife -----------------------------------------
+
+    def request_stop(self, *_args) -> None:
+        if not self.stop.is_set():
+            log("Shutdown angefordert – laufende Jobs werden beendet, keine neuen Claims.")
+        self.stop.set()
+
+    def run(self) -> int:
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        self.warmup()
+        threads = [threading.Thread(target=self._job_thread, name=f"df95-job-{i}", daemon=True)
+                   for i in range(self.job_threads)]
+        for t in threads:
+            t.start()
+
+        log(f"Überwache {self.jobs_dir} (poll={self.poll_sec}s, queue={self.queue.maxsize}, jobs={self.job_threads})")
+        while not self.stop.is_set():
+            claimed_any = False
+            for job_path in list_pending_jobs(self.jobs_dir):
+                if self.stop.is_set():
+                    break
+                # Nur claimen, wenn die Queue Platz hat – so bleiben Jobs für andere Worker frei
+                while not self.stop.is_set() and self.queue.full():
+                    time.sleep(self.poll_sec)
+                if self.stop.is_set() or is_finished(job_path) or not try_claim(job_path):
+                    continue
+                self.queue.put(job_path)
+                claimed_any = True
+
+            if self.once and not claimed_any:
+                self.queue.join()
+                if not list_pending_jobs(self.jobs_dir):
+                    break
+                continue
+            self.stop.wait(self.poll_sec)
+
+        for _ in threads:
+            self.queue.put(None)
+        for t in threads:
+            t.join()
+        log(f"Beendet. done={self.stats['done']} failed={self.stats['failed']}")
+        return 0
+
+
+def _path_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path or ""))
+
+
+def drum_role_index(drum_payload: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Drum-Role-Results nach normalisiertem full_path."""
+    return {_path_key(r.get("full_path") or ""): r for r in drum_payload.get("results") or []}
+
+
+def apply_drum_role(res: Dict[str, Any], by_path: Dict[str, Dict[str, Any]]) -> None:
+    """Schreibt drum_role/drum_confidence in ein einzelnes UCS-Result (falls vorhanden)."""
+    dr = by_path.get(_path_key(res.get("full_path") or ""))
+    if dr is None:
+        return
+    res["drum_role"] = dr.get("drum_role", "")
+    res["drum_confidence"] = dr.get("drum_confidence", 0.0)
+
+
+def merge_drum_roles(ucs_payload: Dict[str, Any], drum_payload: Dict[str, Any]) -> None:
+    """Schreibt drum_role/drum_confidence aus dem Drum-Role-Result in die UCS-Results."""
+    by_path = drum_role_index(drum_payload)
+    for res in ucs_payload.get("results") or []:
+        apply_drum_role(res, by_path)
+    ucs_payload["drum_role_backend"] = drum_payload.get("backend", "")
+
+
+def _parse_args(argv: List[str]) -> Dict[str, Any]:
+    opts: Dict[str, Any] = {
+        "root": DEFAULT_ROOT, "poll": 1.0, "queue": 8, "jobs": 1, "workers": 1,
+        "stream": False, "no_cache": False, "once": False,
+    }
+    flags = {"--stream": "stream", "--no-cache": "no_cache", "--once": "once"}
+    values = {"--poll": ("poll", float), "--queue": ("queue", int), "--jobs": ("jobs", int), "--workers": ("workers", int)}
+    args = list(argv[1:])
+    positional = []
+    while args:
+        a = args.pop(0)
+        if a in flags:
+            opts[flags[a]] = True
+        elif a in values and args:
+            key, conv = values[a]
+            try:
+                opts[key] = conv(args.pop(0))
+            except ValueError:
+                print(f"ungültiger Wert für {a}")
+                raise SystemExit(1)
+        elif a.startswith("--"):
+            print(__doc__)
+            raise SystemExit(1)
+        else:
+            positional.append(a)
+    if positional:
+        opts["root"] = positional[0]
+    return opts
+
+
+def main(argv: List[str]) -> int:
+    opts = _parse_args(argv)
+    daemon = Daemon(
+        opts["root"],
+        poll_sec=opts["poll"],
+        queue_size=opts["queue"],
+        job_threads=opts["jobs"],
+        workers=opts["workers"],
+        stream=opts["stream"],
+        use_cache=not opts["no_cache"],
+        once=opts["once"],
+    )
+    signal.signal(signal.SIGINT, daemon.request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, daemon.request_stop)
+    return daemon.run()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -11,6 +11,8 @@ Dies ist die "vollwertige" Drum-Role Engine für DF95:
     * "heuristic"  -> eingebaut, leichtgewichtig, pure Python (default)
     * "yamnet"     -> YAMNet-Backend (Audio-Embedding + Klassifikation)
     * "clap"       -> CLAP/AudioCLAP-Embedding + Klassifikation
+    * "dsp"        -> Audio-Features mit NumPy (Attack-Fenster, ohne torch),
+                      siehe df95_aiworker_drumrole_dsp.py – arbeitet batchweise
     * "custom"     -> eigene Python-Logik (z.B. Torch/ONNX)
 
 Ziel:
@@ -33,14 +35,44 @@ WICHTIG:
     - die Funktionen `predict_role_yamnet()` / `predict_role_clap()` erweitern
     - dein eigenes Modell im "custom"-Backend einhängen.
 
+Parallel-Modus:
+    Mit `--workers N` werden die Dateien eines Jobs über einen Prozess-Pool
+    verteilt (chunked, Reihenfolge der Ergebnisse bleibt identisch zum
+    seriellen Pfad). Jeder Worker-Prozess bekommt Config/Backend einmalig
+    über den Pool-Initializer und lädt sein Modell nur einmal.
+
+        python df95_aiworker_drumrole_engine.py job.json result.json [config.json] --workers 8 [--chunksize 64]
+
+Result-Cache:
+    Ergebnisse werden unter Support/DF95_AIWorker/Cache zwischengespeichert
+    (siehe df95_aiworker_result_cache.py) – keyed über Datei (Größe/mtime,
+    optional Content-Hash), Backend, Modell-Fingerprint und Config-Digest.
+    Steuerung über den "cache"-Block der Config oder `--no-cache`.
+    Hit/Miss-Zähler landen im Result-JSON unter "cache".
+
+Streaming / Resume:
+    Mit `--stream` wird jedes Ergebnis sofort als JSON-Zeile nach
+    <result.json>.partial.jsonl geschrieben (fsync alle `--fsync-every` Zeilen).
+    Nach einem Abbruch setzt derselbe Aufruf an der letzten fertigen Datei
+    fort; am Ende entsteht das gewohnte DrumRole_V2-JSON
+    (siehe df95_aiworker_result_stream.py).
+
 """
 
+import copy
+import hashlib
 import json
 import os
 import sys
 import math
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from df95_aiworker_result_cache import ResultCache, cache_from_config, file_fingerprint
+from df95_aiworker_result_stream import JsonlResultWriter, finalize_jsonl, partial_path_for
+import df95_aiworker_name_rules as name_rules
+from df95_aiworker_name_rules import classify_name
 
 
 # ------------------------------------------------------------
@@ -59,7 +91,7 @@ class DrumRoleResult:
 # ------------------------------------------------------------
 
 DEFAULT_CONFIG = {
-    "backend": "heuristic",  # "heuristic" | "yamnet" | "clap" | "custom"
+    "backend": "heuristic",  # "heuristic" | "yamnet" | "clap" | "custom" | "dsp"
     "min_confidence": 0.25,
     "yamnet": {
         "label_map": {
@@ -94,19 +126,36 @@ DEFAULT_CONFIG = {
         "module": "",
         "function": "",
     },
+    "dsp": {
+        # wie ATTACK_SECONDS / BATCH_SIZE in df95_aiworker_drumrole_dsp (erst bei Bedarf importiert)
+        "attack_seconds": 0.75,
+        "batch_size": 32,
+        # Treffer der Namens-Heuristik haben Vorrang vor den Audio-Features
+        "prefer_names": True,
+        "prototypes": {},
+    },
+    "cache": {
+        "enabled": True,
+        "dir": "",
+        "content_hash": False,
+        "max_entries": 500000,
+        "max_mb": 512,
+    },
 }
 
 
 def load_config(config_path: str) -> Dict[str, Any]:
     if not os.path.isfile(config_path):
-        return DEFAULT_CONFIG.copy()
+        return copy.deepcopy(DEFAULT_CONFIG)
     try:
         with open(config_path, "r", encoding="utf-8") as f:
             data = json.load(f)
     except Exception:
-        return DEFAULT_CONFIG.copy()
+        return copy.deepcopy(DEFAULT_CONFIG)
 
-    cfg = DEFAULT_CONFIG.copy()
+    # deepcopy: der Daemon lädt die Config bei jeder Änderung neu – update() auf
+    # flachen Kopien würde die verschachtelten Defaults dauerhaft verändern
+    cfg = copy.deepcopy(DEFAULT_CONFIG)
     for k, v in data.items():
         if isinstance(v, dict) and isinstance(cfg.get(k), dict):
             cfg[k].update(v)
@@ -133,42 +182,19 @@ def write_result(path: str, payload: Dict[str, Any]) -> None:
 # Backend: Heuristische Rolle (fallback, leichtgewichtig)
 # ------------------------------------------------------------
 
-def guess_drum_role_from_name(name: str) -> Tuple[str, float]:
-    """Sehr einfache Fallback-Heuristik auf Basis des Dateinamens."""
-    s = name.lower()
-    # Kick
-    if "kick" in s or " bd" in s or "bassdrum" in s or "_bd_" in s:
-        return "KICK", 0.75
-    # Snare
-    if "snare" in s or " sd" in s or "snr" in s:
-        return "SNARE", 0.75
-    # HiHat
-    if "hihat" in s or "hi-hat" in s or " hat" in s or " hh" in s:
-        return "HIHAT", 0.7
-    # Tom
-    if "tom" in s or "tomh" in s or "tomm" in s or "toml" in s or "floor" in s:
-        return "TOM", 0.7
-    # Ride
-    if "ride" in s:
-        return "RIDE", 0.65
-    # Crash
-    if "crash" in s or "splash" in s or "china" in s:
-        return "CRASH", 0.65
-    # Ambience
-    if "amb" in s or "room" in s or "atmo" in s or "reverb" in s:
-        return "AMBIENCE", 0.6
-    # FX
-    if "fx" in s or "impact" in s or "hit" in s or "whoosh" in s or "rise" in s:
-        return "FX", 0.6
-    # Perc
-    if "perc" in s or "clap" in s or "shaker" in s or "snap" in s:
-        return "PERC", 0.6
-    return "", 0.0
-
-
-def classify_heuristic(full_path: str) -> DrumRoleResult:
+def guess_drum_role_from_name(name: str, cfg: Optional[Dict[str, Any]] = None) -> Tuple[str, float]:
+    """Sehr einfache Fallback-Heuristik auf Basis des Dateinamens.
+
+    Nutzt die gemeinsame Keyword-Tabelle aus df95_aiworker_name_rules
+    (überschreibbar über "name_rules" in der Config).
+    """
+    guess = classify_name(name, (cfg or {}).get("name_rules"))
+    return guess.drum_role, guess.drum_confidence
+
+
+def classify_heuristic(full_path: str, cfg: Optional[Dict[str, Any]] = None) -> DrumRoleResult:
     base = os.path.basename(full_path)
-    role, conf = guess_drum_role_from_name(base)
+    role, conf = guess_drum_role_from_name(base, cfg)
     return DrumRoleResult(full_path=full_path, drum_role=role, drum_confidence=conf)
 
 
@@ -192,7 +218,7 @@ def predict_role_yamnet(full_path: str, cfg: Dict[str, Any]) -> DrumRoleResult:
     """
     # TODO: YAMNet-Modell einbinden (lokal in deinem Env)
     # Für jetzt: fallback auf heuristische Logik
-    return classify_heuristic(full_path)
+    return classify_heuristic(full_path, cfg)
 
 
 # ------------------------------------------------------------
@@ -212,13 +238,88 @@ def predict_role_clap(full_path: str, cfg: Dict[str, Any]) -> DrumRoleResult:
     mit deiner echten CLAP-Integration.
     """
     # TODO: CLAP-Modell integrieren
-    return classify_heuristic(full_path)
+    return classify_heuristic(full_path, cfg)
+
+
+# ------------------------------------------------------------
+# Backend: DSP (NumPy-Features, batchweise)
+# ------------------------------------------------------------
+
+_DSP_WARNED = False
+# DSP-Modul (zieht NumPy nach sich) erst laden, wenn das dsp-Backend läuft
+_DSP_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "df95_aiworker_drumrole_dsp.py")
+# Audio-Lesen des DSP-Backends (Fenster, Resampling) – ändert die Features mit
+_AUDIO_IO_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "df95_aiworker_audio_io.py")
+
+
+def _drumrole_dsp():
+    import df95_aiworker_drumrole_dsp as drumrole_dsp
+    return drumrole_dsp
+
+
+def predict_roles_dsp(paths: List[str], cfg: Dict[str, Any]) -> List[DrumRoleResult]:
+    """DSP-Backend für viele Dateien (ein vektorisierter Feature-Batch).
+
+    Dateinamen mit eindeutigem Keyword gewinnen (prefer_names); Dateien, die
+    nicht gelesen werden können (kein WAV, still), fallen auf die Heuristik zurück.
+    """
+    global _DSP_WARNED
+    dsp_cfg = cfg.get("dsp") or {}
+    drumrole_dsp = _drumrole_dsp()
+    if not drumrole_dsp.available():
+        if not _DSP_WARNED:
+            print("[DF95 DrumRoleEngine] dsp-Backend braucht numpy – fallback auf Heuristik")
+            _DSP_WARNED = True
+        return [classify_heuristic(p, cfg) for p in paths]
+
+    prefer_names = bool(dsp_cfg.get("prefer_names", True))
+    named = [classify_heuristic(p, cfg) for p in paths]
+    todo = [i for i, res in enumerate(named) if not (prefer_names and res.drum_role)]
+    scored = drumrole_dsp.classify_paths([paths[i] for i in todo], dsp_cfg)
+
+    out = list(named)
+    for i, (role, conf) in zip(todo, scored):
+        if role:
+            out[i] = DrumRoleResult(full_path=paths[i], drum_role=role, drum_confidence=conf)
+    return out
+
+
+def predict_role_dsp(full_path: str, cfg: Dict[str, Any]) -> DrumRoleResult:
+    return predict_roles_dsp([full_path], cfg)[0]
 
 
 # ------------------------------------------------------------
 # Backend: Custom (dynamisch ladbar)
 # ------------------------------------------------------------
 
+_CUSTOM_FN_CACHE: Dict[Tuple[str, str], Any] = {}
+
+
+def _resolve_custom_fn(cfg: Dict[str, Any]):
+    """Löst Modul/Funktion des Custom-Backends auf (einmal pro Prozess).
+
+    Gibt None zurück, wenn nichts konfiguriert ist oder der Import scheitert.
+    """
+    module_name = (cfg.get("custom") or {}).get("module") or ""
+    func_name = (cfg.get("custom") or {}).get("function") or ""
+
+    if not module_name or not func_name:
+        return None
+
+    key = (module_name, func_name)
+    if key in _CUSTOM_FN_CACHE:
+        return _CUSTOM_FN_CACHE[key]
+
+    try:
+        mod = __import__(module_name, fromlist=[func_name])
+        fn = getattr(mod, func_name)
+    except Exception:
+        fn = None
+
+    _CUSTOM_FN_CACHE[key] = fn
+    return fn
+
+
 def predict_role_custom(full_path: str, cfg: Dict[str, Any]) -> DrumRoleResult:
     """
     Lädt optional ein benutzerdefiniertes Python-Modul/Funktion, z.B.:
@@ -235,18 +336,9 @@ def predict_role_custom(full_path: str, cfg: Dict[str, Any]) -> DrumRoleResult:
 
     Muss (role, confidence) zurückgeben.
     """
-    module_name = (cfg.get("custom") or {}).get("module") or ""
-    func_name = (cfg.get("custom") or {}).get("function") or ""
-
-    if not module_name or not func_name:
-        # Fallback
-        return classify_heuristic(full_path)
-
-    try:
-        mod = __import__(module_name, fromlist=[func_name])
-        fn = getattr(mod, func_name)
-    except Exception:
-        return classify_heuristic(full_path)
+    fn = _resolve_custom_fn(cfg)
+    if fn is None:
+        return classify_heuristic(full_path, cfg)
 
     try:
         role, conf = fn(full_path)
@@ -273,57 +365,344 @@ def classify_file(full_path: str, backend: str, cfg: Dict[str, Any]) -> DrumRole
         return predict_role_clap(full_path, cfg)
     if backend == "custom":
         return predict_role_custom(full_path, cfg)
+    if backend == "dsp":
+        return predict_role_dsp(full_path, cfg)
     # Default
-    return classify_heuristic(full_path)
+    return classify_heuristic(full_path, cfg)
+
+
+# ------------------------------------------------------------
+# Parallel-Ausführung (Prozess-Pool)
+# ------------------------------------------------------------
+
+# Pro Worker-Prozess einmalig gesetzt (siehe _pool_init)
+_POOL_BACKEND = "heuristic"
+_POOL_CFG: Dict[str, Any] = {}
+
+
+def _warmup_backend(backend: str, cfg: Dict[str, Any]) -> None:
+    """Lädt backend-spezifische Ressourcen (Modelle, Custom-Funktion) vorab."""
+    if (backend or "").lower() == "custom":
+        _resolve_custom_fn(cfg)
+
 
+def _pool_init(backend: str, cfg: Dict[str, Any]) -> None:
+    global _POOL_BACKEND, _POOL_CFG
+    _POOL_BACKEND = backend
+    _POOL_CFG = cfg
+    _warmup_backend(backend, cfg)
 
-def process_job(job: Dict[str, Any], cfg: Dict[str, Any]) -> Dict[str, Any]:
+
+def _pool_classify(full_path: str) -> Tuple[str, float]:
+    res = classify_file(full_path, _POOL_BACKEND, _POOL_CFG)
+    return res.drum_role, float(res.drum_confidence)
+
+
+def _pool_classify_batch(paths: List[str]) -> List[Tuple[str, float]]:
+    return [(r.drum_role, float(r.drum_confidence)) for r in predict_roles_dsp(paths, _POOL_CFG)]
+
+
+def dsp_batch_size(cfg: Dict[str, Any]) -> int:
+    return max(1, int((cfg.get("dsp") or {}).get("batch_size", DEFAULT_CONFIG["dsp"]["batch_size"])))
+
+
+def warmup(cfg: Dict[str, Any]) -> None:
+    """Lädt, was das konfigurierte Backend braucht (dsp: NumPy + Feature-Code), vorab.
+
+    Für langlebige Prozesse (df95_aiworker_daemon.py); die Heuristik braucht nichts.
+    """
+    if (cfg.get("backend") or "heuristic").lower() == "dsp":
+        _drumrole_dsp()
+
+
+def default_chunksize(num_files: int, workers: int) -> int:
+    """~8 Chunks pro Worker: genug Lastverteilung, wenig IPC-Overhead."""
+    if workers <= 1 or num_files <= 0:
+        return 1
+    return max(1, min(256, num_files // (workers * 8)))
+
+
+def _classify_block(
+    paths: List[str],
+    backend: str,
+    cfg: Dict[str, Any],
+    pool: Optional[ProcessPoolExecutor],
+    workers: int,
+    chunksize: int,
+) -> Iterator[DrumRoleResult]:
+    if (backend or "").lower() == "dsp":
+        # Batch-Backend: Pool verteilt ganze Feature-Batches statt einzelner Dateien
+        bs = dsp_batch_size(cfg)
+        if pool is not None and workers > 1:
+            bs = max(1, min(bs, -(-len(paths) // workers)))
+        batches = [paths[i:i + bs] for i in range(0, len(paths), bs)]
+        if pool is None:
+            for batch in batches:
+                yield from predict_roles_dsp(batch, cfg)
+            return
+        for batch, scored in zip(batches, pool.map(_pool_classify_batch, batches)):
+            for p, (role, conf) in zip(batch, scored):
+                yield DrumRoleResult(full_path=p, drum_role=role, drum_confidence=conf)
+        return
+
+    if pool is None:
+        for p in paths:
+            yield classify_file(p, backend, cfg)
+        return
+
+    if chunksize <= 0:
+        chunksize = default_chunksize(len(paths), workers)
+    for p, (role, conf) in zip(paths, pool.map(_pool_classify, paths, chunksize=chunksize)):
+        yield DrumRoleResult(full_path=p, drum_role=role, drum_confidence=conf)
+
+
+def iter_classify_files(
+    paths: List[str],
+    backend: str,
+    cfg: Dict[str, Any],
+    workers: int = 1,
+    chunksize: int = 0,
+    cache: Optional[ResultCache] = None,
+    block_size: int = 0,
+) -> Iterator[DrumRoleResult]:
+    """Klassifiziert viele Dateien – seriell oder über einen Prozess-Pool.
+
+    Liefert die Ergebnisse als Generator, immer in der Reihenfolge von `paths`.
+    Gearbeitet wird blockweise (block_size=0 -> ein Block): Cache-Treffer
+    kommen direkt aus dem Cache, nur die Misses werden klassifiziert.
+    Der Pool lebt über alle Blöcke hinweg.
+    """
+    ctx = cache_context(backend, cfg) if cache is not None else ""
+
+    pool: Optional[ProcessPoolExecutor] = None
+    if workers > 1 and len(paths) > 1:
+        workers = min(workers, len(paths))
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_pool_init,
+            initargs=(backend, cfg),
+        )
+    else:
+        _warmup_backend(backend, cfg)
+
+    try:
+        step = block_size if block_size > 0 else max(1, len(paths))
+        for start in range(0, len(paths), step):
+            block = paths[start:start + step]
+            if cache is not None:
+                hits = [cache.get(p, ctx) for p in block]
+            else:
+                hits = [None] * len(block)
+            misses = [p for p, hit in zip(block, hits) if hit is None]
+            fresh = _classify_block(misses, backend, cfg, pool, workers, chunksize)
+
+            for p, hit in zip(block, hits):
+                if hit is not None:
+                    yield DrumRoleResult(
+                        full_path=p,
+                        drum_role=hit.get("drum_role", ""),
+                        drum_confidence=float(hit.get("drum_confidence", 0.0)),
+                    )
+                    continue
+                res = next(fresh)
+                if cache is not None:
+                    cache.put(p, ctx, {"drum_role": res.drum_role, "drum_confidence": res.drum_confidence})
+                yield res
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def classify_files(
+    paths: List[str],
+    backend: str,
+    cfg: Dict[str, Any],
+    workers: int = 1,
+    chunksize: int = 0,
+    cache: Optional[ResultCache] = None,
+) -> List[DrumRoleResult]:
+    return list(iter_classify_files(paths, backend, cfg, workers=workers, chunksize=chunksize, cache=cache))
+
+
+# ------------------------------------------------------------
+# Cache-Kontext
+# ------------------------------------------------------------
+
+def backend_fingerprint(backend: str, cfg: Dict[str, Any]) -> str:
+    """Fingerprint des Backend-Codes/Modells für den Result-Cache.
+
+    Eingebaute Backends hängen am Stand dieses Moduls und der Namens-Heuristik;
+    beim DSP-Backend zusätzlich df95_aiworker_drumrole_dsp und df95_aiworker_audio_io,
+    beim Custom-Backend die Datei des konfigurierten Moduls.
+    """
+    fp = "engine:" + file_fingerprint(os.path.abspath(__file__))
+    fp += "|names:" + file_fingerprint(os.path.abspath(name_rules.__file__))
+    if (backend or "").lower() == "dsp":
+        fp += "|dsp:" + file_fingerprint(_DSP_MODULE_PATH)
+        fp += "|audio_io:" + file_fingerprint(_AUDIO_IO_MODULE_PATH)
+    if (backend or "").lower() == "custom":
+        fn = _resolve_custom_fn(cfg)
+        mod = sys.modules.get(getattr(fn, "__module__", "") or "") if fn is not None else None
+        mod_file = getattr(mod, "__file__", "") or ""
+        if mod_file:
+            fp += "|custom:" + file_fingerprint(mod_file)
+    return fp
+
+
+def cache_context(backend: str, cfg: Dict[str, Any]) -> str:
+    relevant = {k: v for k, v in cfg.items() if k != "cache"}
+    return ResultCache.context(backend, backend_fingerprint(backend, cfg), relevant)
+
+
+# ------------------------------------------------------------
+# Job-Verarbeitung
+# ------------------------------------------------------------
+
+def resolve_job_paths(job: Dict[str, Any]) -> List[str]:
     files = job.get("files") or []
     audio_root = job.get("audio_root") or ""
-    backend = cfg.get("backend", "heuristic")
-    min_conf = float(cfg.get("min_confidence", 0.25))
-
-    results: List[Dict[str, Any]] = []
 
+    paths: List[str] = []
     for entry in files:
         rel = entry.get("rel_path") or entry.get("path") or ""
         full = entry.get("full_path")
         if not full:
             full = os.path.join(audio_root, rel)
-        full = os.path.abspath(full)
-
-        res = classify_file(full, backend, cfg)
-
-        # Min-Confidence-Filter (optional)
-        if res.drum_confidence < min_conf:
-            # Leere Role signalisieren „kein klares Drum“
-            results.append(
-                {
-                    "full_path": full,
-                    "drum_role": "",
-                    "drum_confidence": float(res.drum_confidence),
-                }
-            )
-        else:
-            results.append(
-                {
-                    "full_path": full,
-                    "drum_role": res.drum_role,
-                    "drum_confidence": float(res.drum_confidence),
-                }
-            )
+        paths.append(os.path.abspath(full))
+    return paths
+
 
+def result_entry(res: DrumRoleResult, min_conf: float) -> Dict[str, Any]:
+    # Min-Confidence-Filter (optional)
+    if res.drum_confidence < min_conf:
+        # Leere Role signalisieren „kein klares Drum“
+        role = ""
+    else:
+        role = res.drum_role
     return {
+        "full_path": res.full_path,
+        "drum_role": role,
+        "drum_confidence": float(res.drum_confidence),
+    }
+
+
+def process_job(
+    job: Dict[str, Any],
+    cfg: Dict[str, Any],
+    workers: int = 1,
+    chunksize: int = 0,
+    cache: Optional[ResultCache] = None,
+) -> Dict[str, Any]:
+    backend = cfg.get("backend", "heuristic")
+    min_conf = float(cfg.get("min_confidence", 0.25))
+
+    paths = resolve_job_paths(job)
+    classified = classify_files(paths, backend, cfg, workers=workers, chunksize=chunksize, cache=cache)
+    results: List[Dict[str, Any]] = [result_entry(res, min_conf) for res in classified]
+
+    payload = {
         "version": "DF95_AIWorker_DrumRole_V2",
         "backend": backend,
         "source_job": job.get("job_id") or job.get("created_utc"),
         "results": results,
     }
+    if cache is not None:
+        payload["cache"] = cache.stats(settle=True)
+    return payload
+
+
+def process_job_streaming(
+    job: Dict[str, Any],
+    cfg: Dict[str, Any],
+    out_path: str,
+    workers: int = 1,
+    chunksize: int = 0,
+    cache: Optional[ResultCache] = None,
+    fsync_every: int = 200,
+    partial_path: Optional[str] = None,
+) -> int:
+    """Streaming-Variante von process_job().
+
+    Schreibt jedes Ergebnis sofort in <out_path>.partial.jsonl (bzw.
+    partial_path), überspringt beim Neustart bereits erledigte Dateien und
+    erzeugt am Ende das normale DF95_AIWorker_DrumRole_V2-JSON unter out_path.
+    Wer out_path pro Lauf neu wählt (Zeitstempel), muss einen stabilen
+    partial_path übergeben, sonst wird nie fortgesetzt. Gibt die Anzahl der
+    Ergebnisse zurück.
+    """
+    backend = cfg.get("backend", "heuristic")
+    min_conf = float(cfg.get("min_confidence", 0.25))
+    source_job = job.get("job_id") or job.get("created_utc")
+
+    paths = resolve_job_paths(job)
+    header = {
+        "version": "DF95_AIWorker_DrumRole_V2",
+        "source_job": source_job,
+        "backend": backend,
+        "files_digest": hashlib.sha1("\n".join(paths).encode("utf-8")).hexdigest(),
+    }
+
+    partial = partial_path or partial_path_for(out_path)
+    with JsonlResultWriter(partial, header, fsync_every=fsync_every) as writer:
+        todo = [p for p in paths if p not in writer.done]
+        if len(todo) < len(paths):
+            print(f"[DF95 DrumRoleEngine] resume: {len(paths) - len(todo)} Dateien bereits erledigt")
+        block_size = max(1024, workers * 256)
+        for res in iter_classify_files(todo, backend, cfg, workers=workers, chunksize=chunksize,
+                                       cache=cache, block_size=block_size):
+            writer.write(result_entry(res, min_conf))
+
+    payload: Dict[str, Any] = {
+        "version": "DF95_AIWorker_DrumRole_V2",
+        "backend": backend,
+        "source_job": source_job,
+    }
+    if cache is not None:
+        payload["cache"] = cache.stats(settle=True)
+    return finalize_jsonl(partial, out_path, payload)
+
+
+def _pop_int_option(args: List[str], name: str, default: int) -> int:
+    """Entfernt `--name N` bzw. `--name=N` aus args und gibt N zurück."""
+    value = default
+    i = 0
+    while i < len(args):
+        a = args[i]
+        if a == name and i + 1 < len(args):
+            raw = args[i + 1]
+            del args[i:i + 2]
+        elif a.startswith(name + "="):
+            raw = a.split("=", 1)[1]
+            del args[i]
+        else:
+            i += 1
+            continue
+        try:
+            value = int(raw)
+        except ValueError:
+            print(f"[DF95 DrumRoleEngine] ungültiger Wert für {name}: {raw!r}")
+            raise SystemExit(1)
+    return value
+
+
+def _pop_flag(args: List[str], name: str) -> bool:
+    if name in args:
+        args.remove(name)
+        return True
+    return False
 
 
 def main(argv: List[str]) -> None:
+    argv = list(argv)
+    workers = _pop_int_option(argv, "--workers", 1)
+    chunksize = _pop_int_option(argv, "--chunksize", 0)
+    fsync_every = _pop_int_option(argv, "--fsync-every", 200)
+    no_cache = _pop_flag(argv, "--no-cache")
+    stream = _pop_flag(argv, "--stream")
+
     if len(argv) < 3:
-        print("usage: python df95_aiworker_drumrole_engine.py <job.json> <result.json> [config.json]")
+        print("usage: python df95_aiworker_drumrole_engine.py <job.json> <result.json> [config.json]"
+              " [--workers N] [--chunksize N] [--no-cache] [--stream [--fsync-every N]]")
         raise SystemExit(1)
 
     job_path = argv[1]
@@ -336,10 +715,21 @@ def main(argv: List[str]) -> None:
     job = load_job(job_path)
     cfg = load_config(cfg_path)
 
-    out = process_job(job, cfg)
-    write_result(out_path, out)
-
-    print(f"[DF95 DrumRoleEngine] backend={cfg.get('backend','heuristic')}  wrote: {out_path}")
+    cache = None if no_cache else cache_from_config(cfg.get("cache"))
+    try:
+        if stream:
+            process_job_streaming(job, cfg, out_path, workers=workers, chunksize=chunksize,
+                                  cache=cache, fsync_every=fsync_every)
+        else:
+            out = process_job(job, cfg, workers=workers, chunksize=chunksize, cache=cache)
+            write_result(out_path, out)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    print(f"[DF95 DrumRoleEngine] backend={cfg.get('backend','heuristic')}  workers={max(1, workers)}  wrote: {out_path}")
+    if cache is not None:
+        print(f"[DF95 DrumRoleEngine] cache hits={cache.hits}  misses={cache.misses}")
 
 
 if __name__ == "__main__":
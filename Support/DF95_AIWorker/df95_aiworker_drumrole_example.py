@@ -48,6 +48,8 @@ import sys
 import math
 from typing import Dict, Any, List
 
+from df95_aiworker_name_rules import classify_name
+
 
 def load_job(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
@@ -55,27 +57,11 @@ def load_job(path: str) -> Dict[str, Any]:
 
 
 def guess_drum_role_from_name(name: str) -> str:
-    """Sehr einfache Beispiel-Heuristik – bitte ersetzen durch dein Modell."""
-    s = name.lower()
-    if "kick" in s or " bd" in s or "bassdrum" in s:
-        return "KICK"
-    if "snare" in s or " sd" in s or "snr" in s:
-        return "SNARE"
-    if "hihat" in s or "hi-hat" in s or " hat" in s or " hh" in s:
-        return "HIHAT"
-    if "tom" in s or "tomh" in s or "tomm" in s or "toml" in s or "floor" in s:
-        return "TOM"
-    if "ride" in s:
-        return "RIDE"
-    if "crash" in s or "splash" in s or "china" in s:
-        return "CRASH"
-    if "amb" in s or "room" in s or "atmo" in s or "reverb" in s:
-        return "AMBIENCE"
-    if "fx" in s or "impact" in s or "hit" in s or "whoosh" in s or "rise" in s:
-        return "FX"
-    if "perc" in s or "clap" in s or "shaker" in s or "snap" in s:
-        return "PERC"
-    return ""
+    """Sehr einfache Beispiel-Heuristik – bitte ersetzen durch dein Modell.
+
+    Nutzt die gemeinsame Keyword-Tabelle aus df95_aiworker_name_rules.
+    """
+    return classify_name(name).drum_role
 
 
 def process_job(job: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,227 @@
+"""
+DF95 AIWorker – Feature Store (vorberechnete Mel-Features)
+==========================================================
+
+Training (df95_aiworker_material_train_template.py), Evaluation
+(df95_aiworker_material_eval_helper.py) und Inferenz
+(df95_aiworker_material_model.py) dekodieren, resamplen und
+Mel-transformieren dieselben WAVs. Der Feature Store legt das Ergebnis
+einmal auf Platte ab; weitere Läufe lesen es per memmap, statt erneut
+`torchaudio.load` + Resampling zu bezahlen.
+
+Layout (ein Unterordner pro Feature-Parametersatz):
+
+    Support/DF95_AIWorker/Cache/features/<params_digest>/
+        params.json        sr, mono, n_fft, hop, n_mels, frames
+        index.sqlite       path -> (size, mtime_ns, shard, offset, frames)
+        shard-<pid>-<n>.f32
+
+    Shards sind append-only float32-Dateien, Features liegen darin als
+    [T, n_mels] (row-major) hintereinander. Jeder Prozess schreibt in eigene
+    Shards; der Index (SQLite, WAL) wird geteilt.
+
+Ein Eintrag gilt nur, solange Größe und mtime der Audiodatei unverändert
+sind; ändert sich die Datei, wird beim nächsten Zugriff neu berechnet.
+
+Verwendung:
+
+    store = FeatureStore(feature_params(44100, True, 2048, 512, 64))
+    feat = store.get_or_compute(path, compute)   # compute(path) -> np.ndarray [n_mels, T]
+    store.close()
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from df95_aiworker_result_cache import DEFAULT_CACHE_DIR, config_digest
+
+DEFAULT_FEATURE_DIR = os.path.join(DEFAULT_CACHE_DIR, "features")
+
+# Neue Shard-Datei ab dieser Größe
+SHARD_MAX_BYTES = 256 * 1024 * 1024
+
+
+def feature_params(sample_rate: int, mono: bool, n_fft: int, hop_length: int, n_mels: int,
+                   frames: int = 0) -> Dict[str, Any]:
+    """Parametersatz, der die Features eindeutig beschreibt.
+
+    frames = 0: volle Länge; sonst wird auf genau `frames` Frames gecroppt/gepaddet.
+    """
+    return {
+        "sample_rate": int(sample_rate),
+        "mono": bool(mono),
+        "n_fft": int(n_fft),
+        "hop_length": int(hop_length),
+        "n_mels": int(n_mels),
+        "frames": int(frames),
+    }
+
+
+class FeatureStore:
+    """Persistenter Mel-Feature-Cache (memmap-Shards + SQLite-Index), thread-safe."""
+
+    def __init__(self, params: Dict[str, Any], root: str = DEFAULT_FEATURE_DIR):
+        if np is None:
+            raise RuntimeError("numpy ist nicht installiert – Feature Store nicht verfügbar.")
+
+        self.params = dict(params)
+        self.n_mels = int(self.params["n_mels"])
+        self.dir = os.path.join(root, config_digest(self.params)[:16])
+        os.makedirs(self.dir, exist_ok=True)
+
+        params_path = os.path.join(self.dir, "params.json")
+        if not os.path.isfile(params_path):
+            with open(params_path, "w", encoding="utf-8") as f:
+                json.dump(self.params, f, indent=2, sort_keys=True)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.dir, "index.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS features ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " shard TEXT NOT NULL,"
+            " offset INTEGER NOT NULL,"
+            " frames INTEGER NOT NULL)"
+        )
+        self._pending = 0
+        self._shard_no = 0
+        self._shard_name = ""
+        self._shard = None
+
+    # -- Shards ------------------------------------------------
+
+    def _open_shard(self) -> None:
+        if self._shard is not None:
+            self._shard.close()
+        while True:
+            name = f"shard-{os.getpid()}-{self._shard_no}.f32"
+            self._shard_no += 1
+            path = os.path.join(self.dir, name)
+            if not os.path.exists(path) or os.path.getsize(path) < SHARD_MAX_BYTES:
+                break
+        self._shard_name = name
+        self._shard = open(path, "ab")
+
+    def _append(self, data: bytes) -> tuple:
+        if self._shard is None or self._shard.tell() >= SHARD_MAX_BYTES:
+            self._open_shard()
+        offset = self._shard.tell()
+        self._shard.write(data)
+        return self._shard_name, offset
+
+    # -- Zugriff -----------------------------------------------
+
+    def get(self, path: str) -> Optional["np.ndarray"]:
+        """Features [n_mels, T] (float32) oder None, wenn nicht (mehr) gültig."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = os.path.abspath(path)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, shard, offset, frames FROM features WHERE path = ?", (key,)
+            ).fetchone()
+            if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+                self.misses += 1
+                return None
+            if self._shard is not None and row[2] == self._shard_name:
+                # Eigener, noch offener Shard – Puffer erst auf Platte bringen
+                self._shard.flush()
+            self.hits += 1
+
+        shard_path = os.path.join(self.dir, row[2])
+        frames = int(row[4])
+        try:
+            mm = np.memmap(shard_path, dtype=np.float32, mode="r", offset=int(row[3]),
+                           shape=(frames, self.n_mels))
+        except (OSError, ValueError):
+            return None
+        return np.ascontiguousarray(mm.T)
+
+    def put(self, path: str, feat: "np.ndarray") -> None:
+        """Speichert Features [n_mels, T] für `path` (Größe/mtime zum Zeitpunkt des Aufrufs)."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        feat = np.asarray(feat, dtype=np.float32)
+        if feat.ndim != 2 or feat.shape[0] != self.n_mels:
+            raise ValueError(f"Features müssen [{self.n_mels}, T] sein, nicht {tuple(feat.shape)}")
+        data = np.ascontiguousarray(feat.T).tobytes()
+        with self._lock:
+            shard, offset = self._append(data)
+            self._db.execute(
+                "INSERT OR REPLACE INTO features(path, size, mtime_ns, shard, offset, frames)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(path), st.st_size, st.st_mtime_ns, shard, offset, int(feat.shape[1])),
+            )
+            self._pending += 1
+            if self._pending >= 500:
+                self._flush_locked()
+
+    def get_or_compute(self, path: str, compute: Callable[[str], "np.ndarray"]) -> "np.ndarray":
+        feat = self.get(path)
+        if feat is None:
+            feat = np.asarray(compute(path), dtype=np.float32)
+            self.put(path, feat)
+        return feat
+
+    def _flush_locked(self) -> None:
+        # Shard-Daten vor dem Index committen, damit kein Index-Eintrag ins Leere zeigt
+        if self._shard is not None:
+            self._shard.flush()
+        self._db.commit()
+        self._pending = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            if self._shard is not None:
+                self._shard.close()
+                self._shard = None
+            self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+    def __enter__(self) -> "FeatureStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_feature_store(params: Dict[str, Any], root: str = "") -> Optional[FeatureStore]:
+    """FeatureStore oder None (kein numpy / Ordner nicht beschreibbar) – Aufrufer rechnen dann direkt."""
+    try:
+        return FeatureStore(params, root=root or DEFAULT_FEATURE_DIR)
+    except (RuntimeError, OSError, sqlite3.Error) as e:
+        print(f"[DF95 AIWorker Features] Feature Store nicht verfügbar, rechne ohne: {e}")
+        return None
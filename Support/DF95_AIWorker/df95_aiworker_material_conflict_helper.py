@@ -12,6 +12,11 @@ Typische Fragen:
 
 Es arbeitet komplett *offline* auf JSON-Dateien, unabhängig von REAPER.
 
+Die SampleDB wird streamend gelesen; der daraus gebaute Pfad-Index wird als
+<SampleDB>.df95index abgelegt und wiederverwendet, solange sich die SampleDB
+nicht ändert (siehe df95_aiworker_sampledb_index.py). Mit --sqlite läuft die
+Analyse stattdessen als Join im SQLite-Mirror (df95_aiworker_sampledb_sqlite.py).
+
 Eingaben:
     1) SampleDB JSON (z.B. DF95_SampleDB_Multi_UCS.json)
     2) AIWorker-Result JSON (z.B. DF95_AIWorker_UCSResult_*.json aus dem Material-Mode)
@@ -25,20 +30,41 @@ Ausgaben:
     - CSV-Datei mit detaillierten Konflikten:
         * <ResultPath>_material_conflicts.csv
 
+Batch-Modus (Ordner oder Glob statt einzelner Result-Datei):
+    - SampleDB-Index wird einmal geladen, die Results parallel geparst
+    - pro Pfad zählt genau ein Vorschlag über alle Results:
+        --policy newest      jüngstes Result (created_utc), Default
+        --policy confidence  höchste ai_confidence
+    - eine kombinierte CSV (mit Spalte result_file) + Summary JSON:
+        * <Ordner|--out>/DF95_AIWorker_MaterialConflicts_Combined_material_conflicts.csv
+
 Usage:
     python df95_aiworker_material_conflict_helper.py \
         D:/.../DF95_SampleDB_Multi_UCS.json \
         D:/.../DF95_AIWorker_UCSResult_20251201_120000.json \
         0.6
 
+    python df95_aiworker_material_conflict_helper.py \
+        D:/.../DF95_SampleDB_Multi_UCS.json \
+        D:/.../Support/DF95_AIWorker/Results \
+        0.6 --policy confidence --workers 4
+
 """
 
 import os
 import json
 import csv
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional
 
+from df95_aiworker_sampledb_index import item_path, iter_sampledb_items, load_sampledb_index, norm_path
+
+RESULT_GLOB = "DF95_AIWorker_UCSResult_*.json"
+MERGE_POLICIES = ("newest", "confidence")
+COMBINED_BASENAME = "DF95_AIWorker_MaterialConflicts_Combined"
+
 
 @dataclass
 class Conflict:
@@ -49,29 +75,18 @@ class Conflict:
     new_instrument: str
     ai_confidence: float
     ai_model: str
+    result_file: str = ""
 
 
-def _norm_path(p: str) -> str:
-    p = os.path.abspath(p)
-    p = p.replace("\\", "/").replace("\\", "/").replace("\\", "/")
-    return p.lower()
+_norm_path = norm_path
 
 
 def load_sampledb(path: str) -> Dict[str, dict]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
+    """Vollständige Items (streamend gelesen) nach normalisiertem Pfad."""
     mapping: Dict[str, dict] = {}
-    if isinstance(data, dict) and "items" in data:
-        items = data.get("items") or []
-    elif isinstance(data, list):
-        items = data
-    else:
-        items = []
-
-    for it in items:
+    for it in iter_sampledb_items(path):
         # Versuche verschiedene Felder, die einen Pfad enthalten könnten
-        cand = it.get("full_path") or it.get("path") or it.get("file") or ""
+        cand = item_path(it)
         if not cand:
             continue
         key = _norm_path(cand)
@@ -89,12 +104,12 @@ def load_result(path: str) -> List[dict]:
     return results
 
 
-def analyze_conflicts(sampledb_path: str, result_path: str, min_conf: float = 0.5,
-                    from_filter: str = "", to_filter: str = ""):
-    db_map = load_sampledb(sampledb_path)
-    results = load_result(result_path)
+def _classify(db_map, proposals, min_conf: float, from_filter: str, to_filter: str) -> dict:
+    """Gleicht Vorschläge gegen die SampleDB ab.
 
-    total_results = len(results)
+    proposals: Iterable von (key, full_path, new_mat, new_ins, ai_conf, ai_model, result_file),
+    Material/Instrument bereits normalisiert (strip + upper).
+    """
     matched = 0
     unmatched = 0
     conflicts: List[Conflict] = []
@@ -104,12 +119,7 @@ def analyze_conflicts(sampledb_path: str, result_path: str, min_conf: float = 0.
     from_filter_l = (from_filter or "").strip().upper()
     to_filter_l = (to_filter or "").strip().upper()
 
-
-    for res in results:
-        full = res.get("full_path") or ""
-        if not full:
-            continue
-        key = _norm_path(full)
+    for key, full, new_mat, new_ins, ai_conf, ai_model, source in proposals:
         item = db_map.get(key)
         if not item:
             unmatched += 1
@@ -119,10 +129,6 @@ def analyze_conflicts(sampledb_path: str, result_path: str, min_conf: float = 0.
 
         old_mat = (item.get("df95_material") or "").strip().upper()
         old_ins = (item.get("df95_instrument") or "").strip().upper()
-        new_mat = (res.get("df95_material") or "").strip().upper()
-        new_ins = (res.get("df95_instrument") or "").strip().upper()
-        ai_conf = float(res.get("ai_confidence") or 0.0)
-        ai_model = str(res.get("ai_model") or "")
 
         # Nur sinnvolle neuen Material-Vorschläge berücksichtigen
         if not new_mat and not new_ins:
@@ -140,6 +146,7 @@ def analyze_conflicts(sampledb_path: str, result_path: str, min_conf: float = 0.
                 new_instrument=new_ins,
                 ai_confidence=ai_conf,
                 ai_model=ai_model,
+                result_file=source,
             ))
         else:
             # Potentieller Konflikt-Check
@@ -161,12 +168,12 @@ def analyze_conflicts(sampledb_path: str, result_path: str, min_conf: float = 0.
                     new_instrument=new_ins,
                     ai_confidence=ai_conf,
                     ai_model=ai_model,
+                    result_file=source,
                 ))
                 key_pair = (old_mat or "<EMPTY>", new_mat or "<EMPTY>")
                 conflict_pairs[key_pair] = conflict_pairs.get(key_pair, 0) + 1
 
     return {
-        "total_results": total_results,
         "matched": matched,
         "unmatched": unmatched,
         "conflicts": conflicts,
@@ -175,33 +182,167 @@ def analyze_conflicts(sampledb_path: str, result_path: str, min_conf: float = 0.
     }
 
 
-def write_conflicts_csv(result_path: str, conflicts: List[Conflict], proposed_new: List[Conflict]) -> str:
+def _proposal(res: dict, source: str = ""):
+    full = res.get("full_path") or ""
+    return (
+        _norm_path(full),
+        full,
+        (res.get("df95_material") or "").strip().upper(),
+        (res.get("df95_instrument") or "").strip().upper(),
+        float(res.get("ai_confidence") or 0.0),
+        str(res.get("ai_model") or ""),
+        source,
+    )
+
+
+def analyze_conflicts(sampledb_path: str, result_path: str, min_conf: float = 0.5,
+                    from_filter: str = "", to_filter: str = ""):
+    # Kompakter Index (Sidecar <SampleDB>.df95index, solange die SampleDB unverändert ist)
+    db_map = load_sampledb_index(sampledb_path)
+    results = load_result(result_path)
+
+    stats = _classify(
+        db_map,
+        (_proposal(res) for res in results if res.get("full_path")),
+        min_conf, from_filter, to_filter,
+    )
+    stats["total_results"] = len(results)
+    return stats
+
+
+# ------------------------------------------------------------
+# Batch: viele Results gegen eine SampleDB
+# ------------------------------------------------------------
+
+def _result_created(path: str, data) -> str:
+    created = data.get("created_utc") if isinstance(data, dict) else None
+    if isinstance(created, str) and created:
+        return created
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(os.path.getmtime(path)))
+
+
+def _load_result_compact(path: str):
+    """Worker: Result-Datei -> (created_utc, Anzahl Results, [Vorschlag, ...])."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, list):
+        raise RuntimeError(f"Result-JSON hat kein erwartetes Feld 'results' (Liste): {path}")
+    proposals = [_proposal(res, path) for res in results if isinstance(res, dict) and res.get("full_path")]
+    return _result_created(path, data), len(results), proposals
+
+
+def merge_proposals(loaded, policy: str = "newest") -> Dict[str, tuple]:
+    """Ein Vorschlag pro Pfad über alle Results.
+
+    policy "newest":     Vorschlag aus dem jüngsten Result (created_utc bzw. mtime)
+    policy "confidence": Vorschlag mit der höchsten ai_confidence (bei Gleichstand der jüngere)
+    Leere Vorschläge (weder Material noch Instrument) verdrängen keine echten.
+    """
+    if policy not in MERGE_POLICIES:
+        raise ValueError(f"Unbekannte Merge-Policy: {policy} (erlaubt: {', '.join(MERGE_POLICIES)})")
+    best: Dict[str, tuple] = {}
+    ranks: Dict[str, tuple] = {}
+    for created, _total, proposals in sorted(loaded, key=lambda x: x[0]):
+        for prop in proposals:
+            has = bool(prop[2] or prop[3])
+            rank = (has, created, prop[4]) if policy == "newest" else (has, prop[4], created)
+            key = prop[0]
+            if key not in ranks or rank >= ranks[key]:
+                ranks[key] = rank
+                best[key] = prop
+    return best
+
+
+def analyze_conflicts_multi(sampledb_path: str, result_paths: List[str], min_conf: float = 0.5,
+                            from_filter: str = "", to_filter: str = "",
+                            policy: str = "newest", workers: int = 0):
+    """Konfliktanalyse über viele Results; SampleDB-Index wird nur einmal geladen.
+
+    Die Result-Dateien werden parallel in Prozessen geparst (workers, 0 = Anzahl
+    CPUs, max. 8), währenddessen lädt der Hauptprozess den SampleDB-Index.
+    """
+    paths = sorted(result_paths)
+    workers = workers or min(8, os.cpu_count() or 1)
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            futures = [pool.submit(_load_result_compact, p) for p in paths]
+            db_map = load_sampledb_index(sampledb_path)
+            loaded = [fut.result() for fut in futures]
+    else:
+        db_map = load_sampledb_index(sampledb_path)
+        loaded = [_load_result_compact(p) for p in paths]
+
+    merged = merge_proposals(loaded, policy)
+    stats = _classify(db_map, merged.values(), min_conf, from_filter, to_filter)
+    stats["total_results"] = sum(total for _created, total, _props in loaded)
+    stats["num_result_files"] = len(paths)
+    stats["unique_paths"] = len(merged)
+    stats["policy"] = policy
+    return stats
+
+
+def analyze_conflicts_sqlite(sampledb_path: str, result_path: str, min_conf: float = 0.5,
+                             from_filter: str = "", to_filter: str = "", mirror_path: str = ""):
+    """Wie analyze_conflicts(), aber als indizierter Join im SQLite-Mirror.
+
+    SampleDB und Result werden vorher inkrementell in den Mirror übernommen
+    (unveränderte Dateien kosten nur einen stat()).
+    """
+    from df95_aiworker_sampledb_sqlite import DEFAULT_MIRROR_PATH, SampleDBMirror
+
+    with SampleDBMirror(mirror_path or DEFAULT_MIRROR_PATH) as mirror:
+        mirror.sync_sampledb(sampledb_path)
+        mirror.sync_result(result_path)
+        data = mirror.conflict_rows(result_path, min_conf, from_filter, to_filter)
+
+    conflicts: List[Conflict] = []
+    proposed_new: List[Conflict] = []
+    conflict_pairs: Dict[Tuple[str, str], int] = {}
+    for kind, full, old_mat, new_mat, old_ins, new_ins, ai_conf, ai_model in data["rows"]:
+        c = Conflict(full, old_mat, new_mat, old_ins, new_ins, float(ai_conf), ai_model)
+        if kind == "proposed_new":
+            proposed_new.append(c)
+        else:
+            conflicts.append(c)
+            key_pair = (old_mat or "<EMPTY>", new_mat or "<EMPTY>")
+            conflict_pairs[key_pair] = conflict_pairs.get(key_pair, 0) + 1
+
+    return {
+        "total_results": data["total_results"],
+        "matched": data["matched"],
+        "unmatched": data["unmatched"],
+        "conflicts": conflicts,
+        "proposed_new": proposed_new,
+        "conflict_pairs": conflict_pairs,
+    }
+
+
+def write_conflicts_csv(result_path: str, conflicts: List[Conflict], proposed_new: List[Conflict],
+                        with_source: bool = False) -> str:
+    """CSV <ResultPath>_material_conflicts.csv; with_source ergänzt die Spalte result_file (Batch)."""
     base = os.path.splitext(result_path)[0]
     out_path = f"{base}_material_conflicts.csv"
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
     with open(out_path, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
-        w.writerow([
+        header = [
             "type", "full_path",
             "old_material", "new_material",
             "old_instrument", "new_instrument",
             "ai_confidence", "ai_model",
-        ])
-        for c in conflicts:
-            w.writerow([
-                "conflict", c.full_path,
-                c.old_material, c.new_material,
-                c.old_instrument, c.new_instrument,
-                f"{c.ai_confidence:.3f}", c.ai_model,
-            ])
-        for c in proposed_new:
-            w.writerow([
-                "proposed_new", c.full_path,
-                c.old_material, c.new_material,
-                c.old_instrument, c.new_instrument,
-                f"{c.ai_confidence:.3f}", c.ai_model,
-            ])
+        ]
+        w.writerow(header + ["result_file"] if with_source else header)
+        for kind, rows in (("conflict", conflicts), ("proposed_new", proposed_new)):
+            for c in rows:
+                row = [
+                    kind, c.full_path,
+                    c.old_material, c.new_material,
+                    c.old_instrument, c.new_instrument,
+                    f"{c.ai_confidence:.3f}", c.ai_model,
+                ]
+                w.writerow(row + [c.result_file] if with_source else row)
 
     return out_path
 
@@ -214,6 +355,7 @@ def write_summary_json(result_path: str, stats: dict, min_conf: float, from_filt
       - overall: total_results, matched, unmatched, num_conflicts, num_proposed_new, min_conf
       - filters: from_filter, to_filter
       - pairs: Liste von { "old": ..., "new": ..., "count": N }
+      - sources (nur Batch): policy, num_result_files, unique_paths
     """
     base = os.path.splitext(result_path)[0]
     out_path = f"{base}_material_conflicts_summary.json"
@@ -244,6 +386,12 @@ def write_summary_json(result_path: str, stats: dict, min_conf: float, from_filt
         },
         "pairs": pair_list,
     }
+    if "num_result_files" in stats:
+        payload["sources"] = {
+            "policy": stats.get("policy", ""),
+            "num_result_files": int(stats["num_result_files"]),
+            "unique_paths": int(stats.get("unique_paths", 0)),
+        }
 
     with open(out_path, "w", encoding="utf-8") as f:
         json.dump(payload, f, indent=2)
@@ -259,6 +407,9 @@ def print_report(sampledb_path: str, result_path: str, min_conf: float, stats: d
     print(f"Result   : {result_path}")
     print(f"Min Conf : {min_conf:.2f}")
     print("")
+    if "num_result_files" in stats:
+        print(f"Result-Files  : {stats['num_result_files']} (Policy: {stats['policy']})")
+        print(f"Unique Paths  : {stats['unique_paths']}")
     print(f"Total Results : {stats['total_results']}")
     print(f"Matched Items : {stats['matched']}")
     print(f"Unmatched     : {stats['unmatched']}")
@@ -278,27 +429,58 @@ def print_report(sampledb_path: str, result_path: str, min_conf: float, stats: d
 
 def main():
     import sys
-    if len(sys.argv) < 3:
-        print("Usage: python df95_aiworker_material_conflict_helper.py <sampledb_json> <result_json> [min_confidence] [from_material] [to_material]")
+    args = list(sys.argv)
+    use_sqlite = "--sqlite" in args
+    if use_sqlite:
+        args.remove("--sqlite")
+    opts = {"--policy": "", "--workers": "0", "--out": ""}
+    for opt in opts:
+        if opt in args:
+            i = args.index(opt)
+            opts[opt] = args[i + 1]
+            del args[i:i + 2]
+    if len(args) < 3:
+        print("Usage: python df95_aiworker_material_conflict_helper.py <sampledb_json> <result_json|results_dir|glob> "
+              "[min_confidence] [from_material] [to_material] [--sqlite] [--policy newest|confidence] [--workers N] [--out DIR]")
         sys.exit(1)
 
-    sampledb_path = sys.argv[1]
-    result_path = sys.argv[2]
-    if len(sys.argv) >= 4:
+    sampledb_path = args[1]
+    result_path = args[2]
+    if len(args) >= 4:
         try:
-            min_conf = float(sys.argv[3])
+            min_conf = float(args[3])
         except ValueError:
             min_conf = 0.5
     else:
         min_conf = 0.5
 
-    from_filter = sys.argv[4] if len(sys.argv) >= 5 else ""
-    to_filter = sys.argv[5] if len(sys.argv) >= 6 else ""
-
-    stats = analyze_conflicts(sampledb_path, result_path, min_conf=min_conf, from_filter=from_filter, to_filter=to_filter)
-    csv_path = write_conflicts_csv(result_path, stats["conflicts"], stats["proposed_new"])
-    summary_path = write_summary_json(result_path, stats, min_conf, from_filter, to_filter)
-    print_report(sampledb_path, result_path, min_conf, stats)
+    from_filter = args[4] if len(args) >= 5 else ""
+    to_filter = args[5] if len(args) >= 6 else ""
+
+    batch = os.path.isdir(result_path) or any(ch in result_path for ch in "*?[") or bool(opts["--policy"])
+    if batch:
+        from df95_aiworker_sampledb_sqlite import expand_result_paths
+
+        if use_sqlite:
+            print("[DF95 AIWorker Material] --sqlite gilt nur für einzelne Results – Batch nutzt den Index.")
+        paths = expand_result_paths([result_path], RESULT_GLOB)
+        if not paths:
+            print(f"[DF95 AIWorker Material] Keine Result-Dateien gefunden: {result_path}")
+            sys.exit(1)
+        out_dir = opts["--out"] or (result_path if os.path.isdir(result_path) else os.path.dirname(paths[0]))
+        report_path = os.path.join(out_dir, COMBINED_BASENAME + ".json")
+        stats = analyze_conflicts_multi(sampledb_path, paths, min_conf=min_conf, from_filter=from_filter,
+                                        to_filter=to_filter, policy=opts["--policy"] or "newest",
+                                        workers=int(opts["--workers"]))
+        csv_path = write_conflicts_csv(report_path, stats["conflicts"], stats["proposed_new"], with_source=True)
+        summary_path = write_summary_json(report_path, stats, min_conf, from_filter, to_filter)
+        print_report(sampledb_path, f"{result_path} ({len(paths)} Dateien)", min_conf, stats)
+    else:
+        analyze = analyze_conflicts_sqlite if use_sqlite else analyze_conflicts
+        stats = analyze(sampledb_path, result_path, min_conf=min_conf, from_filter=from_filter, to_filter=to_filter)
+        csv_path = write_conflicts_csv(result_path, stats["conflicts"], stats["proposed_new"])
+        summary_path = write_summary_json(result_path, stats, min_conf, from_filter, to_filter)
+        print_report(sampledb_path, result_path, min_conf, stats)
     print(f"Details als CSV: {csv_path}")
     print(f"Summary  als JSON: {summary_path}")
 
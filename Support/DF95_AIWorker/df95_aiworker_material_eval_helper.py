@@ -10,8 +10,14 @@ Ziele:
     - Evaluiere ihn auf einem CSV-Datenset (gleiche Struktur wie beim Training).
     - Berechne:
         * Overall Accuracy
-        * Per-Class Accuracy
+        * Per-Class Accuracy, Precision, Recall, F1
         * Konfusionsmatrix (als Text)
+        * Durchsatz (files/s, Decode- vs. Modell-Zeit)
+    - Batched: paralleles Laden der Features (Thread-Pool, Feature Store),
+      Modell auf Batches (--batch N, --workers N).
+    - Statt des .pt auch ein TorchScript-Artefakt (.ts.pt, siehe
+      df95_aiworker_material_torchscript.py) – und mit --compare zwei
+      Modelle auf derselben CSV gegeneinander: Accuracy-Delta und Speedup.
     - Drucke ein kompaktes Reporting, das dir sagt:
         "Wie gut erkennt das Modell WOOD, METAL, DRUM, ...?"
 
@@ -21,23 +27,23 @@ Wichtig:
       es eigenständig im Python-Umfeld ausführen.
 
 Usage (Beispiel):
-    python df95_aiworker_material_eval_helper.py path/to/test.csv path/to/checkpoints/material_ckpt.pt
+    python df95_aiworker_material_eval_helper.py path/to/test.csv path/to/checkpoints/material_ckpt.pt [--batch 32] [--workers 4]
+    python df95_aiworker_material_eval_helper.py path/to/test.csv checkpoints/material_ckpt.pt --compare checkpoints/material_ckpt.ts.pt
 
 """
 
 import os
 import csv
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import List, Dict, Any
 
-try:
-    import torch
-    import torchaudio
-except ImportError:
-    torch = None
-    torchaudio = None
+# NumPy ist Pflicht (Konfusionsmatrix, Metriken) – kommt ohnehin mit torch
+import numpy as np
 
-# Wir nutzen die gleichen Helfer wie das Training:
+# Wir nutzen die gleichen Helfer wie das Training (torch lädt require_torch()):
+import df95_aiworker_material_train_template as train_template
 from df95_aiworker_material_train_template import (
     TrainSample,
     load_dataset_from_csv,
@@ -45,8 +51,14 @@ from df95_aiworker_material_train_template import (
     TrainConfig,
     load_waveform,
     waveform_to_features,
-    SimpleConvNet,
+    load_features,
+    open_store_for,
+    build_model,
+    predict_logits_windowed,
+    ARCH_V1,
+    require_torch,
 )
+from df95_aiworker_material_torchscript import read_meta, load_torchscript
 
 
 @dataclass
@@ -55,11 +67,45 @@ class EvalResult:
     per_class_accuracy: Dict[str, float]
     confusion: Dict[str, Dict[str, int]]
     num_samples: int
-
-
-def evaluate_material_model(csv_path: str, ckpt_path: str) -> EvalResult:
-    if torch is None or torchaudio is None:
+    per_class_precision: Dict[str, float] = field(default_factory=dict)
+    per_class_recall: Dict[str, float] = field(default_factory=dict)
+    per_class_f1: Dict[str, float] = field(default_factory=dict)
+    throughput: Dict[str, float] = field(default_factory=dict)
+
+
+def confusion_from_predictions(y_true, y_pred, num_classes: int):
+    """Konfusionsmatrix [true, pred] als NumPy-Array über ein einziges bincount."""
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_pred = np.asarray(y_pred, dtype=np.int64)
+    flat = np.bincount(y_true * num_classes + y_pred, minlength=num_classes * num_classes)
+    return flat.reshape(num_classes, num_classes)
+
+
+def precision_recall_f1(cm):
+    """Per-Class Precision/Recall/F1 aus einer Konfusionsmatrix (0.0 bei leeren Klassen)."""
+    tp = np.diag(cm).astype(np.float64)
+    pred_total = cm.sum(axis=0).astype(np.float64)
+    true_total = cm.sum(axis=1).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(pred_total > 0, tp / pred_total, 0.0)
+        recall = np.where(true_total > 0, tp / true_total, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return precision, recall, f1
+
+
+def evaluate_material_model(csv_path: str, ckpt_path: str, use_feature_store: bool = True,
+                            batch_size: int = 32, decode_workers: int = 0) -> EvalResult:
+    """Evaluiert einen Checkpoint (oder ein TorchScript-Artefakt) auf einer CSV.
+
+    Features werden in einem Thread-Pool geladen (decode_workers, 0 = Anzahl
+    CPUs, max. 8) – über den Feature Store und ein einmal gebautes
+    Mel-Front-End –, das Modell rechnet auf Batches von `batch_size` Clips.
+    batch_size=1, decode_workers=1 entspricht der früheren Sample-für-Sample-
+    Auswertung.
+    """
+    if not require_torch():
         raise RuntimeError("PyTorch/torchaudio sind nicht installiert – Evaluation nicht möglich.")
+    torch = train_template.torch
 
     if not os.path.isfile(ckpt_path):
         raise RuntimeError(f"Checkpoint nicht gefunden: {ckpt_path}")
@@ -76,10 +122,17 @@ def evaluate_material_model(csv_path: str, ckpt_path: str) -> EvalResult:
     enc = LabelEncoder()
     enc.fit(material_labels)
 
-    # Checkpoint laden
-    ckpt = torch.load(ckpt_path, map_location="cpu")
-    classes = ckpt.get("material_classes") or []
-    cfg = ckpt.get("config") or {}
+    ts_meta = read_meta(ckpt_path)
+    if ts_meta is not None:
+        # Optimiertes TorchScript-Artefakt (df95_aiworker_material_torchscript): nur CPU
+        model, ts_meta = load_torchscript(ckpt_path)
+        classes = ts_meta.get("material_classes") or []
+        cfg = ts_meta.get("config") or {}
+    else:
+        # Checkpoint laden
+        ckpt = torch.load(ckpt_path, map_location="cpu")
+        classes = ckpt.get("material_classes") or []
+        cfg = ckpt.get("config") or {}
     sample_rate = cfg.get("sample_rate", 44100)
     mono = bool(cfg.get("mono", True))
 
@@ -87,94 +140,108 @@ def evaluate_material_model(csv_path: str, ckpt_path: str) -> EvalResult:
     num_classes = len(classes)
     if num_classes == 0:
         raise RuntimeError("Checkpoint enthält keine material_classes.")
+    window = int(cfg.get("window_frames", 64))
 
-    model = SimpleConvNet(num_classes=num_classes)
-    state = ckpt.get("model_state")
-    if state is None:
-        raise RuntimeError("Checkpoint enthält keinen model_state.")
-    model.load_state_dict(state)
-    model.eval()
+    if ts_meta is None:
+        model = build_model(cfg.get("arch") or ARCH_V1, num_classes)
+        state = ckpt.get("model_state")
+        if state is None:
+            raise RuntimeError("Checkpoint enthält keinen model_state.")
+        model.load_state_dict(state)
+        model.eval()
 
-    if torch.cuda.is_available():
+    if ts_meta is None and torch.cuda.is_available():
         device = "cuda"
         model.to(device)
     else:
         device = "cpu"
 
-    # Confusion-Setup
-    confusion: Dict[str, Dict[str, int]] = {}
-    for c in classes:
-        confusion[c] = {c2: 0 for c2 in classes}
-
-    total = 0
-    correct = 0
-
-    # Evaluation (simple: Sample für Sample)
-    for s in samples:
-        true_label = s.material
-        if true_label not in classes:
-            # Sample hat Label, das im Checkpoint nicht existiert – überspringen
-            continue
+    # Nur Samples mit Label, das im Checkpoint existiert
+    class_index = {c: i for i, c in enumerate(classes)}
+    todo = [(s.audio_path, class_index[s.material]) for s in samples if s.material in class_index]
+
+    # Features über den gemeinsamen Feature Store (gleiche Parameter wie beim Training)
+    feat_cfg = TrainConfig(
+        csv_path=csv_path,
+        checkpoint_out=ckpt_path,
+        sample_rate=sample_rate,
+        mono=mono,
+        use_feature_store=use_feature_store,
+    )
+    store = open_store_for(feat_cfg)
 
+    def load(path: str):
+        t0 = time.perf_counter()
         try:
-            wav, sr = torchaudio.load(s.audio_path)
+            feat = load_features(path, feat_cfg, store)  # [1,M,T]
         except Exception as e:
-            print(f"[WARN] Konnte Audio nicht laden: {s.audio_path} ({e})")
-            continue
-
-        if mono and wav.shape[0] > 1:
-            wav = wav.mean(dim=0, keepdim=True)
-        if sr != sample_rate:
-            wav = torchaudio.functional.resample(wav, sr, sample_rate)
-
-        mel = torchaudio.transforms.MelSpectrogram(
-            sample_rate=sample_rate,
-            n_fft=2048,
-            hop_length=512,
-            n_mels=64,
-        )(wav)
-        db = torchaudio.transforms.AmplitudeToDB()(mel)
-        x = db.unsqueeze(0)  # [1,1,M,T]
-
-        x = x.to(device)
-        with torch.no_grad():
-            logits = model(x)
-            probs = torch.softmax(logits, dim=1)
-            _, idx = torch.max(probs, dim=1)
-            idx = int(idx.item())
-
-        if idx < 0 or idx >= len(classes):
-            continue
-
-        pred_label = classes[idx]
-
-        total += 1
-        if pred_label == true_label:
-            correct += 1
-
-        confusion[true_label][pred_label] += 1
-
+            print(f"[WARN] Konnte Audio nicht laden: {path} ({e})")
+            feat = None
+        return feat, time.perf_counter() - t0
+
+    y_true: List[int] = []
+    y_pred: List[int] = []
+    decode_time = 0.0
+    model_time = 0.0
+    batch_size = max(1, int(batch_size))
+    workers = decode_workers or min(8, os.cpu_count() or 1)
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(todo), batch_size):
+            chunk = todo[start:start + batch_size]
+            feats = []
+            targets = []
+            for (path, target), (feat, dt) in zip(chunk, pool.map(load, [p for p, _ in chunk])):
+                decode_time += dt
+                if feat is not None:
+                    feats.append(feat)
+                    targets.append(target)
+            if not feats:
+                continue
+
+            t0 = time.perf_counter()
+            with torch.inference_mode():
+                # Fensterweise (beliebige Clip-Länge), Logits pro Clip gemittelt
+                logits = predict_logits_windowed(model, feats, window=window, device=device)
+                pred = torch.argmax(logits, dim=1).cpu().tolist()
+            model_time += time.perf_counter() - t0
+
+            y_true.extend(targets)
+            y_pred.extend(pred)
+    wall = time.perf_counter() - t_start
+
+    if store is not None:
+        store.close()
+
+    total = len(y_true)
     if total == 0:
         raise RuntimeError("Keine gültigen Samples für Evaluation – bitte CSV und Pfade prüfen.")
 
-    overall_acc = correct / total
+    cm = confusion_from_predictions(y_true, y_pred, num_classes)
+    precision, recall, f1 = precision_recall_f1(cm)
+    overall_acc = float(np.trace(cm)) / total
 
-    # Per-Class Accuracy
-    per_class_acc: Dict[str, float] = {}
-    for c_true in classes:
-        row = confusion[c_true]
-        c_total = sum(row.values())
-        if c_total > 0:
-            c_correct = row.get(c_true, 0)
-            per_class_acc[c_true] = c_correct / c_total
-        else:
-            per_class_acc[c_true] = 0.0
+    confusion = {c_true: {c_pred: int(cm[i, j]) for j, c_pred in enumerate(classes)}
+                 for i, c_true in enumerate(classes)}
 
     return EvalResult(
         overall_accuracy=overall_acc,
-        per_class_accuracy=per_class_acc,
+        # Per-Class Accuracy = Recall der Klasse
+        per_class_accuracy={c: float(recall[i]) for i, c in enumerate(classes)},
         confusion=confusion,
         num_samples=total,
+        per_class_precision={c: float(precision[i]) for i, c in enumerate(classes)},
+        per_class_recall={c: float(recall[i]) for i, c in enumerate(classes)},
+        per_class_f1={c: float(f1[i]) for i, c in enumerate(classes)},
+        throughput={
+            "files_per_sec": total / wall if wall > 0 else 0.0,
+            "wall_sec": wall,
+            "decode_sec": decode_time,
+            "model_sec": model_time,
+            "decode_workers": float(workers),
+            "batch_size": float(batch_size),
+        },
     )
 
 
@@ -184,14 +251,25 @@ def print_eval_report(res: EvalResult) -> None:
     print("============================================================")
     print(f"Samples (gültig): {res.num_samples}")
     print(f"Overall-Accuracy: {res.overall_accuracy*100:.2f}%")
+    if res.throughput:
+        t = res.throughput
+        print(f"Durchsatz:        {t['files_per_sec']:.1f} files/s  "
+              f"(wall {t['wall_sec']:.2f}s, decode {t['decode_sec']:.2f}s über "
+              f"{int(t['decode_workers'])} Threads, model {t['model_sec']:.2f}s, batch {int(t['batch_size'])})")
     print("")
     print("Per-Class Accuracy:")
     for cls, acc in sorted(res.per_class_accuracy.items(), key=lambda x: x[0]):
         print(f"  {cls:12s}: {acc*100:5.2f}%")
+    if res.per_class_f1:
+        print("")
+        print("Per-Class Precision / Recall / F1:")
+        for cls in sorted(res.per_class_f1):
+            print(f"  {cls:12s}: P {res.per_class_precision[cls]*100:6.2f}%  "
+                  f"R {res.per_class_recall[cls]*100:6.2f}%  F1 {res.per_class_f1[cls]*100:6.2f}%")
     print("")
     print("Confusion Matrix (Counts):")
     classes = sorted(res.confusion.keys())
-    header = "true\pred".ljust(12) + " " + " ".join(c[:6].rjust(7) for c in classes)
+    header = "true\\pred".ljust(12) + " " + " ".join(c[:6].rjust(7) for c in classes)
     print(header)
     for t in classes:
         row = res.confusion[t]
@@ -202,16 +280,77 @@ def print_eval_report(res: EvalResult) -> None:
     print("============================================================")
 
 
+def compare_checkpoints(csv_path: str, base_path: str, other_path: str, batch_size: int = 32,
+                        decode_workers: int = 0):
+    """Evaluiert zwei Modelle auf derselben CSV -> (base, other, Delta-Dict).
+
+    Beide Modelle laufen einmal zum Aufwärmen (Feature Store, TorchScript-
+    Profiling-Läufe), gemessen wird der zweite Durchlauf; der Speedup basiert
+    auf model_sec, damit Decode-Effekte ihn nicht verwässern.
+    """
+    for path in (base_path, other_path):
+        evaluate_material_model(csv_path, path, batch_size=batch_size, decode_workers=decode_workers)
+    base = evaluate_material_model(csv_path, base_path, batch_size=batch_size, decode_workers=decode_workers)
+    other = evaluate_material_model(csv_path, other_path, batch_size=batch_size, decode_workers=decode_workers)
+
+    def macro_f1(res: EvalResult) -> float:
+        return sum(res.per_class_f1.values()) / max(1, len(res.per_class_f1))
+
+    base_model = base.throughput["model_sec"]
+    other_model = other.throughput["model_sec"]
+    delta = {
+        "accuracy_pp": (other.overall_accuracy - base.overall_accuracy) * 100.0,
+        "macro_f1_pp": (macro_f1(other) - macro_f1(base)) * 100.0,
+        "model_speedup": base_model / other_model if other_model > 0 else 0.0,
+        "files_per_sec_base": base.throughput["files_per_sec"],
+        "files_per_sec_other": other.throughput["files_per_sec"],
+    }
+    return base, other, delta
+
+
+def print_comparison(base: EvalResult, other: EvalResult, delta: Dict[str, float]) -> None:
+    print("============================================================")
+    print(" DF95 AIWorker Material – Modellvergleich (gleiche CSV)")
+    print("============================================================")
+    print(f"Samples:          {base.num_samples} / {other.num_samples}")
+    print(f"Accuracy:         {base.overall_accuracy*100:.2f}% -> {other.overall_accuracy*100:.2f}%  "
+          f"({delta['accuracy_pp']:+.2f} pp)")
+    print(f"Macro-F1:         {delta['macro_f1_pp']:+.2f} pp")
+    print(f"Modellzeit:       {base.throughput['model_sec']*1000:.1f} ms -> "
+          f"{other.throughput['model_sec']*1000:.1f} ms  (Speedup x{delta['model_speedup']:.2f})")
+    print(f"Durchsatz:        {delta['files_per_sec_base']:.1f} -> {delta['files_per_sec_other']:.1f} files/s")
+    print("============================================================")
+
+
 def main():
     import sys
     if len(sys.argv) < 3:
-        print("Usage: python df95_aiworker_material_eval_helper.py <test_csv> <checkpoint.pt>")
+        print("Usage: python df95_aiworker_material_eval_helper.py <test_csv> <checkpoint.pt|.ts.pt> "
+              "[--batch N] [--workers N] [--compare <other.pt|.ts.pt>]")
         sys.exit(1)
 
-    csv_path = sys.argv[1]
-    ckpt_path = sys.argv[2]
-
-    res = evaluate_material_model(csv_path, ckpt_path)
+    args = list(sys.argv[1:])
+    compare_path = ""
+    if "--compare" in args:
+        i = args.index("--compare")
+        compare_path = args[i + 1]
+        del args[i:i + 2]
+    opts = {"--batch": 32, "--workers": 0}
+    for opt in opts:
+        if opt in args:
+            i = args.index(opt)
+            opts[opt] = int(args[i + 1])
+            del args[i:i + 2]
+    csv_path = args[0]
+    ckpt_path = args[1]
+
+    if compare_path:
+        print_comparison(*compare_checkpoints(csv_path, ckpt_path, compare_path, batch_size=opts["--batch"],
+                                              decode_workers=opts["--workers"]))
+        return
+
+    res = evaluate_material_model(csv_path, ckpt_path, batch_size=opts["--batch"],
+                                  decode_workers=opts["--workers"])
     print_eval_report(res)
 
 
@@ -9,34 +9,185 @@ Die zentrale Funktion ist:
 
     predict_for_file(path: str) -> dict
 
+bzw. für viele Dateien (gestapelte Modell-Batches, paralleles Dekodieren):
+
+    predict_for_files(paths, batch_size=16) -> list[dict]
+
 Sie liefert ein Dictionary mit allen Feldern, die der DF95-AIWorker
 bei worker_mode == "material" erwartet (oder optional versteht).
+
+torch/torchaudio (und NumPy, Audio-I/O, Feature Store) werden erst auf dem
+Modell-Pfad importiert – und nur, wenn ein Checkpoint existiert. Ohne
+Checkpoint bleibt es bei der Dateinamen-Heuristik, der Import dieses Moduls
+kostet dann nur Millisekunden.
+
+Ohne torch (Render-Nodes) rechnet dasselbe Modell über die NumPy-Runtime
+(df95_aiworker_material_numpy.py) aus checkpoints/material_ckpt.npz:
+
+    python df95_aiworker_material_numpy.py export checkpoints/material_ckpt.pt
+
+Schneller auf der CPU rechnet das optimierte TorchScript-Artefakt
+(df95_aiworker_material_torchscript.py: Conv+BN+ReLU fusioniert,
+channels_last, int8-Linear-Head) aus checkpoints/material_ckpt.ts.pt:
+
+    python df95_aiworker_material_torchscript.py export checkpoints/material_ckpt.pt --validate test.csv
+
+RUNTIME wählt: "auto" (TorchScript-Artefakt, falls es zum aktuellen .pt passt,
+sonst torch mit .pt, sonst .npz), "torchscript", "torch" (Eager-Modell aus
+dem .pt) oder "numpy" (erzwingt das .npz, torch wird nie importiert).
 """
 
 from __future__ import annotations
+import importlib.util
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional
 
-# Optional: echtes Modell-Backend (PyTorch + torchaudio)
-try:
-    import torch
-    import torchaudio
-except ImportError:
-    torch = None
-    torchaudio = None
+from df95_aiworker_result_cache import file_fingerprint
+from df95_aiworker_name_rules import DEFAULT_RULES_CONFIG_PATH, classify_name, load_rules_from_config
+import df95_aiworker_name_rules as name_rules
+
+# Optional: echtes Modell-Backend (PyTorch + torchaudio), geladen von _ml_backend()
+torch = None
+torchaudio = None
+_TORCH_TRIED = False
 
 # Standard-Pfad für den Material-Checkpoint (kannst du anpassen)
 _DEFAULT_CKPT_PATH = os.path.join(os.path.dirname(__file__), "checkpoints", "material_ckpt.pt")
+# Torch-freier Export desselben Modells (df95_aiworker_material_numpy.py export)
+_DEFAULT_NPZ_PATH = os.path.join(os.path.dirname(__file__), "checkpoints", "material_ckpt.npz")
+_NUMPY_RUNTIME_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "df95_aiworker_material_numpy.py")
+# Optimiertes TorchScript-Artefakt (df95_aiworker_material_torchscript.py export)
+_DEFAULT_TS_PATH = os.path.join(os.path.dirname(__file__), "checkpoints", "material_ckpt.ts.pt")
+
+# "auto" | "torchscript" | "torch" | "numpy" (siehe Modul-Docstring)
+RUNTIME = "auto"
+_RUNTIME_LOADED = ""  # "torchscript" | "torch" | "numpy", sobald ein Modell geladen ist
+_TS_CHECK = None  # ((Pfade, Datei-Status), nutzbar?) – Ergebnis von _torchscript_usable()
 
 _MATERIAL_MODEL = None
 _MATERIAL_CLASSES = None
 _MODEL_CFG = {
     "sample_rate": 44100,
     "mono": True,
+    "window_frames": 64,
 }
 
+_NAME_RULES = None
+_NAME_RULES_LOADED = False
 
 
+def _ml_backend() -> bool:
+    """Importiert torch/torchaudio beim ersten Bedarf.
+
+    Wird nur auf dem Modell-Pfad aufgerufen, wenn _select_runtime() ein
+    torch-Modell (.pt oder TorchScript-Artefakt) gefunden hat – ohne Modell
+    wird torch gar nicht erst geladen (~2 s Import).
+    """
+    global torch, torchaudio, _TORCH_TRIED
+    if not _TORCH_TRIED:
+        _TORCH_TRIED = True
+        try:
+            import torch as _torch
+            import torchaudio as _torchaudio
+        except ImportError:
+            return False
+        torch, torchaudio = _torch, _torchaudio
+    return torch is not None and torchaudio is not None
+
+
+def _file_state(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _torchscript_usable() -> bool:
+    """Gibt es ein TorchScript-Artefakt, das zum aktuellen Checkpoint passt? (ohne torch)
+
+    Ein Artefakt, das aus einem älteren .pt exportiert wurde (Fingerprint in
+    der Meta != aktuelles .pt), wird ignoriert – nach neuem Training gilt das
+    .pt, bis neu exportiert ist. Ohne .pt (nur Artefakt ausgeliefert) gilt das
+    Artefakt. Gecacht, solange sich beide Dateien nicht ändern.
+    """
+    global _TS_CHECK
+    key = (_DEFAULT_TS_PATH, _DEFAULT_CKPT_PATH, _file_state(_DEFAULT_TS_PATH), _file_state(_DEFAULT_CKPT_PATH))
+    if _TS_CHECK is not None and _TS_CHECK[0] == key:
+        return _TS_CHECK[1]
+    usable = False
+    if key[2] is not None:
+        from df95_aiworker_material_torchscript import read_meta
+
+        meta = read_meta(_DEFAULT_TS_PATH)
+        if meta is None:
+            print(f"[DF95 AIWorker Material] {_DEFAULT_TS_PATH} ist kein DF95-TorchScript-Artefakt – ignoriert.")
+        elif key[3] is not None and (meta.get("source") or {}).get("fingerprint") != file_fingerprint(_DEFAULT_CKPT_PATH):
+            print(f"[DF95 AIWorker Material] {_DEFAULT_TS_PATH} passt nicht zum aktuellen Checkpoint "
+                  f"(veraltet) – ignoriert, bitte neu exportieren.")
+        else:
+            usable = True
+    _TS_CHECK = (key, usable)
+    return usable
+
+
+def _select_runtime() -> str:
+    """"torchscript" | "torch" | "numpy" | "" – welche Runtime ein Modell liefern würde (ohne Import)."""
+    mode = (RUNTIME or "auto").lower()
+    if mode in ("auto", "torchscript") and _torchscript_usable() and _torch_installed():
+        return "torchscript"
+    if mode in ("auto", "torch") and os.path.isfile(_DEFAULT_CKPT_PATH) and _torch_installed():
+        return "torch"
+    if (mode in ("auto", "numpy") and os.path.isfile(_DEFAULT_NPZ_PATH)
+            and importlib.util.find_spec("numpy") is not None):
+        return "numpy"
+    return ""
+
+
+def _load_numpy_model() -> None:
+    """Lädt das .npz-Modell in die NumPy-Runtime (kein torch)."""
+    global _MATERIAL_MODEL, _MATERIAL_CLASSES, _RUNTIME_LOADED
+    import df95_aiworker_material_numpy as material_numpy
+
+    try:
+        model = material_numpy.load_model(_DEFAULT_NPZ_PATH)
+    except Exception as e:
+        print(f"[DF95 AIWorker Material] Konnte .npz nicht laden: {e}")
+        return
+    if not model.classes:
+        print("[DF95 AIWorker Material] .npz hat keine Klassen – Abbruch.")
+        return
+    _MODEL_CFG.update(model.config)
+    _MATERIAL_MODEL = model
+    _MATERIAL_CLASSES = model.classes
+    _RUNTIME_LOADED = "numpy"
+    print(f"[DF95 AIWorker Material] Modell ({model.config.get('arch')}, NumPy-Runtime) geladen mit "
+          f"{len(model.classes)} Klassen aus {_DEFAULT_NPZ_PATH}.")
+
+
+def _load_torchscript_model() -> bool:
+    """Lädt das TorchScript-Artefakt (CPU). Features/Batches laufen wie beim Eager-Modell."""
+    global _MATERIAL_MODEL, _MATERIAL_CLASSES, _RUNTIME_LOADED
+    from df95_aiworker_material_torchscript import load_torchscript
+
+    try:
+        model, meta = load_torchscript(_DEFAULT_TS_PATH)
+    except Exception as e:
+        print(f"[DF95 AIWorker Material] Konnte TorchScript-Artefakt nicht laden: {e}")
+        return False
+    classes = meta.get("material_classes") or []
+    if not classes:
+        print("[DF95 AIWorker Material] TorchScript-Artefakt hat keine Klassen – Abbruch.")
+        return False
+    _MODEL_CFG.update(meta.get("config") or {})
+    _MATERIAL_MODEL = model
+    _MATERIAL_CLASSES = classes
+    _RUNTIME_LOADED = "torchscript"
+    print(f"[DF95 AIWorker Material] Modell ({_MODEL_CFG.get('arch')}, TorchScript, "
+          f"{meta.get('quantized') or 'float32'}) geladen mit {len(classes)} Klassen aus {_DEFAULT_TS_PATH}.")
+    return True
+
 
 def _load_material_model():
     """Lädt (falls vorhanden) ein trainiertes Material-Modell.
@@ -48,22 +199,36 @@ def _load_material_model():
         - "material_classes"
         - "config" mit "sample_rate", "mono"
 
-    Wenn nichts geladen werden kann (kein torch/torchaudio oder kein Checkpoint),
+    Liegt unter _DEFAULT_TS_PATH ein passendes TorchScript-Artefakt, wird
+    dieses geladen (schneller, gleiche Vor-/Nachverarbeitung). Ohne torch
+    (oder mit RUNTIME = "numpy") wird stattdessen das .npz unter
+    _DEFAULT_NPZ_PATH in die NumPy-Runtime geladen.
+
+    Wenn nichts geladen werden kann (kein Backend oder kein Checkpoint),
     bleibt _MATERIAL_MODEL = None und das System fällt auf Heuristiken zurück.
     """
-    global _MATERIAL_MODEL, _MATERIAL_CLASSES, _MODEL_CFG
+    global _MATERIAL_MODEL, _MATERIAL_CLASSES, _MODEL_CFG, _RUNTIME_LOADED
 
     if _MATERIAL_MODEL is not None:
         return
 
-    if torch is None or torchaudio is None:
-        # Kein ML-Backend verfügbar
+    runtime = _select_runtime()
+    if runtime in ("torchscript", "torch") and not _ml_backend():
+        # find_spec ok, Import kaputt -> .npz, falls vorhanden
+        runtime = "numpy" if os.path.isfile(_DEFAULT_NPZ_PATH) and RUNTIME == "auto" else ""
+    if runtime == "torchscript":
+        if _load_torchscript_model():
+            return
+        # Artefakt defekt -> Eager-Modell aus dem .pt, falls erlaubt
+        runtime = "torch" if os.path.isfile(_DEFAULT_CKPT_PATH) and RUNTIME == "auto" else ""
+    if runtime == "numpy":
+        _load_numpy_model()
+        return
+    if runtime != "torch":
+        # Kein Checkpoint vorhanden oder kein ML-Backend verfügbar
         return
 
     ckpt_path = _DEFAULT_CKPT_PATH
-    if not os.path.isfile(ckpt_path):
-        # Kein Checkpoint vorhanden
-        return
 
     try:
         ckpt = torch.load(ckpt_path, map_location="cpu")
@@ -77,9 +242,9 @@ def _load_material_model():
 
     # Import der SimpleConvNet-Architektur aus dem Training-Template
     try:
-        from df95_aiworker_material_train_template import SimpleConvNet
+        from df95_aiworker_material_train_template import build_model
     except ImportError as e:
-        print(f"[DF95 AIWorker Material] Konnte SimpleConvNet nicht importieren: {e}")
+        print(f"[DF95 AIWorker Material] Konnte Modell-Architekturen nicht importieren: {e}")
         return
 
     num_classes = len(material_classes)
@@ -87,7 +252,13 @@ def _load_material_model():
         print("[DF95 AIWorker Material] Checkpoint hat keine Klassen – Abbruch.")
         return
 
-    model = SimpleConvNet(num_classes=num_classes)
+    # Checkpoints ohne "arch" stammen von SimpleConvNet (v1)
+    arch = cfg.get("arch") or "simple_conv_v1"
+    try:
+        model = build_model(arch, num_classes)
+    except RuntimeError as e:
+        print(f"[DF95 AIWorker Material] {e} – Abbruch.")
+        return
     state_dict = ckpt.get("model_state")
     if state_dict is None:
         print("[DF95 AIWorker Material] Checkpoint ohne model_state – Abbruch.")
@@ -102,7 +273,227 @@ def _load_material_model():
 
     _MATERIAL_MODEL = model
     _MATERIAL_CLASSES = material_classes
-    print(f"[DF95 AIWorker Material] Modell geladen mit {len(material_classes)} Klassen aus {ckpt_path}.")
+    _RUNTIME_LOADED = "torch"
+    print(f"[DF95 AIWorker Material] Modell ({arch}) geladen mit {len(material_classes)} Klassen aus {ckpt_path}.")
+
+
+# Feature-Parameter – analog zum Training-Template
+_N_FFT = 2048
+_HOP_LENGTH = 512
+_N_MELS = 64
+# Mel-Front-End (MelSpectrogram + AmplitudeToDB) einmal pro Sample-Rate
+_FRONTENDS: Dict[int, object] = {}
+
+# Lange Dateien: Inferenz in Fenstern (window_frames aus dem Checkpoint),
+# höchstens MAX_WINDOWS gleichmäßig verteilte Fenster aus den ersten
+# MAX_ANALYSIS_SECONDS – Logits werden pro Datei gemittelt.
+MAX_WINDOWS = 32
+MAX_ANALYSIS_SECONDS = 300.0
+
+# Inferenz-Features im Feature Store ablegen (df95_aiworker_feature_store.py).
+# Der Store ist mit Training/Evaluation geteilt und hält nur volle Länge:
+# Dateien über MAX_ANALYSIS_SECONDS werden gekürzt dekodiert und nicht abgelegt.
+USE_FEATURE_STORE = True
+FEATURE_STORE_DIR = ""  # leer = Support/DF95_AIWorker/Cache/features
+_FEATURE_STORE = None  # None = noch nicht geöffnet, False = nicht verfügbar
+
+DEFAULT_BATCH_SIZE = 16
+
+
+def _mel_frontend(sample_rate: int):
+    frontend = _FRONTENDS.get(sample_rate)
+    if frontend is None:
+        frontend = torch.nn.Sequential(
+            torchaudio.transforms.MelSpectrogram(
+                sample_rate=sample_rate,
+                n_fft=_N_FFT,
+                hop_length=_HOP_LENGTH,
+                n_mels=_N_MELS,
+            ),
+            torchaudio.transforms.AmplitudeToDB(),
+        ).eval()
+        _FRONTENDS[sample_rate] = frontend
+    return frontend
+
+
+def _resample(wav, sr: int, sr_target: int):
+    if _RUNTIME_LOADED == "numpy":
+        import df95_aiworker_material_numpy as material_numpy
+        return material_numpy.resample(wav, sr, sr_target)
+    return torchaudio.functional.resample(torch.from_numpy(wav), sr, sr_target).numpy()
+
+
+def _load_waveform(path: str):
+    """Dekodiert eine Datei auf float32 [1, N] (mono, Modell-Samplerate, max. MAX_ANALYSIS_SECONDS).
+
+    Gibt (wav, vollständig) zurück – vollständig = die ganze Datei wurde
+    gelesen (nicht gekürzt) – bzw. None, wenn die Datei nicht gelesen werden kann.
+    """
+    from df95_aiworker_audio_io import probe, read_window
+
+    # Nur die ersten MAX_ANALYSIS_SECONDS lesen (WAV per memmap, sonst torchaudio)
+    info = probe(path)
+    loaded = read_window(path, 0.0, MAX_ANALYSIS_SECONDS, info=info) if info is not None else None
+    if loaded is None:
+        print(f"[DF95 AIWorker Material] Konnte Audio nicht laden: {path}")
+        return None
+    wav, sr = loaded
+    complete = wav.shape[1] >= info.num_frames
+
+    sr_target = _MODEL_CFG.get("sample_rate", 44100)
+    if bool(_MODEL_CFG.get("mono", True)) and wav.shape[0] > 1:
+        wav = wav.mean(axis=0, keepdims=True)
+    else:
+        wav = wav[:1]
+
+    if sr != sr_target:
+        wav = _resample(wav, sr, sr_target)
+    return wav, complete
+
+
+def _analysis_frames() -> int:
+    """Mel-Frames, die MAX_ANALYSIS_SECONDS entsprechen (wie beim gekürzten Dekodieren)."""
+    sample_rate = int(_MODEL_CFG.get("sample_rate", 44100))
+    return int(round(MAX_ANALYSIS_SECONDS * sample_rate)) // _HOP_LENGTH + 1
+
+
+def _compute_features(path: str):
+    """Datei -> (Mel-dB-Features [1, M, T], vollständig) bzw. None (läuft in den Decode-Threads).
+
+    torch-Runtime: Tensor, NumPy-Runtime: ndarray.
+    """
+    loaded = _load_waveform(path)
+    if loaded is None:
+        return None
+    wav, complete = loaded
+    sample_rate = int(_MODEL_CFG.get("sample_rate", 44100))
+    try:
+        if _RUNTIME_LOADED == "numpy":
+            import df95_aiworker_material_numpy as material_numpy
+            return material_numpy.mel_db(wav[0], sample_rate, _N_FFT, _HOP_LENGTH, _N_MELS)[None], complete
+        with torch.inference_mode():
+            return _mel_frontend(sample_rate)(torch.from_numpy(wav)), complete
+    except Exception as e:
+        print(f"[DF95 AIWorker Material] Feature-Extraktion fehlgeschlagen: {path} ({e})")
+        return None
+
+
+def _run_batch(feats) -> List[tuple]:
+    """Inferenz auf Features [1, M, T] beliebiger Länge -> [(label, confidence), ...]."""
+    window = int(_MODEL_CFG.get("window_frames", 64))
+    if _RUNTIME_LOADED == "numpy":
+        import df95_aiworker_material_numpy as material_numpy
+        probs = material_numpy.softmax(material_numpy.predict_logits_windowed(
+            _MATERIAL_MODEL, [f[0] for f in feats], window=window, max_windows=MAX_WINDOWS,
+        ))
+        idx = probs.argmax(axis=1)
+        conf = probs[range(len(idx)), idx]
+    else:
+        from df95_aiworker_material_train_template import predict_logits_windowed
+
+        with torch.inference_mode():
+            logits = predict_logits_windowed(_MATERIAL_MODEL, feats, window=window, max_windows=MAX_WINDOWS)
+            probs = torch.softmax(logits, dim=1)
+            conf, idx = torch.max(probs, dim=1)
+
+    out = []
+    for i, c in zip(idx.tolist(), conf.tolist()):
+        if 0 <= i < len(_MATERIAL_CLASSES):
+            out.append((_MATERIAL_CLASSES[i], float(c)))
+        else:
+            out.append((None, 0.0))
+    return out
+
+
+def _feature_store():
+    """Feature Store (volle Länge – geteilt mit Training/Evaluation), einmal pro Prozess."""
+    global _FEATURE_STORE
+    if not USE_FEATURE_STORE:
+        return None
+    from df95_aiworker_feature_store import feature_params, open_feature_store
+
+    params = feature_params(
+        _MODEL_CFG.get("sample_rate", 44100), _MODEL_CFG.get("mono", True),
+        _N_FFT, _HOP_LENGTH, _N_MELS,
+    )
+    if _FEATURE_STORE is False or (_FEATURE_STORE is not None and _FEATURE_STORE.params == params):
+        return _FEATURE_STORE or None
+    if _FEATURE_STORE is not None:
+        _FEATURE_STORE.close()
+    _FEATURE_STORE = open_feature_store(params, FEATURE_STORE_DIR) or False
+    return _FEATURE_STORE or None
+
+
+def _infer_material_batch(paths: List[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                          decode_threads: int = 0) -> List[tuple]:
+    """Modell-Inferenz für viele Dateien.
+
+    Features kommen aus dem Feature Store, falls vorhanden; nur fehlende
+    Dateien werden dekodiert – parallel in einem Thread-Pool (der nächste
+    Batch wird dekodiert, während der aktuelle gerechnet wird). Gibt pro Pfad
+    (material_label, confidence) zurück bzw. (None, 0.0), wenn kein Modell
+    verfügbar ist oder die Datei nicht gelesen werden kann.
+    """
+    results: List[tuple] = [(None, 0.0)] * len(paths)
+    if not paths:
+        return results
+
+    _load_material_model()
+    if _MATERIAL_MODEL is None or _MATERIAL_CLASSES is None:
+        return results
+
+    store = _feature_store()
+    max_frames = _analysis_frames()
+    batch_size = max(1, int(batch_size))
+    threads = decode_threads or min(8, os.cpu_count() or 1)
+    batches = [range(i, min(i + batch_size, len(paths))) for i in range(0, len(paths), batch_size)]
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        def submit(rng):
+            # Pro Datei entweder Features aus dem Store oder ein Decode-Future
+            jobs = []
+            for i in rng:
+                feat = store.get(paths[i]) if store is not None else None
+                if feat is None:
+                    jobs.append(pool.submit(_compute_features, paths[i]))
+                else:
+                    # Store hält volle Länge – auf denselben Analyse-Bereich kürzen wie beim Dekodieren
+                    feat = feat[:, :max_frames]
+                    jobs.append(feat[None] if _RUNTIME_LOADED == "numpy" else torch.from_numpy(feat).unsqueeze(0))
+            return jobs
+
+        pending = submit(batches[0])
+        for b, rng in enumerate(batches):
+            jobs = pending
+            if b + 1 < len(batches):
+                pending = submit(batches[b + 1])
+
+            idx = []
+            feats = []
+            for i, job in zip(rng, jobs):
+                if isinstance(job, Future):
+                    computed = job.result()
+                    if computed is None:
+                        continue
+                    feat, complete = computed
+                    # Gekürzte Features nie in den geteilten Store (Training erwartet volle Länge)
+                    if store is not None and complete:
+                        store.put(paths[i], feat[0] if _RUNTIME_LOADED == "numpy" else feat[0].numpy())
+                else:
+                    feat = job
+                idx.append(i)
+                feats.append(feat)
+            if not feats:
+                continue
+            try:
+                for i, res in zip(idx, _run_batch(feats)):
+                    results[i] = res
+            except Exception as e:
+                print(f"[DF95 AIWorker Material] Modell-Inferenz fehlgeschlagen, fallback auf Heuristik: {e}")
+
+    if store is not None:
+        store.flush()
+    return results
 
 
 def _infer_material_with_model(path: str):
@@ -111,83 +502,68 @@ def _infer_material_with_model(path: str):
     Gibt (material_label, confidence) zurück oder (None, 0.0), wenn
     kein Modell verfügbar ist oder etwas schiefgeht.
     """
-    if torch is None or torchaudio is None:
-        return None, 0.0
+    return _infer_material_batch([path], batch_size=1, decode_threads=1)[0]
+
 
+def warmup() -> bool:
+    """Lädt Keyword-Tabelle und (falls vorhanden) das Modell vorab.
+
+    Für langlebige Prozesse (df95_aiworker_daemon.py), damit der erste Job
+    nicht die Ladezeit trägt. Gibt True zurück, wenn ein Modell resident ist.
+    """
+    _name_rules()
     _load_material_model()
-    if _MATERIAL_MODEL is None or _MATERIAL_CLASSES is None:
-        return None, 0.0
+    return _MATERIAL_MODEL is not None
 
-    # Audio laden
-    try:
-        wav, sr = torchaudio.load(path)
-    except Exception as e:
-        print(f"[DF95 AIWorker Material] Konnte Audio nicht laden: {path} ({e})")
-        return None, 0.0
 
-    sr_target = _MODEL_CFG.get("sample_rate", 44100)
-    mono = bool(_MODEL_CFG.get("mono", True))
+def model_fingerprint() -> str:
+    """Fingerprint für den Result-Cache: Code-Stand + (nutzbarer) Checkpoint.
+
+    Lädt das Modell NICHT – nur Dateistatus/Hash von Modul und Checkpoint
+    (.ts.pt, .pt bzw. .npz + NumPy-Runtime, je nach Runtime).
+    """
+    fp = "material:" + file_fingerprint(os.path.abspath(__file__))
+    fp += "|names:" + file_fingerprint(os.path.abspath(name_rules.__file__))
+    fp += "|rules:" + file_fingerprint(DEFAULT_RULES_CONFIG_PATH)
+    runtime = _select_runtime()
+    if runtime == "torchscript":
+        fp += "|ts:" + file_fingerprint(_DEFAULT_TS_PATH)
+    elif runtime == "torch":
+        fp += "|ckpt:" + file_fingerprint(_DEFAULT_CKPT_PATH)
+    elif runtime == "numpy":
+        fp += "|npz:" + file_fingerprint(_DEFAULT_NPZ_PATH)
+        fp += "|numpy:" + file_fingerprint(_NUMPY_RUNTIME_PATH)
+    return fp
+
+
+def _torch_installed() -> bool:
+    """torch/torchaudio vorhanden? (find_spec – ohne sie zu importieren)"""
+    if torch is not None and torchaudio is not None:
+        return True
+    return all(importlib.util.find_spec(m) is not None for m in ("torch", "torchaudio"))
+
+
+def _name_rules():
+    """"name_rules"-Override aus der Drum-Role-Config (einmal pro Prozess gelesen)."""
+    global _NAME_RULES_LOADED, _NAME_RULES
+    if not _NAME_RULES_LOADED:
+        _NAME_RULES = load_rules_from_config()
+        _NAME_RULES_LOADED = True
+    return _NAME_RULES
+
+
+def _guess_from_filename(name: str):
+    """Material + Instrument in einem Durchlauf über die gemeinsame Keyword-Tabelle."""
+    guess = classify_name(name, _name_rules())
+    return guess.material or None, guess.instrument or None
 
-    if mono and wav.shape[0] > 1:
-        wav = wav.mean(dim=0, keepdim=True)
-    if sr != sr_target:
-        wav = torchaudio.functional.resample(wav, sr, sr_target)
-
-    # Feature-Extraktion (Mel-Spec + dB) – analog zum Training-Template
-    mel = torchaudio.transforms.MelSpectrogram(
-        sample_rate=sr_target,
-        n_fft=2048,
-        hop_length=512,
-        n_mels=64,
-    )(wav)
-    db = torchaudio.transforms.AmplitudeToDB()(mel)  # [1, M, T]
-
-    x = db.unsqueeze(0)  # [1, 1, M, T]
-    with torch.no_grad():
-        logits = _MATERIAL_MODEL(x)
-        probs = torch.softmax(logits, dim=1)
-        conf, idx = torch.max(probs, dim=1)
-        idx = int(idx.item())
-        conf = float(conf.item())
-
-    if idx < 0 or idx >= len(_MATERIAL_CLASSES):
-        return None, 0.0
-
-    label = _MATERIAL_CLASSES[idx]
-    return label, conf
 
 def _guess_material_from_filename(name: str) -> Optional[str]:
-    n = name.lower()
-    if any(k in n for k in ["wood", "holz", "branch", "stick"]):
-        return "WOOD"
-    if any(k in n for k in ["metal", "metall", "iron", "steel", "clang"]):
-        return "METAL"
-    if any(k in n for k in ["glass", "glas", "bottle", "shard"]):
-        return "GLASS"
-    if any(k in n for k in ["water", "rain", "river", "wave"]):
-        return "WATER"
-    if any(k in n for k in ["stone", "rock", "gravel"]):
-        return "STONE"
-    if any(k in n for k in ["drum", "snare", "kick", "tom", "hihat", "hi-hat", "cymbal", "ride", "crash"]):
-        return "DRUM"
-    return None
+    return _guess_from_filename(name)[0]
 
 
 def _guess_instrument_from_filename(name: str) -> Optional[str]:
-    n = name.lower()
-    if "snare" in n:
-        return "SNARE"
-    if "kick" in n or "bd_" in n or "bassdrum" in n:
-        return "KICK"
-    if "tom" in n:
-        return "TOM"
-    if "hihat" in n or "hi-hat" in n or "hat_" in n:
-        return "HIHAT"
-    if "cymbal" in n or "ride" in n or "crash" in n:
-        return "CYMBAL"
-    if "bell" in n:
-        return "BELL"
-    return None
+    return _guess_from_filename(name)[1]
 
 
 def predict_for_file(path: str) -> Dict:
@@ -212,22 +588,44 @@ def predict_for_file(path: str) -> Dict:
         - ai_confidence (optional: 0.0–1.0)
     """
 
-    base = os.path.basename(path)
-    name, _ = os.path.splitext(base)
-
     # 1) Versuche ML-Modell
     material_ml = None
     ml_conf = 0.0
-    if torch is not None and torchaudio is not None:
+    if _select_runtime():
         try:
             material_ml, ml_conf = _infer_material_with_model(path)
         except Exception as e:
             print(f"[DF95 AIWorker Material] Modell-Inferenz fehlgeschlagen, fallback auf Heuristik: {e}")
             material_ml, ml_conf = None, 0.0
 
+    return _build_prediction(path, material_ml, ml_conf)
+
+
+def predict_for_files(paths: List[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                      decode_threads: int = 0) -> List[Dict]:
+    """Batch-Variante von predict_for_file().
+
+    Das Modell läuft auf gestapelten Fenstern mehrerer Dateien (Logits pro
+    Datei gemittelt), Audio wird parallel dekodiert. Liefert pro Pfad (in gleicher Reihenfolge)
+    dasselbe Dict wie predict_for_file().
+    """
+    paths = list(paths)
+    ml = [(None, 0.0)] * len(paths)
+    if _select_runtime():
+        try:
+            ml = _infer_material_batch(paths, batch_size=batch_size, decode_threads=decode_threads)
+        except Exception as e:
+            print(f"[DF95 AIWorker Material] Modell-Inferenz fehlgeschlagen, fallback auf Heuristik: {e}")
+    return [_build_prediction(p, m, c) for p, (m, c) in zip(paths, ml)]
+
+
+def _build_prediction(path: str, material_ml: Optional[str], ml_conf: float) -> Dict:
+    """Kombiniert Modell-Ergebnis und Dateinamen-Heuristik zum Result-Dict."""
+    base = os.path.basename(path)
+    name, _ = os.path.splitext(base)
+
     # 2) Heuristik
-    material_heur = _guess_material_from_filename(name)
-    instrument = _guess_instrument_from_filename(name)
+    material_heur, instrument = _guess_from_filename(name)
 
     # Material-Auswahl: Modell hat Vorrang, wenn es etwas Sinnvolles liefert
     material = material_ml or material_heur
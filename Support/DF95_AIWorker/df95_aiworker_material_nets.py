@@ -0,0 +1,80 @@
+"""
+DF95 AIWorker – Material-Modell-Architekturen (PyTorch)
+=======================================================
+
+Die CNNs aus dem Training-Template, ausgelagert, damit nur dieses Modul
+torch beim Import braucht. df95_aiworker_material_train_template.build_model()
+importiert es erst, wenn tatsächlich ein Modell gebaut wird – Heuristik-,
+Drone- und Generic-Pfade laden torch damit nie.
+"""
+
+import torch
+
+
+class SimpleConvNet(torch.nn.Module):
+    """
+    Sehr einfaches Convolutional Network als Platzhalter für Material/Instrument-Klassifikation.
+
+    Input:  [B, 1, n_mels, T]
+    Output: Logits für N Klassen (z.B. Material-Klassen)
+    """
+
+    def __init__(self, num_classes: int):
+        super().__init__()
+        self.conv = torch.nn.Sequential(
+            torch.nn.Conv2d(1, 16, kernel_size=3, padding=1),
+            torch.nn.BatchNorm2d(16),
+            torch.nn.ReLU(),
+            torch.nn.MaxPool2d(2),
+            torch.nn.Conv2d(16, 32, kernel_size=3, padding=1),
+            torch.nn.BatchNorm2d(32),
+            torch.nn.ReLU(),
+            torch.nn.MaxPool2d(2),
+        )
+        self.head = torch.nn.Sequential(
+            torch.nn.Linear(32 * 16 * 16, 128),
+            torch.nn.ReLU(),
+            torch.nn.Linear(128, num_classes),
+        )
+
+    def forward(self, x):
+        # x: [B, 1, M, T]
+        h = self.conv(x)
+        h = h.reshape(h.size(0), -1)
+        out = self.head(h)
+        return out
+
+
+class SimpleConvNetV2(torch.nn.Module):
+    """
+    Wie SimpleConvNet, aber mit AdaptiveAvgPool vor dem Head – akzeptiert
+    beliebige Clip-Längen (und n_mels), da der Head immer 32 * 4 * 4 Werte sieht.
+
+    Input:  [B, 1, n_mels, T]  (T >= 4)
+    Output: Logits für N Klassen
+    """
+
+    def __init__(self, num_classes: int):
+        super().__init__()
+        self.conv = torch.nn.Sequential(
+            torch.nn.Conv2d(1, 16, kernel_size=3, padding=1),
+            torch.nn.BatchNorm2d(16),
+            torch.nn.ReLU(),
+            torch.nn.MaxPool2d(2),
+            torch.nn.Conv2d(16, 32, kernel_size=3, padding=1),
+            torch.nn.BatchNorm2d(32),
+            torch.nn.ReLU(),
+            torch.nn.MaxPool2d(2),
+        )
+        self.pool = torch.nn.AdaptiveAvgPool2d((4, 4))
+        self.head = torch.nn.Sequential(
+            torch.nn.Linear(32 * 4 * 4, 128),
+            torch.nn.ReLU(),
+            torch.nn.Linear(128, num_classes),
+        )
+
+    def forward(self, x):
+        # x: [B, 1, M, T]
+        h = self.pool(self.conv(x))
+        h = h.flatten(1)
+        return self.head(h)
@@ -0,0 +1,441 @@
+"""
+DF95 AIWorker – Material-Modell ohne torch (NumPy-Runtime + .npz-Export)
+========================================================================
+
+Auf Render-Nodes ist das Material-Modell der einzige Grund, torch zu
+installieren (Import: Sekunden, RSS: mehrere hundert MB pro Worker). Dieses
+Modul rechnet SimpleConvNet-Checkpoints (v1/v2) mit reinem NumPy:
+
+    export   material_ckpt.pt -> material_ckpt.npz   (einmalig, braucht torch)
+    Runtime  load_model(npz) -> NumpyMaterialModel    (nur NumPy)
+
+Das .npz enthält:
+
+    - Gewichte als float32; BatchNorm ist in die davorliegende Conv gefaltet
+      (W' = W * g/sqrt(var+eps), b' = (b - mean) * g/sqrt(var+eps) + beta)
+    - "layers": Op-Liste (conv2d, relu, maxpool2d, adaptive_avgpool2d,
+      flatten, linear) als JSON – die Runtime ist ein kleiner Interpreter dafür
+    - "meta": Format, Klassen, Modell-Config (sample_rate, mono, arch,
+      window_frames) und Front-End-Parameter (n_fft, hop_length, n_mels)
+
+Forward-Pass (NHWC intern): Conv per im2col über Strided Views
+(sliding_window_view) + eine Matrixmultiplikation pro Layer, MaxPool/
+AdaptiveAvgPool per reshape, Linear als Matmul. Das Mel-Front-End bildet
+torchaudio nach (MelSpectrogram: Hann periodisch, center/reflect, Power 2,
+HTK-Mel ohne Norm; AmplitudeToDB: 10*log10(max(x, 1e-10))), ebenso das
+Sinc-Resampling von torchaudio.functional.resample (Hann, Breite 6, Rolloff 0.99).
+
+df95_aiworker_material_model nutzt die Runtime, wenn torch fehlt (oder
+RUNTIME = "numpy"). Abweichung zu torch: float32-Rundung (Logits ~1e-5).
+
+Usage (CLI):
+    python df95_aiworker_material_numpy.py export material_ckpt.pt [material_ckpt.npz]
+    python df95_aiworker_material_numpy.py check material_ckpt.pt material_ckpt.npz [audio.wav ...]
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:
+    np = None
+
+NPZ_FORMAT = "DF95_MaterialNPZ_V1"
+
+# Front-End-Parameter wie im Training-Template (N_FFT, HOP_LENGTH, N_MELS)
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 64
+AMIN = 1e-10
+
+# torchaudio.functional.resample-Defaults
+RESAMPLE_WIDTH = 6
+RESAMPLE_ROLLOFF = 0.99
+
+
+def available() -> bool:
+    return np is not None
+
+
+# ------------------------------------------------------------
+# Front-End (Resample, Mel-dB)
+# ------------------------------------------------------------
+
+_RESAMPLE_KERNELS: Dict[Tuple[int, int], Tuple["np.ndarray", int]] = {}
+_MEL_FBANKS: Dict[Tuple[int, int, int], "np.ndarray"] = {}
+
+
+def _resample_kernel(orig: int, new: int) -> Tuple["np.ndarray", int]:
+    """Sinc-Kernel [new, K] (orig/new bereits gekürzt) wie torchaudio, einmal pro Verhältnis."""
+    key = (orig, new)
+    cached = _RESAMPLE_KERNELS.get(key)
+    if cached is not None:
+        return cached
+    base = min(orig, new) * RESAMPLE_ROLLOFF
+    width = int(math.ceil(RESAMPLE_WIDTH * orig / base))
+    idx = np.arange(-width, width + orig, dtype=np.float64)[None, :] / orig
+    t = (np.arange(0, -new, -1, dtype=np.float64)[:, None] / new + idx) * base
+    t = np.clip(t, -RESAMPLE_WIDTH, RESAMPLE_WIDTH)
+    window = np.cos(t * math.pi / RESAMPLE_WIDTH / 2) ** 2
+    t *= math.pi
+    with np.errstate(invalid="ignore", divide="ignore"):
+        kernel = np.where(t == 0, 1.0, np.sin(t) / t)
+    kernel *= window * (base / orig)
+    _RESAMPLE_KERNELS[key] = (kernel.astype(np.float32), width)
+    return _RESAMPLE_KERNELS[key]
+
+
+def resample(wav: "np.ndarray", orig_sr: int, new_sr: int) -> "np.ndarray":
+    """[C, N] float32 von orig_sr nach new_sr (entspricht torchaudio.functional.resample)."""
+    if orig_sr == new_sr:
+        return wav
+    g = math.gcd(int(orig_sr), int(new_sr))
+    orig, new = int(orig_sr) // g, int(new_sr) // g
+    kernel, width = _resample_kernel(orig, new)
+    length = wav.shape[-1]
+    padded = np.pad(wav, ((0, 0), (width, width + orig)))
+    # Fenster mit Schrittweite orig: [C, frames, K] @ [K, new] -> [C, frames, new]
+    frames = sliding_window_view(padded, kernel.shape[1], axis=1)[:, ::orig]
+    out = (frames @ kernel.T).reshape(wav.shape[0], -1)
+    return np.ascontiguousarray(out[:, :int(math.ceil(new * length / orig))])
+
+
+def mel_filterbank(sample_rate: int, n_fft: int = N_FFT, n_mels: int = N_MELS) -> "np.ndarray":
+    """HTK-Mel-Filterbank [n_fft//2+1, n_mels] ohne Norm (torchaudio.functional.melscale_fbanks)."""
+    key = (sample_rate, n_fft, n_mels)
+    fb = _MEL_FBANKS.get(key)
+    if fb is None:
+        n_freqs = n_fft // 2 + 1
+        all_freqs = np.linspace(0, sample_rate // 2, n_freqs)
+        m_max = 2595.0 * math.log10(1.0 + float(sample_rate // 2) / 700.0)
+        f_pts = 700.0 * (10.0 ** (np.linspace(0.0, m_max, n_mels + 2) / 2595.0) - 1.0)
+        f_diff = np.diff(f_pts)
+        slopes = f_pts[None, :] - all_freqs[:, None]
+        down = -slopes[:, :-2] / f_diff[:-1]
+        up = slopes[:, 2:] / f_diff[1:]
+        fb = np.maximum(0.0, np.minimum(down, up)).astype(np.float32)
+        _MEL_FBANKS[key] = fb
+    return fb
+
+
+def mel_db(wav: "np.ndarray", sample_rate: int, n_fft: int = N_FFT, hop_length: int = HOP_LENGTH,
+           n_mels: int = N_MELS) -> "np.ndarray":
+    """Mono-Signal [N] -> Mel-dB [n_mels, 1 + N // hop_length] (MelSpectrogram + AmplitudeToDB).
+
+    Wirft ValueError für N <= n_fft // 2 – torch.stft (reflect-Padding) lehnt
+    solche Clips ab, np.pad würde sie still spiegeln.
+    """
+    wav = np.asarray(wav, dtype=np.float32)
+    if wav.shape[-1] <= n_fft // 2:
+        raise ValueError(f"Clip zu kurz für die STFT: {wav.shape[-1]} Samples (mind. {n_fft // 2 + 1})")
+    x = np.pad(wav, n_fft // 2, mode="reflect")
+    frames = sliding_window_view(x, n_fft)[::hop_length]
+    # periodisches Hann-Fenster wie torch.hann_window
+    window = (0.5 - 0.5 * np.cos(2.0 * math.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+    spec = np.fft.rfft(frames * window, axis=-1)
+    power = (spec.real ** 2 + spec.imag ** 2).astype(np.float32)
+    mel = power @ mel_filterbank(sample_rate, n_fft, n_mels)
+    return (10.0 * np.log10(np.maximum(mel, AMIN))).T.astype(np.float32)
+
+
+# ------------------------------------------------------------
+# Runtime (Forward-Pass)
+# ------------------------------------------------------------
+
+def _conv2d(x: "np.ndarray", w: "np.ndarray", b: "np.ndarray", kh: int, kw: int, pad: int) -> "np.ndarray":
+    """NHWC-Conv (Stride 1): im2col über Strided Views, dann eine Matmul. w: [C*kh*kw, O]."""
+    if pad:
+        x = np.pad(x, ((0, 0), (pad, pad), (pad, pad), (0, 0)))
+    cols = sliding_window_view(x, (kh, kw), axis=(1, 2))            # [B, H, W, C, kh, kw]
+    n, h, wd = cols.shape[:3]
+    out = cols.reshape(n * h * wd, -1) @ w
+    out += b
+    return out.reshape(n, h, wd, -1)
+
+
+def _maxpool2d(x: "np.ndarray", k: int) -> "np.ndarray":
+    n, h, w, c = x.shape
+    h2, w2 = h // k, w // k
+    return x[:, :h2 * k, :w2 * k].reshape(n, h2, k, w2, k, c).max(axis=(2, 4))
+
+
+def _adaptive_avgpool2d(x: "np.ndarray", size: Tuple[int, int]) -> "np.ndarray":
+    """Wie torch AdaptiveAvgPool2d: Zelle i über [floor(i*H/oh), ceil((i+1)*H/oh))."""
+    n, h, w, c = x.shape
+    oh, ow = size
+    out = np.empty((n, oh, ow, c), dtype=x.dtype)
+    for i in range(oh):
+        h0, h1 = (i * h) // oh, -(-((i + 1) * h) // oh)
+        for j in range(ow):
+            w0, w1 = (j * w) // ow, -(-((j + 1) * w) // ow)
+            out[:, i, j] = x[:, h0:h1, w0:w1].mean(axis=(1, 2))
+    return out
+
+
+class NumpyMaterialModel:
+    """Sequenzielles CNN aus einem DF95-.npz; forward() nimmt [B, 1, M, T] wie das torch-Modell."""
+
+    def __init__(self, layers: List[Dict[str, Any]], arrays: Dict[str, "np.ndarray"],
+                 classes: List[str], config: Dict[str, Any]):
+        self.classes = classes
+        self.config = config
+        self._ops = []
+        for spec in layers:
+            op = spec["op"]
+            if op == "conv2d":
+                w = arrays[spec["w"]]                                   # torch-Layout [O, C, kh, kw]
+                o, _c, kh, kw = w.shape
+                mat = np.ascontiguousarray(w.reshape(o, -1).T)          # [C*kh*kw, O]
+                self._ops.append((op, (mat, arrays[spec["b"]], kh, kw, int(spec.get("padding", 0)))))
+            elif op == "linear":
+                self._ops.append((op, (np.ascontiguousarray(arrays[spec["w"]].T), arrays[spec["b"]])))
+            elif op == "maxpool2d":
+                self._ops.append((op, int(spec["kernel"])))
+            elif op == "adaptive_avgpool2d":
+                self._ops.append((op, tuple(spec["size"])))
+            elif op in ("relu", "flatten"):
+                self._ops.append((op, None))
+            else:
+                raise RuntimeError(f"Unbekannter Layer im .npz: {op}")
+
+    def forward(self, x: "np.ndarray") -> "np.ndarray":
+        """[B, C, H, W] float32 -> Logits [B, num_classes]."""
+        h = np.ascontiguousarray(np.asarray(x, dtype=np.float32).transpose(0, 2, 3, 1))
+        for op, arg in self._ops:
+            if op == "conv2d":
+                h = _conv2d(h, *arg)
+            elif op == "relu":
+                np.maximum(h, 0.0, out=h)
+            elif op == "maxpool2d":
+                h = _maxpool2d(h, arg)
+            elif op == "adaptive_avgpool2d":
+                h = _adaptive_avgpool2d(h, arg)
+            elif op == "flatten":
+                # torch flacht NCHW ab (Kanal zuerst)
+                h = h.transpose(0, 3, 1, 2).reshape(h.shape[0], -1) if h.ndim == 4 else h
+            elif op == "linear":
+                h = h @ arg[0] + arg[1]
+        return h
+
+    __call__ = forward
+
+
+def load_model(path: str) -> NumpyMaterialModel:
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta.get("format") != NPZ_FORMAT:
+            raise RuntimeError(f"Unbekanntes .npz-Format: {meta.get('format')!r} (erwartet {NPZ_FORMAT})")
+        layers = json.loads(str(data["layers"]))
+        arrays = {k: data[k].astype(np.float32, copy=False) for k in data.files if k not in ("meta", "layers")}
+    return NumpyMaterialModel(layers, arrays, list(meta.get("material_classes") or []), meta.get("config") or {})
+
+
+def frames_to_windows(feat: "np.ndarray", window: int, max_windows: int) -> "np.ndarray":
+    """[M, T] -> [W, 1, M, window] wie train_template.frames_to_windows (Padding mit Stille)."""
+    from df95_aiworker_material_train_template import PAD_DB, window_starts
+
+    t = feat.shape[-1]
+    if t < window:
+        return np.pad(feat, ((0, 0), (0, window - t)), constant_values=PAD_DB)[None, None]
+    return np.stack([feat[None, :, s:s + window] for s in window_starts(t, window, max_windows)], axis=0)
+
+
+def predict_logits_windowed(model: NumpyMaterialModel, feats: List["np.ndarray"], window: int,
+                            max_windows: int = 32) -> "np.ndarray":
+    """Logits [len(feats), num_classes] für Mel-Features [M, T] beliebiger Länge (Mittel pro Clip)."""
+    windows = [frames_to_windows(f, window, max_windows) for f in feats]
+    logits = model(np.concatenate(windows, axis=0))
+    owner = np.repeat(np.arange(len(windows)), [w.shape[0] for w in windows])
+    summed = np.zeros((len(windows), logits.shape[1]), dtype=np.float64)
+    np.add.at(summed, owner, logits)
+    return (summed / np.bincount(owner, minlength=len(windows))[:, None]).astype(np.float32)
+
+
+def softmax(logits: "np.ndarray") -> "np.ndarray":
+    z = logits - logits.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+# ------------------------------------------------------------
+# Export (.pt -> .npz, braucht torch)
+# ------------------------------------------------------------
+
+def _fold_bn(conv, bn) -> Tuple["np.ndarray", "np.ndarray"]:
+    w = conv.weight.detach().double().numpy()
+    b = conv.bias.detach().double().numpy() if conv.bias is not None else np.zeros(w.shape[0])
+    scale = bn.weight.detach().double().numpy() / np.sqrt(bn.running_var.detach().double().numpy() + bn.eps)
+    w = w * scale[:, None, None, None]
+    b = (b - bn.running_mean.detach().double().numpy()) * scale + bn.bias.detach().double().numpy()
+    return w.astype(np.float32), b.astype(np.float32)
+
+
+def export_layers(model) -> Tuple[List[Dict[str, Any]], Dict[str, "np.ndarray"]]:
+    """torch-Modell (SimpleConvNet v1/v2) -> (Op-Liste, Arrays). BatchNorm wird gefaltet."""
+    import torch
+
+    modules = list(model.conv)
+    if getattr(model, "pool", None) is not None:
+        modules.append(model.pool)
+    modules.append(torch.nn.Flatten())
+    modules.extend(model.head)
+
+    layers: List[Dict[str, Any]] = []
+    arrays: Dict[str, "np.ndarray"] = {}
+    i = 0
+    while i < len(modules):
+        m = modules[i]
+        name = f"l{len(layers)}"
+        if isinstance(m, torch.nn.Conv2d):
+            if m.stride != (1, 1) or m.dilation != (1, 1) or m.groups != 1 or m.padding[0] != m.padding[1]:
+                raise RuntimeError(f"Conv2d-Variante nicht unterstützt: {m}")
+            nxt = modules[i + 1] if i + 1 < len(modules) else None
+            if isinstance(nxt, torch.nn.BatchNorm2d):
+                w, b = _fold_bn(m, nxt)
+                i += 1
+            else:
+                w = m.weight.detach().numpy().astype(np.float32)
+                b = (m.bias.detach().numpy() if m.bias is not None else np.zeros(w.shape[0])).astype(np.float32)
+            arrays[name + "_w"], arrays[name + "_b"] = w, b
+            layers.append({"op": "conv2d", "w": name + "_w", "b": name + "_b", "padding": int(m.padding[0])})
+        elif isinstance(m, torch.nn.Linear):
+            arrays[name + "_w"] = m.weight.detach().numpy().astype(np.float32)
+            arrays[name + "_b"] = m.bias.detach().numpy().astype(np.float32)
+            layers.append({"op": "linear", "w": name + "_w", "b": name + "_b"})
+        elif isinstance(m, torch.nn.ReLU):
+            layers.append({"op": "relu"})
+        elif isinstance(m, torch.nn.MaxPool2d):
+            if m.stride != m.kernel_size or m.padding != 0 or m.ceil_mode or m.dilation != 1:
+                raise RuntimeError(f"MaxPool2d-Variante nicht unterstützt: {m}")
+            layers.append({"op": "maxpool2d", "kernel": int(m.kernel_size)})
+        elif isinstance(m, torch.nn.AdaptiveAvgPool2d):
+            size = m.output_size if isinstance(m.output_size, tuple) else (m.output_size, m.output_size)
+            layers.append({"op": "adaptive_avgpool2d", "size": [int(s) for s in size]})
+        elif isinstance(m, torch.nn.Flatten):
+            layers.append({"op": "flatten"})
+        else:
+            raise RuntimeError(f"Layer nicht unterstützt: {type(m).__name__}")
+        i += 1
+    return layers, arrays
+
+
+def export_npz(ckpt_path: str, npz_path: str) -> Dict[str, Any]:
+    """material_ckpt.pt -> .npz (komprimiert). Gibt die Meta-Daten zurück."""
+    from df95_aiworker_material_train_template import load_checkpoint_model
+
+    model, classes, cfg = load_checkpoint_model(ckpt_path)
+    layers, arrays = export_layers(model)
+    meta = {
+        "format": NPZ_FORMAT,
+        "material_classes": classes,
+        "config": {
+            "sample_rate": int(cfg.get("sample_rate", 44100)),
+            "mono": bool(cfg.get("mono", True)),
+            "arch": cfg["arch"],
+            "window_frames": int(cfg.get("window_frames", 64)),
+            "n_fft": N_FFT,
+            "hop_length": HOP_LENGTH,
+            "n_mels": int(cfg.get("n_mels", N_MELS)),
+        },
+    }
+    parent = os.path.dirname(npz_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    # Temp-Datei + replace, damit ein laufender Worker nie ein halbes .npz liest
+    tmp = npz_path + ".tmp.npz"
+    np.savez_compressed(tmp, meta=np.array(json.dumps(meta)), layers=np.array(json.dumps(layers)), **arrays)
+    os.replace(tmp, npz_path)
+    return meta
+
+
+# ------------------------------------------------------------
+# Abgleich torch <-> NumPy
+# ------------------------------------------------------------
+
+def check_against_torch(ckpt_path: str, npz_path: str, audio_paths: Optional[List[str]] = None,
+                        seed: int = 95) -> Dict[str, float]:
+    """Max. Abweichung von Logits (Zufalls-Features) und Mel-Front-End/Vorhersagen (Audio)."""
+    import torch
+    import torchaudio
+    from df95_aiworker_audio_io import read_window
+    from df95_aiworker_material_train_template import load_checkpoint_model
+    from df95_aiworker_material_train_template import predict_logits_windowed as torch_logits_windowed
+
+    model, _classes, cfg = load_checkpoint_model(ckpt_path)
+    np_model = load_model(npz_path)
+    window = int(cfg.get("window_frames", 64))
+    rng = np.random.default_rng(seed)
+    x = rng.normal(-40.0, 20.0, size=(8, 1, N_MELS, window)).astype(np.float32)
+    with torch.inference_mode():
+        ref = model(torch.from_numpy(x)).numpy()
+    out = {"logits_max_abs": float(np.abs(np_model(x) - ref).max())}
+
+    sr = int(cfg.get("sample_rate", 44100))
+    frontend = torch.nn.Sequential(
+        torchaudio.transforms.MelSpectrogram(sample_rate=sr, n_fft=N_FFT, hop_length=HOP_LENGTH, n_mels=N_MELS),
+        torchaudio.transforms.AmplitudeToDB(),
+    )
+    mel_diff, prob_diff, same, total, short = 0.0, 0.0, 0, 0, 0
+    for path in audio_paths or []:
+        loaded = read_window(path, mono=True)
+        if loaded is None:
+            print(f"[DF95 AIWorker Material] nicht lesbar: {path}")
+            continue
+        wav, file_sr = loaded
+        with torch.inference_mode():
+            t_wav = torchaudio.functional.resample(torch.from_numpy(wav), file_sr, sr)
+            if t_wav.shape[-1] <= N_FFT // 2:
+                # Beide Runtimes fallen hier auf die Heuristik zurück – nichts zu vergleichen
+                print(f"[DF95 AIWorker Material] zu kurz für die STFT, übersprungen: {path}")
+                short += 1
+                continue
+            t_feat = frontend(t_wav)
+            t_prob = torch.softmax(torch_logits_windowed(model, [t_feat], window=window), dim=1).numpy()
+        n_feat = mel_db(resample(wav, file_sr, sr)[0], sr)
+        n_prob = softmax(predict_logits_windowed(np_model, [n_feat], window))
+        # dB-Abweichung nur oberhalb von -80 dB (darunter dominiert float32-Rauschen)
+        loud = t_feat[0].numpy() > -80.0
+        if loud.any():
+            mel_diff = max(mel_diff, float(np.abs(n_feat - t_feat[0].numpy())[loud].max()))
+        prob_diff = max(prob_diff, float(np.abs(n_prob - t_prob).max()))
+        same += int(n_prob.argmax() == t_prob.argmax())
+        total += 1
+    if total:
+        out.update({"mel_db_max_abs": mel_diff, "prob_max_abs": prob_diff, "files": total, "same_label": same})
+    if short:
+        out["skipped_short"] = short
+    return out
+
+
+def main(argv) -> int:
+    usage = ("Usage:\n"
+             "  python df95_aiworker_material_numpy.py export material_ckpt.pt [material_ckpt.npz]\n"
+             "  python df95_aiworker_material_numpy.py check material_ckpt.pt material_ckpt.npz [audio.wav ...]")
+    if np is None:
+        print("[DF95 AIWorker Material] NumPy ist nicht installiert.")
+        return 1
+    if len(argv) >= 3 and argv[1] == "export":
+        ckpt = argv[2]
+        npz = argv[3] if len(argv) > 3 else os.path.splitext(ckpt)[0] + ".npz"
+        meta = export_npz(ckpt, npz)
+        print(f"[DF95 AIWorker Material] {npz}: {meta['config']['arch']}, {len(meta['material_classes'])} Klassen, "
+              f"{os.path.getsize(npz) / 1024:.1f} KB (BatchNorm gefaltet)")
+        res = check_against_torch(ckpt, npz)
+        print(f"[DF95 AIWorker Material] Abgleich torch: Logits max. |Δ| = {res['logits_max_abs']:.2e}")
+        return 0
+    if len(argv) >= 4 and argv[1] == "check":
+        print(json.dumps(check_against_torch(argv[2], argv[3], argv[4:]), indent=2))
+        return 0
+    print(usage)
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
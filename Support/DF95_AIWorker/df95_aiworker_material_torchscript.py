@@ -0,0 +1,211 @@
+"""
+DF95 AIWorker – Material-Modell als TorchScript-Artefakt (CPU-Inferenz)
+======================================================================
+
+Optimierte Inferenz-Variante eines Trainings-Checkpoints, offline erzeugt:
+
+    1) Conv+BatchNorm+ReLU fusioniert (BN in die Conv-Gewichte gefaltet)
+    2) Conv-Gewichte im channels_last-Layout – Conv und MaxPool laufen auf
+       der CPU damit deutlich schneller als in NCHW (der größte Einzelgewinn);
+       die Eingabe bleibt [B, 1, n_mels, T] wie beim Eager-Modell
+    3) optional int8 Dynamic Quantization des Linear-Heads
+       (Gewichte int8, Aktivierungen pro Batch quantisiert)
+    4) per torch.jit.trace aufgezeichnet (Batch-Größe bleibt dynamisch,
+       Fensterbreite = window_frames) und eingefroren (torch.jit.freeze)
+
+Das Artefakt liegt neben dem Checkpoint (material_ckpt.pt -> material_ckpt.ts.pt)
+und trägt Klassen, Config und den Fingerprint des Quell-Checkpoints als
+Extra-Datei (df95_meta.json). df95_aiworker_material_model lädt es
+automatisch, solange es zum aktuellen .pt passt; nach neuem Training wird es
+als veraltet ignoriert, bis es neu exportiert ist.
+
+Genauigkeit prüfen (df95_aiworker_material_eval_helper, gleiche Eval-CSV):
+
+    python df95_aiworker_material_torchscript.py export checkpoints/material_ckpt.pt --validate test.csv
+    python df95_aiworker_material_eval_helper.py test.csv checkpoints/material_ckpt.pt --compare checkpoints/material_ckpt.ts.pt
+
+Usage (CLI):
+    python df95_aiworker_material_torchscript.py export <ckpt.pt> [out.ts.pt] [--no-quant] [--no-fuse] [--validate eval.csv]
+"""
+
+from __future__ import annotations
+
+import contextlib
+import copy
+import json
+import os
+import sys
+import warnings
+import zipfile
+from typing import Any, Dict, List, Optional
+
+from df95_aiworker_result_cache import file_fingerprint
+
+TS_FORMAT = "DF95_MaterialTS_V1"
+META_FILE = "df95_meta.json"
+TS_SUFFIX = ".ts.pt"
+
+
+def ts_path_for(ckpt_path: str) -> str:
+    return os.path.splitext(ckpt_path)[0] + TS_SUFFIX
+
+
+def read_meta(path: str) -> Optional[Dict[str, Any]]:
+    """Meta-Daten eines DF95-TorchScript-Artefakts ohne torch (None = kein solches Artefakt)."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            name = next((n for n in zf.namelist() if n.endswith("/extra/" + META_FILE)), None)
+            if name is None:
+                return None
+            meta = json.loads(zf.read(name).decode("utf-8"))
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None
+    return meta if isinstance(meta, dict) and meta.get("format") == TS_FORMAT else None
+
+
+@contextlib.contextmanager
+def _quiet():
+    # torch.jit / torch.ao.quantization warnen in neueren Versionen bei jedem Aufruf (deprecated)
+    with warnings.catch_warnings():
+        for category in (FutureWarning, DeprecationWarning, UserWarning):
+            warnings.simplefilter("ignore", category)
+        yield
+
+
+def load_torchscript(path: str):
+    """(ScriptModule, Meta) – wirft RuntimeError bei fremden/kaputten Dateien."""
+    import torch
+
+    extra = {META_FILE: ""}
+    with _quiet():
+        module = torch.jit.load(path, map_location="cpu", _extra_files=extra)
+    try:
+        meta = json.loads(extra[META_FILE] or "{}")
+    except ValueError:
+        meta = {}
+    if meta.get("format") != TS_FORMAT:
+        raise RuntimeError(f"Kein DF95-TorchScript-Artefakt: {path}")
+    module.eval()
+    return module, meta
+
+
+# ------------------------------------------------------------
+# Export
+# ------------------------------------------------------------
+
+def fuse_groups(model) -> List[List[str]]:
+    """Namen aufeinanderfolgender Conv2d+BatchNorm2d(+ReLU) in model.conv für fuse_modules."""
+    import torch
+
+    mods = list(model.conv.named_children())
+    groups = []
+    i = 0
+    while i < len(mods):
+        if (i + 1 < len(mods) and isinstance(mods[i][1], torch.nn.Conv2d)
+                and isinstance(mods[i + 1][1], torch.nn.BatchNorm2d)):
+            group = [f"conv.{mods[i][0]}", f"conv.{mods[i + 1][0]}"]
+            if i + 2 < len(mods) and isinstance(mods[i + 2][1], torch.nn.ReLU):
+                group.append(f"conv.{mods[i + 2][0]}")
+            groups.append(group)
+            i += len(group)
+        else:
+            i += 1
+    return groups
+
+
+def export_torchscript(ckpt_path: str, out_path: str, quantize: bool = True, fuse: bool = True,
+                       seed: int = 95) -> Dict[str, Any]:
+    """Checkpoint -> eingefrorenes TorchScript (fusioniert, channels_last, optional int8-Head).
+
+    Gibt die Meta zurück (auch im Artefakt gespeichert), inkl. Abgleich gegen
+    das Eager-Modell auf Zufalls-Features.
+    """
+    import torch
+    from df95_aiworker_material_train_template import N_MELS, WINDOW_FRAMES, load_checkpoint_model
+
+    model, classes, cfg = load_checkpoint_model(ckpt_path)
+    window = int(cfg.get("window_frames", WINDOW_FRAMES))
+    n_mels = int(cfg.get("n_mels", N_MELS))
+    gen = torch.Generator().manual_seed(seed)
+    # Typische Mel-dB-Werte, damit der Abgleich realistische Aktivierungen sieht
+    probe = torch.randn(8, 1, n_mels, window, generator=gen) * 20.0 - 40.0
+
+    with _quiet():
+        opt = model
+        if fuse:
+            opt = torch.ao.quantization.fuse_modules(opt, fuse_groups(opt), inplace=False)
+        else:
+            opt = copy.deepcopy(opt)
+        opt = opt.to(memory_format=torch.channels_last)
+        quantized = ""
+        if quantize:
+            if torch.backends.quantized.engine == "none":
+                print("[DF95 AIWorker Material] Keine Quantisierungs-Engine verfügbar – Head bleibt float32.")
+            else:
+                opt = torch.ao.quantization.quantize_dynamic(opt, {torch.nn.Linear}, dtype=torch.qint8)
+                quantized = "int8_dynamic_linear"
+        with torch.no_grad():
+            scripted = torch.jit.freeze(torch.jit.trace(opt, probe[:2]).eval())
+            ref = model(probe)
+            delta = float((scripted(probe) - ref).abs().max())
+            agree = float((scripted(probe).argmax(1) == ref.argmax(1)).float().mean())
+
+        meta = {
+            "format": TS_FORMAT,
+            "material_classes": classes,
+            "config": {
+                "sample_rate": int(cfg.get("sample_rate", 44100)),
+                "mono": bool(cfg.get("mono", True)),
+                "arch": cfg["arch"],
+                "window_frames": window,
+                "n_mels": n_mels,
+            },
+            "fused": bool(fuse),
+            "memory_format": "channels_last",
+            "quantized": quantized,
+            "source": {"file": os.path.basename(ckpt_path), "fingerprint": file_fingerprint(ckpt_path)},
+            "probe": {"max_logit_delta": delta, "argmax_agreement": agree},
+            "torch": torch.__version__,
+        }
+        parent = os.path.dirname(out_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        # Temp-Datei + replace, damit ein laufender Worker nie ein halbes Artefakt liest
+        tmp = out_path + ".tmp"
+        torch.jit.save(scripted, tmp, _extra_files={META_FILE: json.dumps(meta, indent=2)})
+        os.replace(tmp, out_path)
+    return meta
+
+
+def main(argv) -> int:
+    args = list(argv[1:])
+    if not args or args[0] != "export" or len(args) < 2:
+        print(__doc__.strip().split("Usage (CLI):")[-1].strip())
+        return 1
+    quantize = "--no-quant" not in args
+    fuse = "--no-fuse" not in args
+    args = [a for a in args if a not in ("--no-quant", "--no-fuse")]
+    validate_csv = ""
+    if "--validate" in args:
+        i = args.index("--validate")
+        if i + 1 >= len(args):
+            print("--validate erwartet eine Eval-CSV")
+            return 1
+        validate_csv = args[i + 1]
+        del args[i:i + 2]
+    ckpt = args[1]
+    out = args[2] if len(args) > 2 else ts_path_for(ckpt)
+
+    meta = export_torchscript(ckpt, out, quantize=quantize, fuse=fuse)
+    print(f"[DF95 AIWorker Material] {out}: {meta['config']['arch']}, fused={meta['fused']}, "
+          f"quant={meta['quantized'] or 'keine'}, {os.path.getsize(out) / 1024:.1f} KB")
+    print(f"[DF95 AIWorker Material] Abgleich (Zufalls-Features): Logits max. |Δ| = "
+          f"{meta['probe']['max_logit_delta']:.2e}, Argmax gleich {meta['probe']['argmax_agreement']:.0%}")
+    if validate_csv:
+        from df95_aiworker_material_eval_helper import compare_checkpoints, print_comparison
+        print_comparison(*compare_checkpoints(validate_csv, ckpt, out))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -66,6 +66,16 @@ D.h.:
 Dieses Template kümmert sich nur um das *Trainieren* und *Speichern*,
 nicht um das Live-Laden im Worker.
 
+Streaming-Training
+------------------
+
+Standardmäßig (TrainConfig.streaming = True) wird über einen DataLoader
+trainiert: Features werden erst beim Zugriff geladen (mehrere Worker-
+Prozesse, Feature Store), auf crop_frames gecroppt/gepaddet und in echten
+Mini-Batches (batch_size) verarbeitet. Alle checkpoint_every Steps wird ein
+Zwischen-Checkpoint im gleichen Format geschrieben. Mit --full-batch bzw.
+streaming = False läuft die ursprüngliche Variante (alles im Speicher).
+
 """
 
 import os
@@ -73,14 +83,28 @@ import csv
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 
-# Optional: wenn du PyTorch, torchaudio, librosa o.ä. nutzen möchtest,
-# kannst du die Imports aktivieren und in `FEATURE_BACKEND` festlegen.
-try:
-    import torch
-    import torchaudio
-except ImportError:
-    torch = None
-    torchaudio = None
+from df95_aiworker_audio_io import read_window
+from df95_aiworker_feature_store import FeatureStore, feature_params, open_feature_store
+
+# Optional: PyTorch + torchaudio (FEATURE_BACKEND). Erst require_torch() lädt
+# sie – der Modul-Import bleibt torch-frei (Eval-Helper, Material-Modell).
+torch = None
+torchaudio = None
+_TORCH_TRIED = False
+
+
+def require_torch() -> bool:
+    """Importiert torch/torchaudio beim ersten Aufruf; True, wenn beide verfügbar sind."""
+    global torch, torchaudio, _TORCH_TRIED
+    if not _TORCH_TRIED:
+        _TORCH_TRIED = True
+        try:
+            import torch as _torch
+            import torchaudio as _torchaudio
+        except ImportError:
+            return False
+        torch, torchaudio = _torch, _torchaudio
+    return torch is not None and torchaudio is not None
 
 
 # --------------------------------------------------------------------
@@ -96,7 +120,25 @@ class TrainConfig:
     num_epochs: int = 10
     batch_size: int = 16
     learning_rate: float = 1e-3
-    device: str = "cuda" if torch and torch.cuda.is_available() else "cpu"
+    device: str = ""       # leer = "cuda", falls verfügbar, sonst "cpu" (siehe resolve_device)
+    # Mel-Features in Support/DF95_AIWorker/Cache/features ablegen/wiederverwenden
+    use_feature_store: bool = True
+    feature_dir: str = ""   # leer = Default-Ordner des Feature Stores
+    # Streaming-Training (DataLoader, echte Mini-Batches) statt alles zu stapeln
+    streaming: bool = True
+    num_workers: int = 2          # DataLoader-Prozesse fürs Dekodieren
+    num_threads: int = 0          # torch.set_num_threads (0 = torch-Default)
+    crop_frames: int = 64         # feste Länge in Frames (Random-Crop / Padding)
+    checkpoint_every: int = 500   # Zwischen-Checkpoint alle N Steps (0 = nur am Ende)
+    log_every: int = 50
+    arch: str = "simple_conv_v2"  # siehe ARCHITECTURES
+
+
+def resolve_device(cfg: TrainConfig) -> str:
+    """cfg.device, bzw. bei leerem Wert cuda/cpu je nach Verfügbarkeit (setzt cfg.device)."""
+    if not cfg.device:
+        cfg.device = "cuda" if require_torch() and torch.cuda.is_available() else "cpu"
+    return cfg.device
 
 
 # Wähle hier, welchen Backend-Typ du später implementieren möchtest:
@@ -170,9 +212,13 @@ class LabelEncoder:
 # --------------------------------------------------------------------
 
 def load_waveform(path: str, cfg: TrainConfig):
-    if torchaudio is None:
+    if not require_torch():
         raise RuntimeError("torchaudio ist nicht installiert – bitte installieren oder eigenes Backend implementieren.")
-    wav, sr = torchaudio.load(path)
+    # WAV per memmap (df95_aiworker_audio_io), andere Formate über torchaudio
+    loaded = read_window(path)
+    if loaded is None:
+        raise RuntimeError(f"Audio nicht lesbar: {path}")
+    wav, sr = torch.from_numpy(loaded[0]), loaded[1]
     if cfg.mono and wav.shape[0] > 1:
         wav = wav.mean(dim=0, keepdim=True)
     if sr != cfg.sample_rate:
@@ -180,70 +226,207 @@ def load_waveform(path: str, cfg: TrainConfig):
     return wav  # Tensor [1, T]
 
 
-def waveform_to_features(wav):
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 64
+# Padding-Wert = Untergrenze von AmplitudeToDB (amin 1e-10 -> -100 dB), entspricht Stille
+PAD_DB = -100.0
+
+
+_FRONTENDS: Dict[int, Any] = {}
+
+
+def mel_frontend(sample_rate: int = 44100):
+    """MelSpectrogram + AmplitudeToDB, einmal pro Sample-Rate gebaut und wiederverwendet."""
+    frontend = _FRONTENDS.get(sample_rate)
+    if frontend is None:
+        frontend = torch.nn.Sequential(
+            torchaudio.transforms.MelSpectrogram(
+                sample_rate=sample_rate,
+                n_fft=N_FFT,
+                hop_length=HOP_LENGTH,
+                n_mels=N_MELS,
+            ),
+            torchaudio.transforms.AmplitudeToDB(),
+        )
+        _FRONTENDS[sample_rate] = frontend
+    return frontend
+
+
+def waveform_to_features(wav, sample_rate: int = 44100):
     """
     Placeholder: wandelt ein Waveform-Tensor in Feature-Tensor um.
     Du kannst hier z.B. eine Mel-Spectrogram-Transformation machen:
         - torchaudio.transforms.MelSpectrogram
         - torchaudio.transforms.AmplitudeToDB
     """
-    if torchaudio is None:
+    if not require_torch():
         raise RuntimeError("torchaudio ist nicht installiert – Feature-Backend muss angepasst werden.")
-    mel = torchaudio.transforms.MelSpectrogram(
-        sample_rate=44100,
-        n_fft=2048,
-        hop_length=512,
-        n_mels=64,
-    )(wav)
-    db = torchaudio.transforms.AmplitudeToDB()(mel)
-    return db  # Tensor [1, n_mels, time]
+    with torch.no_grad():
+        return mel_frontend(sample_rate)(wav)  # Tensor [1, n_mels, time]
 
 
-# --------------------------------------------------------------------
-# Einfaches Model-Template (CNN)
-# --------------------------------------------------------------------
+def feature_params_for(cfg: TrainConfig) -> Dict[str, Any]:
+    return feature_params(cfg.sample_rate, cfg.mono, N_FFT, HOP_LENGTH, N_MELS)
 
-class SimpleConvNet(torch.nn.Module):
-    """
-    Sehr einfaches Convolutional Network als Platzhalter für Material/Instrument-Klassifikation.
 
-    Input:  [B, 1, n_mels, T]
-    Output: Logits für N Klassen (z.B. Material-Klassen)
-    """
+def open_store_for(cfg: TrainConfig) -> Optional[FeatureStore]:
+    """Feature Store passend zu cfg (oder None, wenn deaktiviert/nicht verfügbar)."""
+    if not cfg.use_feature_store:
+        return None
+    return open_feature_store(feature_params_for(cfg), cfg.feature_dir)
 
-    def __init__(self, num_classes: int):
-        super().__init__()
-        self.conv = torch.nn.Sequential(
-            torch.nn.Conv2d(1, 16, kernel_size=3, padding=1),
-            torch.nn.BatchNorm2d(16),
-            torch.nn.ReLU(),
-            torch.nn.MaxPool2d(2),
-            torch.nn.Conv2d(16, 32, kernel_size=3, padding=1),
-            torch.nn.BatchNorm2d(32),
-            torch.nn.ReLU(),
-            torch.nn.MaxPool2d(2),
-        )
-        self.head = torch.nn.Sequential(
-            torch.nn.Linear(32 * 16 * 16, 128),
-            torch.nn.ReLU(),
-            torch.nn.Linear(128, num_classes),
-        )
 
-    def forward(self, x):
-        # x: [B, 1, M, T]
-        h = self.conv(x)
-        h = h.view(h.size(0), -1)
-        out = self.head(h)
-        return out
+def load_features(path: str, cfg: TrainConfig, store: Optional[FeatureStore] = None):
+    """Audio -> Mel-dB-Features [1, n_mels, T]; über den Feature Store, falls übergeben."""
+    if store is None:
+        return waveform_to_features(load_waveform(path, cfg), cfg.sample_rate)
+    if not require_torch():
+        raise RuntimeError("PyTorch ist nicht installiert.")
+    feat = store.get_or_compute(
+        path, lambda p: waveform_to_features(load_waveform(p, cfg), cfg.sample_rate)[0].numpy()
+    )
+    return torch.from_numpy(feat).unsqueeze(0)
+
+
+# --------------------------------------------------------------------
+# Model-Templates (CNN, siehe df95_aiworker_material_nets.py)
+# --------------------------------------------------------------------
+
+# Architektur-Versionen, wie sie in checkpoint["config"]["arch"] stehen.
+# Checkpoints ohne "arch" stammen von SimpleConvNet (v1).
+ARCH_V1 = "simple_conv_v1"
+ARCH_V2 = "simple_conv_v2"
+# Name der Klasse in df95_aiworker_material_nets
+ARCH_CLASSES = {
+    ARCH_V1: "SimpleConvNet",
+    ARCH_V2: "SimpleConvNetV2",
+}
+
+# Fensterlänge in Frames (v1 braucht genau 64: Head 32 * 16 * 16 nach zwei MaxPools)
+WINDOW_FRAMES = 64
+
+
+def build_model(arch: str, num_classes: int):
+    name = ARCH_CLASSES.get(arch or ARCH_V1)
+    if name is None:
+        raise RuntimeError(f"Unbekannte Modell-Architektur: {arch}")
+    if not require_torch():
+        raise RuntimeError("PyTorch ist nicht installiert – Modell kann nicht gebaut werden.")
+    import df95_aiworker_material_nets as nets
+    return getattr(nets, name)(num_classes=num_classes)
+
+
+def __getattr__(name: str):
+    # Kompatibilität: SimpleConvNet / SimpleConvNetV2 / ARCHITECTURES wie früher
+    # aus diesem Modul importierbar – torch wird erst dabei geladen.
+    if name in ARCH_CLASSES.values():
+        import df95_aiworker_material_nets as nets
+        return getattr(nets, name)
+    if name == "ARCHITECTURES":
+        import df95_aiworker_material_nets as nets
+        return {arch: getattr(nets, cls) for arch, cls in ARCH_CLASSES.items()}
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def load_checkpoint_model(ckpt_path: str):
+    """(Modell im eval-Modus, Klassen, Config) aus einem material_ckpt.pt (für Export-Tools)."""
+    if not require_torch():
+        raise RuntimeError("PyTorch ist nicht installiert – Checkpoint kann nicht geladen werden.")
+    ckpt = torch.load(ckpt_path, map_location="cpu")
+    classes = ckpt.get("material_classes") or []
+    cfg = dict(ckpt.get("config") or {})
+    if not classes or ckpt.get("model_state") is None:
+        raise RuntimeError("Checkpoint ohne material_classes/model_state.")
+    cfg["arch"] = cfg.get("arch") or ARCH_V1
+    model = build_model(cfg["arch"], len(classes))
+    model.load_state_dict(ckpt["model_state"])
+    model.eval()
+    return model, classes, cfg
+
+
+def window_starts(num_frames: int, window: int, max_windows: int) -> List[int]:
+    """Startframes gleichmäßig verteilter Fenster, vom Anfang bis zum Ende des Clips."""
+    if num_frames <= window:
+        return [0]
+    n = -(-(num_frames - window) // window) + 1
+    n = max(1, min(n, max_windows))
+    if n == 1:
+        return [0]
+    return [round(i * (num_frames - window) / (n - 1)) for i in range(n)]
+
+
+def frames_to_windows(feat, window: int = WINDOW_FRAMES, max_windows: int = 32):
+    """[1, M, T] -> [W, 1, M, window]; kurze Clips werden mit Stille gepaddet."""
+    t = feat.shape[-1]
+    if t < window:
+        return torch.nn.functional.pad(feat, (0, window - t), value=PAD_DB).unsqueeze(0)
+    return torch.stack([feat[..., s:s + window] for s in window_starts(t, window, max_windows)], dim=0)
+
+
+def predict_logits_windowed(model, feats: List[Any], window: int = WINDOW_FRAMES,
+                            max_windows: int = 32, device: str = "cpu"):
+    """Logits für mehrere Clips beliebiger Länge: pro Fenster rechnen, pro Clip mitteln.
+
+    feats: Liste von [1, M, T]-Tensoren. Gibt [len(feats), num_classes] zurück.
+    Die Kosten pro Clip sind durch max_windows begrenzt.
+    """
+    require_torch()
+    windows = [frames_to_windows(f, window, max_windows) for f in feats]
+    owner = torch.repeat_interleave(
+        torch.arange(len(windows)), torch.tensor([w.shape[0] for w in windows])
+    ).to(device)
+    logits = model(torch.cat(windows, dim=0).to(device))
+    summed = torch.zeros(len(windows), logits.shape[1], dtype=logits.dtype, device=logits.device)
+    summed.index_add_(0, owner, logits)
+    counts = torch.bincount(owner, minlength=len(windows)).to(logits.dtype).unsqueeze(1)
+    return summed / counts
 
 
 # --------------------------------------------------------------------
 # Training-Loop (Material-Klassifikation)
 # --------------------------------------------------------------------
 
+def make_checkpoint(model, material_classes: List[str], cfg: TrainConfig) -> Dict[str, Any]:
+    """Checkpoint-Format, das df95_aiworker_material_model._load_material_model() erwartet."""
+    return {
+        "model_state": model.state_dict(),
+        "material_classes": material_classes,
+        "config": {
+            "sample_rate": cfg.sample_rate,
+            "mono": cfg.mono,
+            "arch": cfg.arch,
+            "n_mels": N_MELS,
+            "window_frames": cfg.crop_frames,
+        },
+    }
+
+
+def save_checkpoint(ckpt: Dict[str, Any], path: str) -> None:
+    # Erst in eine Temp-Datei, damit ein laufender Worker nie einen halben Checkpoint liest
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    tmp = path + ".tmp"
+    torch.save(ckpt, tmp)
+    os.replace(tmp, path)
+
+
 def train_material_model(cfg: TrainConfig) -> Dict[str, Any]:
-    if torch is None or torchaudio is None:
+    """Trainiert das Material-Modell – streamend (Default) oder Full-Batch."""
+    if cfg.streaming:
+        return train_material_model_streaming(cfg)
+    return train_material_model_full_batch(cfg)
+
+
+def train_material_model_full_batch(cfg: TrainConfig) -> Dict[str, Any]:
+    """Ursprüngliche Variante: alle Features im Speicher, ein Schritt pro Epoche.
+
+    Setzt voraus, dass alle Clips gleich lang sind.
+    """
+    if not require_torch():
         raise RuntimeError("PyTorch/torchaudio sind nicht installiert. Bitte installieren oder Backend anpassen.")
+    resolve_device(cfg)
 
     samples = load_dataset_from_csv(cfg.csv_path)
     if not samples:
@@ -260,14 +443,19 @@ def train_material_model(cfg: TrainConfig) -> Dict[str, Any]:
     # Dataset als einfache Liste (für Template)
     features = []
     targets = []
-    for s in samples:
-        try:
-            wav = load_waveform(s.audio_path, cfg)
-            feat = waveform_to_features(wav)  # [1, M, T]
-            features.append(feat)
-            targets.append(mat_encoder.encode(s.material))
-        except Exception as e:
-            print(f"[WARN] Konnte Sample nicht laden/verarbeiten: {s.audio_path} ({e})")
+    store = open_store_for(cfg)
+    try:
+        for s in samples:
+            try:
+                feat = load_features(s.audio_path, cfg, store)  # [1, M, T]
+                features.append(feat)
+                targets.append(mat_encoder.encode(s.material))
+            except Exception as e:
+                print(f"[WARN] Konnte Sample nicht laden/verarbeiten: {s.audio_path} ({e})")
+    finally:
+        if store is not None:
+            print(f"[DF95 AIWorker Material] Feature Store: {store.hits} Treffer, {store.misses} neu berechnet")
+            store.close()
 
     if not features:
         raise RuntimeError("Keine Features extrahiert – bitte Pfade/Audio prüfen.")
@@ -277,7 +465,7 @@ def train_material_model(cfg: TrainConfig) -> Dict[str, Any]:
     y = torch.tensor(targets, dtype=torch.long)
 
     num_classes = len(mat_encoder.classes)
-    model = SimpleConvNet(num_classes=num_classes).to(cfg.device)
+    model = build_model(cfg.arch, num_classes).to(cfg.device)
     X = X.to(cfg.device)
     y = y.to(cfg.device)
 
@@ -294,16 +482,149 @@ def train_material_model(cfg: TrainConfig) -> Dict[str, Any]:
         print(f"[Epoch {epoch+1}/{cfg.num_epochs}] Loss: {loss.item():.4f}")
 
     # Checkpoint speichern
-    ckpt = {
-        "model_state": model.state_dict(),
-        "material_classes": mat_encoder.classes,
-        "config": {
-            "sample_rate": cfg.sample_rate,
-            "mono": cfg.mono,
-        },
-    }
-    os.makedirs(os.path.dirname(cfg.checkpoint_out), exist_ok=True)
-    torch.save(ckpt, cfg.checkpoint_out)
+    ckpt = make_checkpoint(model, mat_encoder.classes, cfg)
+    save_checkpoint(ckpt, cfg.checkpoint_out)
+    print(f"[DF95 AIWorker Material] Checkpoint gespeichert unter: {cfg.checkpoint_out}")
+
+    return ckpt
+
+
+# --------------------------------------------------------------------
+# Streaming-Training (Dataset + DataLoader)
+# --------------------------------------------------------------------
+
+def crop_or_pad(feat, frames: int, random_crop: bool = True):
+    """[1, M, T] -> [1, M, frames]: Random-(bzw. Anfangs-)Crop oder Padding mit Stille."""
+    t = feat.shape[-1]
+    if t > frames:
+        start = int(torch.randint(0, t - frames + 1, (1,)).item()) if random_crop else 0
+        return feat[..., start:start + frames]
+    if t < frames:
+        return torch.nn.functional.pad(feat, (0, frames - t), value=PAD_DB)
+    return feat
+
+
+class MaterialDataset:
+    """Dataset über die CSV-Samples: lädt Features erst beim Zugriff.
+
+    Map-Style (__len__/__getitem__) – der DataLoader braucht keine
+    torch-Basisklasse, das Modul bleibt so ohne torch importierbar.
+
+    Jeder DataLoader-Worker öffnet seinen eigenen Feature Store (SQLite-
+    Verbindungen dürfen nicht über fork geteilt werden).
+    """
+
+    def __init__(self, samples: List[TrainSample], encoder: LabelEncoder, cfg: TrainConfig,
+                 random_crop: bool = True):
+        self.items = [(s.audio_path, encoder.encode(s.material)) for s in samples]
+        self.items = [(p, y) for p, y in self.items if y >= 0]
+        self.cfg = cfg
+        self.random_crop = random_crop
+        self._store = None
+        self._store_pid = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _feature_store(self) -> Optional[FeatureStore]:
+        if self._store_pid != os.getpid():
+            self._store = open_store_for(self.cfg)
+            self._store_pid = os.getpid()
+        return self._store
+
+    def __getitem__(self, i: int):
+        path, target = self.items[i]
+        store = self._feature_store()
+        try:
+            feat = load_features(path, self.cfg, store)
+            if store is not None:
+                store.flush()
+        except Exception as e:
+            print(f"[WARN] Konnte Sample nicht laden/verarbeiten: {path} ({e})")
+            return None
+        return crop_or_pad(feat, self.cfg.crop_frames, self.random_crop), target
+
+
+def collate_skip_broken(batch):
+    """Wie default_collate, lässt aber nicht ladbare Samples (None) weg."""
+    batch = [b for b in batch if b is not None]
+    if not batch:
+        return None
+    require_torch()
+    feats, targets = zip(*batch)
+    return torch.stack(feats, dim=0), torch.tensor(targets, dtype=torch.long)
+
+
+def train_material_model_streaming(cfg: TrainConfig) -> Dict[str, Any]:
+    """Mini-Batch-Training mit DataLoader; hält nie mehr als ein paar Batches im Speicher."""
+    if not require_torch():
+        raise RuntimeError("PyTorch/torchaudio sind nicht installiert. Bitte installieren oder Backend anpassen.")
+    resolve_device(cfg)
+
+    if cfg.num_threads > 0:
+        torch.set_num_threads(cfg.num_threads)
+
+    samples = load_dataset_from_csv(cfg.csv_path)
+    if not samples:
+        raise RuntimeError(f"Keine Samples in CSV: {cfg.csv_path}")
+
+    material_labels = [s.material for s in samples if s.material]
+    if not material_labels:
+        raise RuntimeError("Keine 'material'-Labels in CSV gefunden.")
+
+    mat_encoder = LabelEncoder()
+    mat_encoder.fit(material_labels)
+
+    dataset = MaterialDataset(samples, mat_encoder, cfg)
+    loader = torch.utils.data.DataLoader(
+        dataset,
+        batch_size=max(1, cfg.batch_size),
+        shuffle=True,
+        num_workers=max(0, cfg.num_workers),
+        collate_fn=collate_skip_broken,
+        pin_memory=cfg.device.startswith("cuda"),
+        persistent_workers=cfg.num_workers > 0,
+    )
+
+    model = build_model(cfg.arch, len(mat_encoder.classes)).to(cfg.device)
+    criterion = torch.nn.CrossEntropyLoss()
+    optim = torch.optim.Adam(model.parameters(), lr=cfg.learning_rate)
+
+    print(f"[DF95 AIWorker Material] Streaming-Training: {len(dataset)} Samples, "
+          f"batch={cfg.batch_size}, workers={cfg.num_workers}, threads={torch.get_num_threads()}")
+
+    step = 0
+    model.train()
+    for epoch in range(cfg.num_epochs):
+        loss_sum = 0.0
+        seen = 0
+        for batch in loader:
+            if batch is None:
+                continue
+            X, y = batch
+            X = X.to(cfg.device, non_blocking=True)
+            y = y.to(cfg.device, non_blocking=True)
+
+            optim.zero_grad()
+            loss = criterion(model(X), y)
+            loss.backward()
+            optim.step()
+
+            step += 1
+            loss_sum += loss.item() * len(y)
+            seen += len(y)
+            if cfg.log_every and step % cfg.log_every == 0:
+                print(f"  [Step {step}] Loss: {loss.item():.4f}")
+            if cfg.checkpoint_every and step % cfg.checkpoint_every == 0:
+                save_checkpoint(make_checkpoint(model, mat_encoder.classes, cfg), cfg.checkpoint_out)
+                print(f"  [Step {step}] Zwischen-Checkpoint: {cfg.checkpoint_out}")
+
+        if seen == 0:
+            raise RuntimeError("Keine Features extrahiert – bitte Pfade/Audio prüfen.")
+        print(f"[Epoch {epoch+1}/{cfg.num_epochs}] Loss: {loss_sum / seen:.4f}  ({seen} Samples)")
+
+    ckpt = make_checkpoint(model, mat_encoder.classes, cfg)
+    save_checkpoint(ckpt, cfg.checkpoint_out)
     print(f"[DF95 AIWorker Material] Checkpoint gespeichert unter: {cfg.checkpoint_out}")
 
     return ckpt
@@ -318,14 +639,35 @@ def main():
     Beispiel-CLI:
 
         python df95_aiworker_material_train_template.py path/to/train.csv path/to/checkpoints/material_ckpt.pt
+
+    Optionen:
+        --epochs N --batch N --workers N --threads N --checkpoint-every N
+        --full-batch   ursprüngliches Full-Batch-Training (alles im Speicher)
     """
     import sys
-    if len(sys.argv) < 3:
-        print("Usage: python df95_aiworker_material_train_template.py <train_csv> <checkpoint_out>")
+    args = list(sys.argv[1:])
+    options = {"--epochs": "num_epochs", "--batch": "batch_size", "--workers": "num_workers",
+               "--threads": "num_threads", "--checkpoint-every": "checkpoint_every"}
+    overrides: Dict[str, Any] = {}
+    if "--full-batch" in args:
+        args.remove("--full-batch")
+        overrides["streaming"] = False
+    for opt, field in options.items():
+        if opt in args:
+            i = args.index(opt)
+            if i + 1 >= len(args):
+                print(f"{opt} erwartet einen Wert")
+                sys.exit(1)
+            overrides[field] = int(args[i + 1])
+            del args[i:i + 2]
+
+    if len(args) < 2:
+        print("Usage: python df95_aiworker_material_train_template.py <train_csv> <checkpoint_out>"
+              " [--epochs N] [--batch N] [--workers N] [--threads N] [--checkpoint-every N] [--full-batch]")
         sys.exit(1)
-    csv_path = sys.argv[1]
-    ckpt_out = sys.argv[2]
-    cfg = TrainConfig(csv_path=csv_path, checkpoint_out=ckpt_out)
+    csv_path = args[0]
+    ckpt_out = args[1]
+    cfg = TrainConfig(csv_path=csv_path, checkpoint_out=ckpt_out, **overrides)
     train_material_model(cfg)
 
 
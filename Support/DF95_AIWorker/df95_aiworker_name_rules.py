@@ -0,0 +1,242 @@
+"""
+DF95 AIWorker – Dateinamen-Heuristik (gemeinsame Keyword-Tabelle)
+=================================================================
+
+Eine einzige, datengetriebene Keyword-Tabelle für alle Heuristik-Backends:
+
+    - Drum-Role   (df95_aiworker_drumrole_engine, df95_aiworker_drumrole_example)
+    - Material    (df95_aiworker_material_model)
+    - Instrument  (df95_aiworker_material_model)
+
+Die Tabelle wird einmal in einen einzigen Regex kompiliert (alle Keywords als
+Präfix-Baum/Trie-Alternation). classify_name() lowercased den
+Namen genau einmal und liefert Role, Material und Instrument in einem
+Durchlauf – mit derselben Prioritätsreihenfolge und denselben Confidences wie
+die früheren `in`-Kaskaden.
+
+Regeln je Achse sind nach Priorität sortiert; die erste Regel mit einem
+Treffer gewinnt:
+
+    {
+      "drum_role":  [ {"label": "KICK", "confidence": 0.75, "keywords": ["kick", " bd", ...]}, ... ],
+      "material":   [ {"label": "WOOD", "keywords": ["wood", "holz", ...]}, ... ],
+      "instrument": [ {"label": "SNARE", "keywords": ["snare"]}, ... ]
+    }
+
+Überschreiben lässt sich die Tabelle (ganz oder pro Achse) über den Key
+"name_rules" in df95_aiworker_drumrole_config.json.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+AXES = ("drum_role", "material", "instrument")
+
+DEFAULT_RULES_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "df95_aiworker_drumrole_config.json"
+)
+
+DEFAULT_NAME_RULES: Dict[str, List[Dict[str, Any]]] = {
+    "drum_role": [
+        {"label": "KICK", "confidence": 0.75, "keywords": ["kick", " bd", "bassdrum", "_bd_"]},
+        {"label": "SNARE", "confidence": 0.75, "keywords": ["snare", " sd", "snr"]},
+        {"label": "HIHAT", "confidence": 0.7, "keywords": ["hihat", "hi-hat", " hat", " hh"]},
+        {"label": "TOM", "confidence": 0.7, "keywords": ["tom", "tomh", "tomm", "toml", "floor"]},
+        {"label": "RIDE", "confidence": 0.65, "keywords": ["ride"]},
+        {"label": "CRASH", "confidence": 0.65, "keywords": ["crash", "splash", "china"]},
+        {"label": "AMBIENCE", "confidence": 0.6, "keywords": ["amb", "room", "atmo", "reverb"]},
+        {"label": "FX", "confidence": 0.6, "keywords": ["fx", "impact", "hit", "whoosh", "rise"]},
+        {"label": "PERC", "confidence": 0.6, "keywords": ["perc", "clap", "shaker", "snap"]},
+    ],
+    "material": [
+        {"label": "WOOD", "keywords": ["wood", "holz", "branch", "stick"]},
+        {"label": "METAL", "keywords": ["metal", "metall", "iron", "steel", "clang"]},
+        {"label": "GLASS", "keywords": ["glass", "glas", "bottle", "shard"]},
+        {"label": "WATER", "keywords": ["water", "rain", "river", "wave"]},
+        {"label": "STONE", "keywords": ["stone", "rock", "gravel"]},
+        {"label": "DRUM", "keywords": ["drum", "snare", "kick", "tom", "hihat", "hi-hat", "cymbal", "ride", "crash"]},
+    ],
+    "instrument": [
+        {"label": "SNARE", "keywords": ["snare"]},
+        {"label": "KICK", "keywords": ["kick", "bd_", "bassdrum"]},
+        {"label": "TOM", "keywords": ["tom"]},
+        {"label": "HIHAT", "keywords": ["hihat", "hi-hat", "hat_"]},
+        {"label": "CYMBAL", "keywords": ["cymbal", "ride", "crash"]},
+        {"label": "BELL", "keywords": ["bell"]},
+    ],
+}
+
+
+@dataclass
+class NameGuess:
+    drum_role: str
+    drum_confidence: float
+    material: str
+    instrument: str
+
+
+_EMPTY_GUESS = NameGuess(drum_role="", drum_confidence=0.0, material="", instrument="")
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """Baut aus den Keywords eine Trie-förmige Alternation.
+
+    "tom", "tomh", "toml" -> "tom(?:h|l)?" statt "tomh|toml|tom". Der Regex
+    verzweigt so pro Zeichen nur einmal und matcht an jeder Position das
+    längste Keyword.
+    """
+    trie: Dict[str, Any] = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+_MEMO_LIMIT = 8192
+
+
+class NameClassifier:
+    """Kompilierte Form der Keyword-Tabelle (ein Regex für alle Achsen)."""
+
+    def __init__(self, rules: Dict[str, List[Dict[str, Any]]]):
+        self.rules = {axis: list(rules.get(axis) or []) for axis in AXES}
+
+        # Pro Achse: keyword -> (Regel-Index, Label, Confidence) der ersten Regel mit diesem Keyword
+        self._rank: Dict[str, Dict[str, tuple]] = {}
+        keywords = set()
+        for axis in AXES:
+            ranks: Dict[str, tuple] = {}
+            for idx, rule in enumerate(self.rules[axis]):
+                label = str(rule.get("label") or "")
+                conf = float(rule.get("confidence", 0.0))
+                for kw in rule.get("keywords") or []:
+                    kw = str(kw).lower()
+                    if kw and kw not in ranks:
+                        ranks[kw] = (idx, label, conf)
+                        keywords.add(kw)
+            self._rank[axis] = ranks
+
+        # Der Regex prüft jede Position, deren Zeichen ein Keyword beginnen kann,
+        # und liefert dort das längste Keyword (überlappende Treffer inklusive).
+        # Kürzere Keywords, die darin enthalten sind, werden über _implied
+        # mitgezählt – so entspricht das Ergebnis exakt `kw in name`.
+        ordered = sorted(keywords, key=lambda k: (-len(k), k))
+        self._implied = {kw: tuple(k for k in ordered if k in kw) for kw in ordered}
+        if ordered:
+            # "[ks...](?<=(?=(TRIE)).)": das konsumierte Startzeichen erlaubt dem
+            # Regex-Engine schnelles Vorspulen, der Lookahead im Lookbehind fängt
+            # das Keyword ab genau dieser Position.
+            first = "".join(sorted({k[0] for k in ordered}))
+            self._regex: Optional[re.Pattern] = re.compile(
+                "[" + re.escape(first) + "](?<=(?=(" + _trie_pattern(ordered) + ")).)"
+            )
+        else:
+            self._regex = None
+
+        # Viele Namen liefern dieselbe Trefferfolge -> Ergebnis pro Folge merken
+        self._memo: Dict[tuple, NameGuess] = {}
+
+    def classify(self, name: str) -> NameGuess:
+        if self._regex is None:
+            return _EMPTY_GUESS
+        found = tuple(self._regex.findall(name.lower()))
+        if not found:
+            return _EMPTY_GUESS
+        guess = self._memo.get(found)
+        if guess is None:
+            if len(self._memo) >= _MEMO_LIMIT:
+                self._memo.clear()
+            guess = self._resolve(found)
+            self._memo[found] = guess
+        return guess
+
+    def _resolve(self, found: tuple) -> NameGuess:
+        hits = set()
+        for kw in found:
+            hits.update(self._implied[kw])
+
+        best = {}
+        for axis in AXES:
+            ranks = self._rank[axis]
+            top = None
+            for kw in hits:
+                r = ranks.get(kw)
+                if r is not None and (top is None or r[0] < top[0]):
+                    top = r
+            best[axis] = top
+
+        role = best["drum_role"]
+        return NameGuess(
+            drum_role=role[1] if role else "",
+            drum_confidence=role[2] if role else 0.0,
+            material=best["material"][1] if best["material"] else "",
+            instrument=best["instrument"][1] if best["instrument"] else "",
+        )
+
+
+def merge_rules(overrides: Optional[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Default-Tabelle, pro Achse ersetzt durch "name_rules" aus der Config."""
+    rules = {axis: DEFAULT_NAME_RULES[axis] for axis in AXES}
+    for axis, table in (overrides or {}).items():
+        if axis in rules and isinstance(table, list):
+            rules[axis] = table
+    return rules
+
+
+_COMPILED: Dict[str, NameClassifier] = {}
+_COMPILED_BY_ID: Dict[int, tuple] = {}
+
+
+def get_classifier(overrides: Optional[Dict[str, Any]] = None) -> NameClassifier:
+    """Kompiliert die Tabelle einmal pro Prozess (pro unterschiedlicher Override-Tabelle).
+
+    Wird pro Datei aufgerufen – derselbe Override-Dict wird daher zuerst über
+    seine Identität nachgeschlagen, erst dann über seinen JSON-Inhalt.
+    """
+    if not overrides:
+        key = ""
+    else:
+        by_id = _COMPILED_BY_ID.get(id(overrides))
+        if by_id is not None and by_id[0] is overrides:
+            return by_id[1]
+        key = json.dumps(overrides, sort_keys=True)
+
+    clf = _COMPILED.get(key)
+    if clf is None:
+        clf = NameClassifier(merge_rules(overrides))
+        _COMPILED[key] = clf
+    if overrides:
+        _COMPILED_BY_ID[id(overrides)] = (overrides, clf)
+    return clf
+
+
+def load_rules_from_config(config_path: str = DEFAULT_RULES_CONFIG_PATH) -> Optional[Dict[str, Any]]:
+    """Liest den optionalen "name_rules"-Block aus der Drum-Role-Config."""
+    if not os.path.isfile(config_path):
+        return None
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    rules = data.get("name_rules") if isinstance(data, dict) else None
+    return rules if isinstance(rules, dict) else None
+
+
+def classify_name(name: str, overrides: Optional[Dict[str, Any]] = None) -> NameGuess:
+    return get_classifier(overrides).classify(name)
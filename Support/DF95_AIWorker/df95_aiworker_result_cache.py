@@ -0,0 +1,272 @@
+"""
+DF95 AIWorker – Result Cache
+============================
+
+Persistenter On-Disk-Cache für Klassifikations-Ergebnisse der AIWorker
+(Drum-Role Engine, Material-Mode des UCS-Workers).
+
+Idee:
+    Ein Ergebnis hängt nur ab von
+        - der Audiodatei (Pfad + Größe + mtime, optional Content-Hash)
+        - dem Backend (heuristic, yamnet, material, ...)
+        - dem Modell (Checkpoint-Fingerprint bzw. Code-Stand der Heuristik)
+        - der Konfiguration (Digest über die relevanten Config-Werte)
+
+    Ist all das unverändert, kann das Ergebnis vom letzten Lauf
+    wiederverwendet werden – ein erneuter 50k-Files-Job läuft dann in
+    Sekunden statt Stunden.
+
+Speicher:
+    Support/DF95_AIWorker/Cache/df95_aiworker_results.sqlite
+
+    Eine SQLite-Datei (stdlib), eine Tabelle. Eviction nach LRU, begrenzt
+    über max_entries und max_bytes.
+
+Verwendung:
+
+    cache = ResultCache()
+    ctx = cache.context("heuristic", fingerprint, cfg)
+    hit = cache.get(path, ctx)
+    if hit is None:
+        value = ...
+        cache.put(path, ctx, value)
+    payload["cache"] = cache.stats(settle=True)
+    cache.close()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cache")
+DEFAULT_CACHE_FILE = "df95_aiworker_results.sqlite"
+
+DEFAULT_MAX_ENTRIES = 500000
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_HASH_CHUNK = 1024 * 1024
+
+
+# ------------------------------------------------------------
+# Fingerprints / Digests
+# ------------------------------------------------------------
+
+def content_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_FILE_FP_CACHE: Dict[str, Any] = {}
+
+
+def file_fingerprint(path: str) -> str:
+    """Fingerprint einer (kleinen) Datei, z.B. Checkpoint oder Python-Modul.
+
+    Größe + mtime + SHA1 des Inhalts; pro Prozess gecacht, solange sich
+    Größe/mtime nicht ändern. Gibt "" zurück, wenn die Datei fehlt.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    sig = (st.st_size, st.st_mtime_ns)
+    cached = _FILE_FP_CACHE.get(path)
+    if cached and cached[0] == sig:
+        return cached[1]
+    fp = f"{st.st_size}:{content_hash(path)}"
+    _FILE_FP_CACHE[path] = (sig, fp)
+    return fp
+
+
+def config_digest(cfg: Any) -> str:
+    raw = json.dumps(cfg, sort_keys=True, ensure_ascii=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# ------------------------------------------------------------
+# Cache
+# ------------------------------------------------------------
+
+class ResultCache:
+    """SQLite-basierter LRU-Cache für Per-File-Ergebnisse (JSON-serialisierbar)."""
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        use_content_hash: bool = False,
+    ):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, DEFAULT_CACHE_FILE)
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.use_content_hash = bool(use_content_hash)
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results(last_used)")
+        self._touched: Dict[str, float] = {}
+        self._pending = 0
+
+    # -- Keys -------------------------------------------------
+
+    @staticmethod
+    def context(backend: str, model_fingerprint: str, cfg: Any) -> str:
+        """Fasst Backend, Modell und Config zu einem Kontext-Digest zusammen."""
+        raw = f"{backend}\n{model_fingerprint}\n{config_digest(cfg)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def file_key(self, path: str, context: str) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        parts = [context, os.path.abspath(path), str(st.st_size), str(st.st_mtime_ns)]
+        if self.use_content_hash:
+            try:
+                parts.append(content_hash(path))
+            except OSError:
+                return None
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+    # -- Zugriff ----------------------------------------------
+
+    def get(self, path: str, context: str) -> Optional[Dict[str, Any]]:
+        key = self.file_key(path, context)
+        if key is None:
+            self.misses += 1
+            return None
+        row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = time.time()
+        return json.loads(row[0])
+
+    def put(self, path: str, context: str, value: Dict[str, Any]) -> None:
+        key = self.file_key(path, context)
+        if key is None:
+            return
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        self._db.execute(
+            "INSERT OR REPLACE INTO results(key, value, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, raw, len(raw), time.time()),
+        )
+        self.stores += 1
+        self._pending += 1
+        if self._pending >= 1000:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._touched:
+            self._db.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                [(ts, key) for key, ts in self._touched.items()],
+            )
+            self._touched.clear()
+        self._db.commit()
+        self._pending = 0
+
+    def evict(self) -> int:
+        """LRU-Eviction bis max_entries und max_bytes eingehalten sind."""
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        removed = 0
+
+        over_entries = count - self.max_entries
+        if over_entries > 0:
+            self._db.execute(
+                "DELETE FROM results WHERE key IN ("
+                " SELECT key FROM results ORDER BY last_used ASC LIMIT ?)",
+                (over_entries,),
+            )
+            removed += over_entries
+            count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            doomed = []
+            freed = 0
+            for key, size in self._db.execute("SELECT key, size FROM results ORDER BY last_used ASC"):
+                doomed.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            self._db.executemany("DELETE FROM results WHERE key = ?", doomed)
+            removed += len(doomed)
+
+        self.evictions += removed
+        return removed
+
+    def close(self) -> None:
+        self.flush()
+        self.evict()
+        self._db.commit()
+        self._db.close()
+
+    def stats(self, settle: bool = False) -> Dict[str, Any]:
+        """Zähler des Laufs. settle=True schreibt vorher fest und evicted –
+        sonst stehen die Evictions erst nach close() fest (für Result-Payloads)."""
+        if settle:
+            self.flush()
+            self.evict()
+            self._db.commit()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+def cache_from_config(cfg: Optional[Dict[str, Any]]) -> Optional[ResultCache]:
+    """Baut einen ResultCache aus einem "cache"-Config-Block (oder None, wenn deaktiviert).
+
+        "cache": {
+          "enabled": true,
+          "dir": "",               # leer = Support/DF95_AIWorker/Cache
+          "content_hash": false,
+          "max_entries": 500000,
+          "max_mb": 512
+        }
+    """
+    cfg = cfg or {}
+    if not cfg.get("enabled", True):
+        return None
+    try:
+        return ResultCache(
+            cache_dir=cfg.get("dir") or DEFAULT_CACHE_DIR,
+            max_entries=int(cfg.get("max_entries", DEFAULT_MAX_ENTRIES)),
+            max_bytes=int(float(cfg.get("max_mb", DEFAULT_MAX_BYTES / (1024 * 1024))) * 1024 * 1024),
+            use_content_hash=bool(cfg.get("content_hash", False)),
+        )
+    except (OSError, sqlite3.Error) as e:
+        print(f"[DF95 AIWorker Cache] Cache nicht verfügbar, fahre ohne fort: {e}")
+        return None
@@ -0,0 +1,183 @@
+"""
+DF95 AIWorker – Streaming Result Writer (JSONL, resumable)
+==========================================================
+
+Statt alle Ergebnisse im Speicher zu sammeln und am Ende mit json.dump
+zu schreiben, hängt der Streaming-Modus pro fertiger Datei eine JSON-Zeile
+an eine Partial-Datei an:
+
+    <result>.partial.jsonl
+
+    Zeile 1 : Header  {"df95_stream": 1, "job": "...", ...}
+    Zeile 2+: ein Result-Objekt pro Zeile (gleiche Felder wie im Result-JSON)
+
+- fsync erfolgt batchweise (alle `fsync_every` Zeilen) – ein Crash verliert
+  höchstens den letzten Batch.
+- Beim Neustart mit demselben Job werden bereits geschriebene Dateien
+  übersprungen (load_partial()). Eine abgeschnittene letzte Zeile wird
+  verworfen.
+- finalize_jsonl() wandelt die Partial-Datei in das bestehende Result-JSON
+  (DF95_AIWorker_UCS_V1 / DF95_AIWorker_DrumRole_V2) um, Zeile für Zeile,
+  ohne die Ergebnisse komplett in den Speicher zu laden.
+  DF95_Fieldrec_AIWorker_ApplyToItems.lua liest das Ergebnis unverändert.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Optional, Set, Tuple
+
+STREAM_FORMAT = 1
+DEFAULT_FSYNC_EVERY = 200
+
+
+def partial_path_for(out_path: str) -> str:
+    return out_path + ".partial.jsonl"
+
+
+# ------------------------------------------------------------
+# Writer
+# ------------------------------------------------------------
+
+class JsonlResultWriter:
+    """Append-only JSONL-Writer mit batchweisem fsync."""
+
+    def __init__(self, path: str, header: Dict[str, Any], resume: bool = True,
+                 fsync_every: int = DEFAULT_FSYNC_EVERY):
+        self.path = path
+        self.fsync_every = max(1, int(fsync_every))
+        self.done: Set[str] = set()
+        self._since_sync = 0
+
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        old_header, done, good_bytes = load_partial(path) if resume else (None, set(), 0)
+        if old_header is not None and _same_job(old_header, header):
+            self.done = done
+            self._f = open(path, "r+b")
+            self._f.truncate(good_bytes)
+            self._f.seek(good_bytes)
+        else:
+            if old_header is not None:
+                print(f"[DF95 AIWorker Stream] Partial-Datei gehört zu anderem Job – starte neu: {path}")
+            self._f = open(path, "wb")
+            self._write_line({"df95_stream": STREAM_FORMAT, **header})
+            self.sync()
+
+    def _write_line(self, obj: Dict[str, Any]) -> None:
+        line = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        self._f.write(line.encode("utf-8") + b"\n")
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        self._write_line(entry)
+        full = entry.get("full_path")
+        if full:
+            self.done.add(full)
+        self._since_sync += 1
+        if self._since_sync >= self.fsync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._since_sync = 0
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        self.sync()
+        self._f.close()
+
+    def __enter__(self) -> "JsonlResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _same_job(old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+    if old.get("df95_stream") != STREAM_FORMAT:
+        return False
+    for k, v in new.items():
+        if old.get(k) != v:
+            return False
+    return True
+
+
+# ------------------------------------------------------------
+# Lesen / Resume
+# ------------------------------------------------------------
+
+def load_partial(path: str) -> Tuple[Optional[Dict[str, Any]], Set[str], int]:
+    """Liest eine Partial-Datei.
+
+    Gibt (header, done_paths, good_bytes) zurück. good_bytes ist die Länge
+    des gültigen Präfixes (alles bis zur letzten vollständigen Zeile).
+    (None, set(), 0), wenn die Datei fehlt oder keinen gültigen Header hat.
+    """
+    if not os.path.isfile(path):
+        return None, set(), 0
+
+    header: Optional[Dict[str, Any]] = None
+    done: Set[str] = set()
+    good = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                obj = json.loads(raw)
+            except ValueError:
+                break
+            if header is None:
+                if not isinstance(obj, dict) or "df95_stream" not in obj:
+                    return None, set(), 0
+                header = obj
+            else:
+                full = obj.get("full_path") if isinstance(obj, dict) else None
+                if full:
+                    done.add(full)
+            good += len(raw)
+    return header, done, good
+
+
+def finalize_jsonl(jsonl_path: str, out_path: str, payload: Dict[str, Any],
+                   remove_partial: bool = True) -> int:
+    """Schreibt das finale Result-JSON aus der Partial-Datei.
+
+    `payload` enthält die Top-Level-Felder (version, backend, ...); "results"
+    wird Zeile für Zeile aus der JSONL-Datei übernommen. Gibt die Anzahl der
+    geschriebenen Ergebnisse zurück.
+    """
+    header, _, good = load_partial(jsonl_path)
+    if header is None:
+        raise RuntimeError(f"Keine gültige Partial-Datei: {jsonl_path}")
+
+    tmp_path = out_path + ".tmp"
+    count = 0
+    with open(jsonl_path, "rb") as src, open(tmp_path, "w", encoding="utf-8") as dst:
+        dst.write("{\n")
+        for k, v in payload.items():
+            if k == "results":
+                continue
+            dst.write(f"  {json.dumps(k)}: {json.dumps(v, ensure_ascii=False)},\n")
+        dst.write('  "results": [')
+
+        src.readline()  # Header
+        consumed = src.tell()
+        for raw in src:
+            consumed += len(raw)
+            if consumed > good:
+                break
+            line = raw.decode("utf-8").rstrip("\n")
+            dst.write(("\n    " if count == 0 else ",\n    ") + line)
+            count += 1
+        dst.write("\n  ]\n}\n" if count else "]\n}\n")
+
+    os.replace(tmp_path, out_path)
+    if remove_partial:
+        os.remove(jsonl_path)
+    return count
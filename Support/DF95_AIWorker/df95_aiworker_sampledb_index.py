@@ -0,0 +1,326 @@
+"""
+DF95 AIWorker – SampleDB Index (Streaming-Parser + Sidecar)
+===========================================================
+
+Die SampleDB (DF95_SampleDB_Multi_UCS.json) kann mehrere hundert MB groß
+sein. Die Offline-Tools brauchen daraus meist nur einen Index
+
+    normalisierter Pfad -> wenige Felder (df95_material, df95_instrument, ...)
+
+Dieses Modul
+
+    - liest die Items per Streaming-Parser (json.JSONDecoder.raw_decode über
+      einen gleitenden Puffer), ohne das ganze Dokument zu materialisieren;
+      unterstützt {"items": [...], ...} und ein nacktes [...]
+    - baut daraus den pfad-normalisierten Index
+    - legt den Index als kompakte Sidecar-Datei ab
+        <SampleDB>.df95index       (bzw. Support/DF95_AIWorker/Cache/sampledb/,
+                                    wenn neben der DB nicht geschrieben werden kann)
+      und verwendet ihn wieder, solange Größe und mtime der SampleDB gleich sind.
+      Der Sidecar ist reines JSON (Wertetabelle + Zeilen mit Indizes) – er liegt
+      in Datenordnern (Netzlaufwerk, Sample-Packs) und wird daher nie ungeprüft
+      deserialisiert.
+
+Verwendung:
+
+    idx = load_sampledb_index("D:/.../DF95_SampleDB_Multi_UCS.json")
+    item = idx.get(norm_path(full_path))     # dict mit INDEX_FIELDS oder None
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SIDECAR_SUFFIX = ".df95index"
+SIDECAR_FORMAT = 2  # 2 = JSON (1 = pickle, wird nicht mehr gelesen)
+FALLBACK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cache", "sampledb")
+
+# Felder, die im Index landen (alles andere bleibt in der SampleDB)
+INDEX_FIELDS = (
+    "df95_material",
+    "df95_instrument",
+    "ucs_category",
+    "ucs_subcategory",
+    "df95_catid",
+    "ai_model",
+    "ai_confidence",
+)
+
+# Felder, die einen Pfad enthalten können (in dieser Reihenfolge)
+PATH_FIELDS = ("full_path", "path", "file")
+
+_CHUNK = 1 << 20
+
+
+def norm_path(p: str) -> str:
+    """Pfad-Schlüssel für den Abgleich SampleDB <-> Results (abspath, "/", lowercase)."""
+    return os.path.abspath(p).replace("\\", "/").lower()
+
+
+def item_path(it: Any) -> str:
+    if not isinstance(it, dict):
+        return ""
+    for k in PATH_FIELDS:
+        v = it.get(k)
+        if v:
+            return v
+    return ""
+
+
+# ------------------------------------------------------------
+# Streaming-Parser
+# ------------------------------------------------------------
+
+class _JsonStream:
+    """Minimaler Pull-Parser: liest Top-Level-Struktur, dekodiert Werte per raw_decode."""
+
+    _WS = " \t\r\n"
+
+    def __init__(self, f, chunk: int = _CHUNK):
+        self.f = f
+        self.chunk = chunk
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk)
+        if not data:
+            self.eof = True
+            return False
+        # Verbrauchten Teil verwerfen, damit der Puffer klein bleibt
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Nächstes Nicht-Whitespace-Zeichen (ohne es zu verbrauchen), "" am Ende."""
+        while True:
+            buf = self.buf
+            n = len(buf)
+            pos = self.pos
+            while pos < n and buf[pos] in self._WS:
+                pos += 1
+            self.pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"SampleDB-JSON: '{ch}' erwartet, '{got or 'EOF'}' gefunden")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Zahlen/Literale am Pufferende könnten abgeschnitten sein
+            if end >= len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def iter_array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            ch = self.peek()
+            self.pos += 1
+            if ch == "]":
+                return
+            if ch != ",":
+                raise ValueError(f"SampleDB-JSON: ',' oder ']' erwartet, '{ch or 'EOF'}' gefunden")
+
+
+def iter_sampledb_items(path: str) -> Iterator[dict]:
+    """Liefert die Items der SampleDB einzeln, ohne das Dokument komplett zu laden."""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        js = _JsonStream(f)
+        first = js.peek()
+        if first == "[":
+            yield from js.iter_array()
+            return
+        if first != "{":
+            return
+
+        js.expect("{")
+        if js.peek() == "}":
+            return
+        while True:
+            key = js.value()
+            js.expect(":")
+            if key == "items" and js.peek() == "[":
+                yield from js.iter_array()
+            else:
+                js.value()  # andere Top-Level-Felder überspringen
+            ch = js.peek()
+            js.pos += 1
+            if ch != ",":
+                return
+
+
+# ------------------------------------------------------------
+# Index + Sidecar
+# ------------------------------------------------------------
+
+class SampleDBIndex:
+    """Normalisierter Pfad -> Feld-Dict (nur INDEX_FIELDS), speicherschonend als Tupel gehalten."""
+
+    def __init__(self, rows: Dict[str, tuple], fields: Tuple[str, ...] = INDEX_FIELDS):
+        self.rows = rows
+        self.fields = tuple(fields)
+
+    def get(self, key: str, default: Optional[dict] = None) -> Optional[dict]:
+        row = self.rows.get(key)
+        if row is None:
+            return default
+        return dict(zip(self.fields, row))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def items(self) -> Iterator[Tuple[str, dict]]:
+        fields = self.fields
+        for key, row in self.rows.items():
+            yield key, dict(zip(fields, row))
+
+
+def build_index(path: str, fields: Tuple[str, ...] = INDEX_FIELDS) -> Tuple[SampleDBIndex, bool]:
+    """Parst die SampleDB streamend. Gibt (Index, enthält_relative_Pfade) zurück."""
+    rows: Dict[str, tuple] = {}
+    intern = sys.intern
+    relative = False
+    for it in iter_sampledb_items(path):
+        cand = item_path(it)
+        if not cand:
+            continue
+        if not os.path.isabs(cand):
+            relative = True
+        # Werte internieren: wiederholte Strings (WOOD, DRUM, ...) teilen sich ein Objekt
+        rows[intern(norm_path(cand))] = tuple(
+            intern(v) if isinstance(v, str) else v for v in (it.get(k) for k in fields)
+        )
+    return SampleDBIndex(rows, fields), relative
+
+
+def sidecar_candidates(path: str):
+    src = os.path.abspath(path)
+    yield src + SIDECAR_SUFFIX
+    digest = hashlib.sha1(src.encode("utf-8")).hexdigest()[:16]
+    yield os.path.join(FALLBACK_DIR, f"{os.path.basename(src)}.{digest}{SIDECAR_SUFFIX}")
+
+
+def _source_signature(path: str) -> Dict[str, Any]:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _read_sidecar(sidecar: str, sig: Dict[str, Any], fields: Tuple[str, ...]) -> Optional[SampleDBIndex]:
+    try:
+        with open(sidecar, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != SIDECAR_FORMAT:
+        return None
+    if data.get("source") != sig or tuple(data.get("fields") or ()) != tuple(fields):
+        return None
+    # Relative Pfade wurden gegen das damalige Arbeitsverzeichnis aufgelöst
+    if data.get("relative") and data.get("cwd") != os.getcwd():
+        return None
+    # Zeilen = [Pfad, Wert-Index je Feld] in die gemeinsame Wertetabelle
+    try:
+        intern = sys.intern
+        values = [intern(v) if isinstance(v, str) else v for v in data["values"]]
+        width = len(fields)
+        rows = {}
+        for row in data["rows"]:
+            if len(row) != width + 1:
+                return None
+            rows[intern(row[0])] = tuple(values[i] for i in row[1:])
+    except (KeyError, TypeError, IndexError):
+        return None
+    return SampleDBIndex(rows, fields)
+
+
+def _write_sidecar(path: str, index: SampleDBIndex, sig: Dict[str, Any], relative: bool) -> Optional[str]:
+    # Wertetabelle: jeder Feldwert (WOOD, DRUM, 0.8, ...) steht nur einmal in der Datei
+    values: List[Any] = []
+    slots: Dict[Tuple[type, Any], int] = {}
+    rows = []
+    for key, row in index.rows.items():
+        out = [key]
+        for v in row:
+            tag = (type(v), v) if isinstance(v, (str, int, float, type(None))) else (type(v), json.dumps(v, sort_keys=True))
+            slot = slots.get(tag)
+            if slot is None:
+                slot = slots[tag] = len(values)
+                values.append(v)
+            out.append(slot)
+        rows.append(out)
+    payload = {
+        "format": SIDECAR_FORMAT,
+        "source": sig,
+        "fields": list(index.fields),
+        "relative": relative,
+        "cwd": os.getcwd(),
+        "values": values,
+        "rows": rows,
+    }
+    for sidecar in sidecar_candidates(path):
+        tmp = sidecar + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, sidecar)
+            return sidecar
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    return None
+
+
+def load_sampledb_index(path: str, fields: Tuple[str, ...] = INDEX_FIELDS,
+                        use_sidecar: bool = True) -> SampleDBIndex:
+    """Index der SampleDB; aus dem Sidecar, solange die SampleDB unverändert ist."""
+    sig = _source_signature(path)
+    if use_sidecar:
+        for sidecar in sidecar_candidates(path):
+            if os.path.isfile(sidecar):
+                index = _read_sidecar(sidecar, sig, fields)
+                if index is not None:
+                    return index
+
+    index, relative = build_index(path, fields)
+    if use_sidecar:
+        # Nur schreiben, wenn sich die SampleDB während des Parsens nicht geändert hat
+        if _source_signature(path) == sig:
+            _write_sidecar(path, index, sig, relative)
+    return index
@@ -0,0 +1,440 @@
+"""
+DF95 AIWorker – SampleDB SQLite-Mirror
+======================================
+
+Spiegelt die SampleDB (DF95_SampleDB_Multi_UCS.json) und AIWorker-Result-
+Dateien in eine lokale SQLite-Datei, damit Offline-Tools (Conflict Helper,
+Statistiken, Ports des DF95_V138_SampleDB_LibraryAnalyzer) indizierte
+Abfragen machen können, statt jedes Mal das ganze JSON zu lesen.
+
+Datei (Default):
+    Support/DF95_AIWorker/Cache/sampledb/DF95_SampleDB_Mirror.sqlite
+
+Tabellen:
+    items         ein Eintrag pro SampleDB-Item (norm_path PRIMARY KEY,
+                  df95_material/df95_instrument normalisiert (strip + upper),
+                  ucs_category, ucs_subcategory, df95_catid, ai_*; raw = Item-JSON)
+    results       ein Eintrag pro Result-Objekt (result_file, seq), inkl. norm_path
+    sources       synchronisierte Dateien mit Größe/mtime (SampleDB + Results)
+
+Indizes: norm_path, df95_material, df95_instrument, (ucs_category,
+ucs_subcategory), ai_model, ai_confidence – jeweils für items und results.
+
+Sync ist inkrementell:
+    - Datei unverändert (Größe + mtime; bei relativen Pfaden auch das
+      Arbeitsverzeichnis) -> nichts zu tun
+    - SampleDB geändert -> streamend lesen, nur Items mit geändertem Inhalt
+      (item_hash) schreiben, verschwundene Items löschen
+    - Result-Datei geändert/neu -> deren Zeilen ersetzen
+
+Es gibt nur eine items-Tabelle: der Mirror spiegelt immer die zuletzt
+synchronisierte SampleDB. Wird eine andere SampleDB synchronisiert, verlieren
+die übrigen SampleDB-Einträge in sources ihre Gültigkeit (beim nächsten Sync
+wird erneut abgeglichen). Mehrere Items mit demselben normalisierten Pfad:
+das letzte gewinnt, wie bei load_sampledb()/SampleDBIndex.
+
+Usage:
+    python df95_aiworker_sampledb_sqlite.py sync <sampledb_json> [result_json|dir ...]
+    python df95_aiworker_sampledb_sqlite.py stats [--db mirror.sqlite]
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from df95_aiworker_sampledb_index import item_path, iter_sampledb_items, norm_path
+
+DEFAULT_MIRROR_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "Cache", "sampledb", "DF95_SampleDB_Mirror.sqlite"
+)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    cwd TEXT NOT NULL DEFAULT '',
+    synced_utc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    norm_path TEXT PRIMARY KEY,
+    full_path TEXT NOT NULL,
+    df95_material TEXT NOT NULL DEFAULT '',
+    df95_instrument TEXT NOT NULL DEFAULT '',
+    ucs_category TEXT NOT NULL DEFAULT '',
+    ucs_subcategory TEXT NOT NULL DEFAULT '',
+    df95_catid TEXT NOT NULL DEFAULT '',
+    ai_model TEXT NOT NULL DEFAULT '',
+    ai_confidence REAL,
+    item_hash TEXT NOT NULL,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_material ON items(df95_material);
+CREATE INDEX IF NOT EXISTS items_instrument ON items(df95_instrument);
+CREATE INDEX IF NOT EXISTS items_ucs ON items(ucs_category, ucs_subcategory);
+CREATE INDEX IF NOT EXISTS items_ai_model ON items(ai_model);
+CREATE INDEX IF NOT EXISTS items_ai_conf ON items(ai_confidence);
+CREATE TABLE IF NOT EXISTS results (
+    result_file TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    norm_path TEXT NOT NULL,
+    full_path TEXT NOT NULL,
+    df95_material TEXT NOT NULL DEFAULT '',
+    df95_instrument TEXT NOT NULL DEFAULT '',
+    ucs_category TEXT NOT NULL DEFAULT '',
+    ucs_subcategory TEXT NOT NULL DEFAULT '',
+    ai_model TEXT NOT NULL DEFAULT '',
+    ai_confidence REAL NOT NULL DEFAULT 0,
+    drum_role TEXT NOT NULL DEFAULT '',
+    created_utc TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (result_file, seq)
+);
+CREATE INDEX IF NOT EXISTS results_path ON results(norm_path);
+CREATE INDEX IF NOT EXISTS results_material ON results(df95_material);
+CREATE INDEX IF NOT EXISTS results_instrument ON results(df95_instrument);
+CREATE INDEX IF NOT EXISTS results_ucs ON results(ucs_category, ucs_subcategory);
+CREATE INDEX IF NOT EXISTS results_ai_model ON results(ai_model);
+CREATE INDEX IF NOT EXISTS results_ai_conf ON results(ai_confidence);
+"""
+
+
+def _norm_label(v: Any) -> str:
+    return (v or "").strip().upper() if isinstance(v, str) else ""
+
+
+def _text(v: Any) -> str:
+    return v if isinstance(v, str) else ("" if v is None else str(v))
+
+
+def _float_or_none(v: Any) -> Optional[float]:
+    try:
+        return float(v) if v is not None and v != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _signature(path: str) -> tuple:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _utc_now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+class SampleDBMirror:
+    """SQLite-Spiegel von SampleDB + AIWorker-Results."""
+
+    def __init__(self, path: str = DEFAULT_MIRROR_PATH):
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self.db.execute(
+            "INSERT OR IGNORE INTO meta(key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+        )
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self) -> "SampleDBMirror":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- Sources -----------------------------------------------
+
+    def _is_current(self, path: str) -> bool:
+        row = self.db.execute(
+            "SELECT size, mtime_ns, cwd FROM sources WHERE path = ?", (os.path.abspath(path),)
+        ).fetchone()
+        if row is None or tuple(row[:2]) != _signature(path):
+            return False
+        # Relative Pfade wurden gegen das damalige Arbeitsverzeichnis aufgelöst
+        return not row[2] or row[2] == os.getcwd()
+
+    def _mark_source(self, path: str, kind: str, sig: tuple, total: int, relative: bool) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO sources(path, kind, size, mtime_ns, total, cwd, synced_utc)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (os.path.abspath(path), kind, sig[0], sig[1], total,
+             os.getcwd() if relative else "", _utc_now()),
+        )
+
+    # -- SampleDB ----------------------------------------------
+
+    def sync_sampledb(self, sampledb_path: str, force: bool = False) -> Dict[str, int]:
+        """Gleicht items mit der SampleDB ab. Gibt Zähler (total/changed/deleted) zurück."""
+        if not force and self._is_current(sampledb_path):
+            return {"total": self.count_items(), "changed": 0, "deleted": 0, "skipped": 1}
+
+        sig = _signature(sampledb_path)
+        known = dict(self.db.execute("SELECT norm_path, item_hash FROM items"))
+        seen = set()
+        upserts = []
+        total = 0
+        changed = 0
+        relative = False
+
+        def flush():
+            self.db.executemany(
+                "INSERT OR REPLACE INTO items(norm_path, full_path, df95_material, df95_instrument,"
+                " ucs_category, ucs_subcategory, df95_catid, ai_model, ai_confidence, item_hash, raw)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                upserts,
+            )
+            upserts.clear()
+
+        for it in iter_sampledb_items(sampledb_path):
+            full = item_path(it)
+            if not full:
+                continue
+            if not os.path.isabs(full):
+                relative = True
+            key = norm_path(full)
+            duplicate = key in seen
+            seen.add(key)
+            total += 1
+            raw = json.dumps(it, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+            h = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+            # Duplikat im selben Sync: immer schreiben, sonst bliebe ein früheres
+            # Duplikat stehen, nur weil das letzte dem alten Stand entspricht
+            if not duplicate and known.get(key) == h:
+                continue
+            changed += 1
+            upserts.append((
+                key, full,
+                _norm_label(it.get("df95_material")),
+                _norm_label(it.get("df95_instrument")),
+                _text(it.get("ucs_category")),
+                _text(it.get("ucs_subcategory")),
+                _text(it.get("df95_catid")),
+                _text(it.get("ai_model")),
+                _float_or_none(it.get("ai_confidence")),
+                h, raw,
+            ))
+            if len(upserts) >= 5000:
+                flush()
+        flush()
+
+        gone = [(k,) for k in known if k not in seen]
+        self.db.executemany("DELETE FROM items WHERE norm_path = ?", gone)
+        # items gehört jetzt zu dieser SampleDB – andere gelten nicht mehr als aktuell
+        self.db.execute(
+            "DELETE FROM sources WHERE kind = 'sampledb' AND path != ?", (os.path.abspath(sampledb_path),)
+        )
+        self._mark_source(sampledb_path, "sampledb", sig, total, relative)
+        self.db.commit()
+        return {"total": total, "changed": changed, "deleted": len(gone), "skipped": 0}
+
+    # -- Results -----------------------------------------------
+
+    def sync_result(self, result_path: str, force: bool = False) -> int:
+        """Übernimmt eine Result-Datei (ersetzt deren Zeilen). Gibt die Anzahl Results zurück, -1 = unverändert."""
+        if not force and self._is_current(result_path):
+            return -1
+        sig = _signature(result_path)
+        with open(result_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        results = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(results, list):
+            raise RuntimeError(f"Result-JSON hat kein erwartetes Feld 'results' (Liste): {result_path}")
+        created = _text(data.get("created_utc"))
+
+        key = os.path.abspath(result_path)
+        rows = []
+        relative = False
+        for seq, res in enumerate(results):
+            if not isinstance(res, dict):
+                continue
+            full = res.get("full_path") or ""
+            if not full:
+                continue
+            if not os.path.isabs(full):
+                relative = True
+            rows.append((
+                key, seq, norm_path(full), full,
+                _norm_label(res.get("df95_material")),
+                _norm_label(res.get("df95_instrument")),
+                _text(res.get("ucs_category")),
+                _text(res.get("ucs_subcategory")),
+                _text(res.get("ai_model")),
+                _float_or_none(res.get("ai_confidence")) or 0.0,
+                _text(res.get("drum_role")),
+                created,
+            ))
+        self.db.execute("DELETE FROM results WHERE result_file = ?", (key,))
+        self.db.executemany(
+            "INSERT INTO results(result_file, seq, norm_path, full_path, df95_material, df95_instrument,"
+            " ucs_category, ucs_subcategory, ai_model, ai_confidence, drum_role, created_utc)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._mark_source(result_path, "result", sig, len(results), relative)
+        self.db.commit()
+        return len(results)
+
+    def sync_results(self, paths: Iterable[str], force: bool = False) -> Dict[str, int]:
+        synced = 0
+        unchanged = 0
+        for p in expand_result_paths(paths):
+            if self.sync_result(p, force=force) < 0:
+                unchanged += 1
+            else:
+                synced += 1
+        return {"synced": synced, "unchanged": unchanged}
+
+    # -- Abfragen ----------------------------------------------
+
+    def count_items(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def get_item(self, full_path: str) -> Optional[dict]:
+        row = self.db.execute("SELECT raw FROM items WHERE norm_path = ?", (norm_path(full_path),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def category_stats(self) -> List[Dict[str, Any]]:
+        """Anzahl Items pro (ucs_category, ucs_subcategory)."""
+        rows = self.db.execute(
+            "SELECT ucs_category, ucs_subcategory, COUNT(*) FROM items"
+            " GROUP BY ucs_category, ucs_subcategory ORDER BY COUNT(*) DESC"
+        )
+        return [{"ucs_category": c, "ucs_subcategory": s, "count": n} for c, s, n in rows]
+
+    def material_stats(self) -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT df95_material, df95_instrument, COUNT(*) FROM items"
+            " GROUP BY df95_material, df95_instrument ORDER BY COUNT(*) DESC"
+        )
+        return [{"df95_material": m, "df95_instrument": i, "count": n} for m, i, n in rows]
+
+    def result_total(self, result_path: str) -> int:
+        row = self.db.execute(
+            "SELECT total FROM sources WHERE path = ?", (os.path.abspath(result_path),)
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def conflict_rows(self, result_path: str, min_conf: float = 0.5,
+                      from_filter: str = "", to_filter: str = "") -> Dict[str, Any]:
+        """Konfliktanalyse eines Results als indizierter Join gegen items.
+
+        Gleiche Semantik wie analyze_conflicts() im Conflict Helper: Rows sind
+        (kind, full_path, old_mat, new_mat, old_ins, new_ins, ai_confidence, ai_model)
+        mit kind "conflict" bzw. "proposed_new".
+        """
+        key = os.path.abspath(result_path)
+        matched, with_path = self.db.execute(
+            "SELECT COUNT(i.norm_path), COUNT(*) FROM results r"
+            " LEFT JOIN items i ON i.norm_path = r.norm_path WHERE r.result_file = ?",
+            (key,),
+        ).fetchone()
+
+        sql = """
+            SELECT kind, full_path, old_mat, new_mat, old_ins, new_ins, ai_confidence, ai_model FROM (
+                SELECT
+                    CASE
+                        WHEN i.df95_material = '' AND i.df95_instrument = '' THEN 'proposed_new'
+                        WHEN (i.df95_material != '' AND r.df95_material != '' AND i.df95_material != r.df95_material)
+                          OR (i.df95_instrument != '' AND r.df95_instrument != '' AND i.df95_instrument != r.df95_instrument)
+                        THEN 'conflict'
+                    END AS kind,
+                    r.seq AS seq, r.full_path AS full_path,
+                    i.df95_material AS old_mat, r.df95_material AS new_mat,
+                    i.df95_instrument AS old_ins, r.df95_instrument AS new_ins,
+                    r.ai_confidence AS ai_confidence, r.ai_model AS ai_model
+                FROM results r JOIN items i ON i.norm_path = r.norm_path
+                WHERE r.result_file = ?
+                  AND r.ai_confidence >= ?
+                  AND (r.df95_material != '' OR r.df95_instrument != '')
+            )
+            WHERE kind IS NOT NULL
+              AND (kind = 'proposed_new' OR ? = '' OR (CASE WHEN old_mat = '' THEN '<EMPTY>' ELSE old_mat END) = ?)
+              AND (kind = 'proposed_new' OR ? = '' OR (CASE WHEN new_mat = '' THEN '<EMPTY>' ELSE new_mat END) = ?)
+            ORDER BY seq
+        """
+        f_from = (from_filter or "").strip().upper()
+        f_to = (to_filter or "").strip().upper()
+        rows = self.db.execute(sql, (key, float(min_conf), f_from, f_from, f_to, f_to)).fetchall()
+        total = self.result_total(result_path)
+        return {
+            "total_results": total,
+            "matched": matched,
+            "unmatched": with_path - matched,
+            "rows": rows,
+        }
+
+
+def expand_result_paths(paths: Iterable[str], pattern: str = "DF95_AIWorker_*Result_*.json") -> List[str]:
+    """Dateien, Ordner (pattern) und Glob-Muster -> sortierte Dateiliste.
+
+    Ausgaben des Conflict Helpers (*_material_conflicts*) werden übersprungen.
+    """
+    out = set()
+    for p in paths:
+        if os.path.isdir(p):
+            out.update(glob.glob(os.path.join(p, pattern)))
+        elif any(ch in p for ch in "*?["):
+            out.update(glob.glob(p))
+        elif os.path.isfile(p):
+            out.add(p)
+    return sorted(p for p in out if "_material_conflicts" not in os.path.basename(p))
+
+
+def main(argv: List[str]) -> int:
+    args = list(argv[1:])
+    db_path = DEFAULT_MIRROR_PATH
+    if "--db" in args:
+        i = args.index("--db")
+        db_path = args[i + 1]
+        del args[i:i + 2]
+
+    if not args or args[0] not in ("sync", "stats"):
+        print(__doc__)
+        return 1
+
+    with SampleDBMirror(db_path) as mirror:
+        if args[0] == "sync":
+            if len(args) < 2:
+                print("Usage: python df95_aiworker_sampledb_sqlite.py sync <sampledb_json> [result_json|dir ...]")
+                return 1
+            t0 = time.perf_counter()
+            s = mirror.sync_sampledb(args[1])
+            r = mirror.sync_results(args[2:])
+            print(f"[DF95 SampleDB Mirror] items={s['total']} geändert={s['changed']} gelöscht={s['deleted']}"
+                  f"  results: neu/geändert={r['synced']} unverändert={r['unchanged']}"
+                  f"  ({time.perf_counter() - t0:.2f}s) -> {db_path}")
+        else:
+            print(f"[DF95 SampleDB Mirror] {mirror.count_items()} Items in {db_path}")
+            print("ucs_category / ucs_subcategory:")
+            for row in mirror.category_stats()[:30]:
+                print(f"  {row['ucs_category'] or '<leer>':16s} {row['ucs_subcategory'] or '<leer>':16s} {row['count']:8d}")
+            print("df95_material / df95_instrument:")
+            for row in mirror.material_stats()[:30]:
+                print(f"  {row['df95_material'] or '<leer>':16s} {row['df95_instrument'] or '<leer>':16s} {row['count']:8d}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
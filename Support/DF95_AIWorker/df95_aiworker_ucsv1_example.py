@@ -8,7 +8,18 @@ Es implementiert KEINE echte Audio-Analyse – hier bist du frei, deine
 eigenen Modelle (z.B. YAMNet, CLAP, PANNs, OpenL3, etc.) einzuhängen.
 
 Aufruf:
-    python df95_aiworker_ucsv1_example.py path/zum/job.json
+    python df95_aiworker_ucsv1_example.py path/zum/job.json [--no-cache] [--stream]
+
+Im Material-Mode werden Vorhersagen über den Result-Cache
+(df95_aiworker_result_cache.py, Support/DF95_AIWorker/Cache) wiederverwendet,
+solange Datei, Modell und Code unverändert sind. Hit/Miss-Zähler stehen im
+Result-JSON unter "cache".
+
+Mit --stream wird jedes Ergebnis sofort nach
+    Support/DF95_AIWorker/Results/<JobName>.partial.jsonl
+geschrieben (siehe df95_aiworker_result_stream.py). Ein erneuter Aufruf mit
+demselben Job überspringt bereits erledigte Dateien; am Ende entsteht das
+gewohnte DF95_AIWorker_UCSResult_<timestamp>.json.
 
 Das Script erzeugt:
     Support/DF95_AIWorker/Results/DF95_AIWorker_UCSResult_<timestamp>.json
@@ -48,11 +59,14 @@ Result-Format:
 }
 """
 
+import hashlib
 import json
 import os
 import sys
 import datetime
-from df95_aiworker_material_model import predict_for_file
+from df95_aiworker_material_model import DEFAULT_BATCH_SIZE, predict_for_files, model_fingerprint
+from df95_aiworker_result_cache import ResultCache, cache_from_config
+from df95_aiworker_result_stream import JsonlResultWriter, finalize_jsonl
 
 
 
@@ -66,111 +80,215 @@ def save_json(obj, path):
         json.dump(obj, f, indent=2, ensure_ascii=False)
 
 
-def main(job_path):
-    job = load_json(job_path)
-    audio_root = job.get("audio_root", "")
-    files = job.get("files", [])
+def job_worker_mode(job):
     worker_mode = (job.get("worker_mode") or "generic").lower()
     if worker_mode not in ("generic", "drone", "material"):
         worker_mode = "generic"
+    return worker_mode
+
 
-    results = []
-    for entry in files:
-        full = entry.get("full_path") or ""
-        rel = entry.get("rel_path") or os.path.basename(full)
-
-        if worker_mode == "drone":
-            res = {
-                "full_path": full,
-                "ucs_category": "DRONE",
-                "ucs_subcategory": "TEXTURE",
-                "ucs_descriptor": "TBD",
-                "ucs_perspective": "",
-                "ucs_rec_medium": "",
-                "ucs_channel_config": "",
-                "df95_catid": "",
-                "df95_drone_flag": "Y",
-                "df95_drone_centerfreq": "MID",
-                "df95_drone_density": "MED",
-                "df95_drone_form": "PAD",
-                "df95_drone_motion": "STATIC",
-                "df95_motion_strength": "LOW",
-                "df95_tension": "MED",
-                "df95_material": "",
-                "df95_instrument": "",
-                "ai_tags": ["drone", "todo_ai"],
-                "ai_model": "DF95_AIWorker_DroneDummy_v1",
-            }
-        elif worker_mode == "material":
-            # Material-/Instrument-Mode: delegiere an df95_aiworker_material_model.predict_for_file
-            predicted = predict_for_file(full)
-            res = {
-                "full_path": full,
-                "ucs_category": predicted.get("ucs_category", "") or "",
-                "ucs_subcategory": predicted.get("ucs_subcategory", "") or "",
-                "ucs_descriptor": predicted.get("ucs_descriptor", "") or "",
-                "ucs_perspective": predicted.get("ucs_perspective", "") or "",
-                "ucs_rec_medium": predicted.get("ucs_rec_medium", "") or "",
-                "ucs_channel_config": predicted.get("ucs_channel_config", "") or "",
-                "df95_catid": predicted.get("df95_catid", "") or "",
-                "df95_drone_flag": "",
-                "df95_drone_centerfreq": "",
-                "df95_drone_density": "",
-                "df95_drone_form": "",
-                "df95_drone_motion": "",
-                "df95_motion_strength": "",
-                "df95_tension": "",
-                "df95_material": predicted.get("df95_material", "") or "",
-                "df95_instrument": predicted.get("df95_instrument", "") or "",
-                "ai_tags": predicted.get("ai_tags", []) or [],
-                "ai_model": predicted.get("ai_model", "DF95_AIWorker_MaterialModel_v1") or "DF95_AIWorker_MaterialModel_v1",
-                "ai_confidence": predicted.get("ai_confidence", 0.0),
-            }
+def build_result(full, worker_mode, predicted=None):
+    """Baut ein Result-Objekt für eine Datei (predicted nur im Material-Mode)."""
+    if worker_mode == "drone":
+        return {
+            "full_path": full,
+            "ucs_category": "DRONE",
+            "ucs_subcategory": "TEXTURE",
+            "ucs_descriptor": "TBD",
+            "ucs_perspective": "",
+            "ucs_rec_medium": "",
+            "ucs_channel_config": "",
+            "df95_catid": "",
+            "df95_drone_flag": "Y",
+            "df95_drone_centerfreq": "MID",
+            "df95_drone_density": "MED",
+            "df95_drone_form": "PAD",
+            "df95_drone_motion": "STATIC",
+            "df95_motion_strength": "LOW",
+            "df95_tension": "MED",
+            "df95_material": "",
+            "df95_instrument": "",
+            "ai_tags": ["drone", "todo_ai"],
+            "ai_model": "DF95_AIWorker_DroneDummy_v1",
+        }
+    if worker_mode == "material":
+        predicted = predicted or {}
+        return {
+            "full_path": full,
+            "ucs_category": predicted.get("ucs_category", "") or "",
+            "ucs_subcategory": predicted.get("ucs_subcategory", "") or "",
+            "ucs_descriptor": predicted.get("ucs_descriptor", "") or "",
+            "ucs_perspective": predicted.get("ucs_perspective", "") or "",
+            "ucs_rec_medium": predicted.get("ucs_rec_medium", "") or "",
+            "ucs_channel_config": predicted.get("ucs_channel_config", "") or "",
+            "df95_catid": predicted.get("df95_catid", "") or "",
+            "df95_drone_flag": "",
+            "df95_drone_centerfreq": "",
+            "df95_drone_density": "",
+            "df95_drone_form": "",
+            "df95_drone_motion": "",
+            "df95_motion_strength": "",
+            "df95_tension": "",
+            "df95_material": predicted.get("df95_material", "") or "",
+            "df95_instrument": predicted.get("df95_instrument", "") or "",
+            "ai_tags": predicted.get("ai_tags", []) or [],
+            "ai_model": predicted.get("ai_model", "DF95_AIWorker_MaterialModel_v1") or "DF95_AIWorker_MaterialModel_v1",
+            "ai_confidence": predicted.get("ai_confidence", 0.0),
+        }
+    return {
+        "full_path": full,
+        "ucs_category": "FIELDREC",
+        "ucs_subcategory": "ZOOMF6",
+        "ucs_descriptor": "TBD",
+        "ucs_perspective": "",
+        "ucs_rec_medium": "",
+        "ucs_channel_config": "",
+        "df95_catid": "",
+        "df95_drone_flag": "",
+        "df95_drone_centerfreq": "",
+        "df95_drone_density": "",
+        "df95_drone_form": "",
+        "df95_drone_motion": "",
+        "df95_motion_strength": "",
+        "df95_tension": "",
+        "df95_material": "",
+        "df95_instrument": "",
+        "ai_tags": ["todo_ai"],
+        "ai_model": "DF95_AIWorker_UCS_Dummy_v1",
+    }
+
+
+def predict_materials(paths, cache=None, ctx="", batch_size=DEFAULT_BATCH_SIZE):
+    """predict_for_files() mit optionalem Result-Cache (nur Cache-Misses gehen ans Modell)."""
+    predicted = [None] * len(paths)
+    todo = []
+    for i, full in enumerate(paths):
+        hit = cache.get(full, ctx) if cache is not None else None
+        if hit is not None:
+            predicted[i] = hit
         else:
-            res = {
-                "full_path": full,
-                "ucs_category": "FIELDREC",
-                "ucs_subcategory": "ZOOMF6",
-                "ucs_descriptor": "TBD",
-                "ucs_perspective": "",
-                "ucs_rec_medium": "",
-                "ucs_channel_config": "",
-                "df95_catid": "",
-                "df95_drone_flag": "",
-                "df95_drone_centerfreq": "",
-                "df95_drone_density": "",
-                "df95_drone_form": "",
-                "df95_drone_motion": "",
-                "df95_motion_strength": "",
-                "df95_tension": "",
-                "df95_material": "",
-                "df95_instrument": "",
-                "ai_tags": ["todo_ai"],
-                "ai_model": "DF95_AIWorker_UCS_Dummy_v1",
-            }
-
-        results.append(res)
-
-    root = os.path.join(os.path.dirname(os.path.dirname(job_path)), "Results")
-    os.makedirs(root, exist_ok=True)
-    ts = datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    out_name = f"DF95_AIWorker_UCSResult_{ts}.json"
-    out_path = os.path.join(root, out_name)
+            todo.append(i)
+
+    if todo:
+        fresh = predict_for_files([paths[i] for i in todo], batch_size=batch_size)
+        for i, value in zip(todo, fresh):
+            predicted[i] = value
+            if cache is not None:
+                cache.put(paths[i], ctx, value)
+    return predicted
+
+
+def iter_results(job, files, cache=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Generator über die Result-Objekte für `files` (Reihenfolge bleibt erhalten)."""
+    worker_mode = job_worker_mode(job)
+
+    if worker_mode != "material":
+        for entry in files:
+            yield build_result(entry.get("full_path") or "", worker_mode)
+        return
+
+    # Material-/Instrument-Mode: delegiere an df95_aiworker_material_model.predict_for_files,
+    # blockweise, damit Streaming-Writer und Speicherbedarf überschaubar bleiben
+    ctx = ""
+    if cache is not None:
+        ctx = ResultCache.context("material", model_fingerprint(), {"worker_mode": worker_mode})
 
+    block = max(1, batch_size) * 16
+    for start in range(0, len(files), block):
+        paths = [e.get("full_path") or "" for e in files[start:start + block]]
+        for full, predicted in zip(paths, predict_materials(paths, cache, ctx, batch_size)):
+            yield build_result(full, worker_mode, predicted)
+
+
+def result_header(job, job_path, cache=None):
     out = {
         "version": "DF95_AIWorker_UCS_V1",
         "job_source": job_path,
         "created_utc": datetime.datetime.utcnow().isoformat() + "Z",
-        "results": results,
     }
+    if cache is not None and job_worker_mode(job) == "material":
+        out["cache"] = cache.stats(settle=True)
+    return out
+
+
+def process_job(job, job_path, cache=None):
+    results = list(iter_results(job, job.get("files", []), cache))
+    out = result_header(job, job_path, cache)
+    out["results"] = results
+    return out
+
+
+def process_job_streaming(job, job_path, out_path, cache=None, fsync_every=200, enrich=None, extra=None):
+    """Wie process_job(), schreibt aber jedes Ergebnis sofort in eine Partial-JSONL.
+
+    Die Partial-Datei liegt neben den Results (<JobName>.partial.jsonl), damit
+    ein Neustart desselben Jobs sie unabhängig vom Zeitstempel wiederfindet.
+
+    enrich(res) ergänzt jedes Ergebnis vor dem Schreiben (Daemon: drum_role);
+    extra sind zusätzliche Top-Level-Felder, die auch in den Partial-Header
+    eingehen (geänderte Anreicherung -> alte Partial-Datei verwerfen).
+    """
+    files = job.get("files", [])
+    job_name = os.path.splitext(os.path.basename(job_path))[0]
+    partial = os.path.join(os.path.dirname(out_path), job_name + ".partial.jsonl")
+    header = {
+        "version": "DF95_AIWorker_UCS_V1",
+        "job_source": job_path,
+        "worker_mode": job_worker_mode(job),
+        "num_files": len(files),
+        # Gleicher Job-Name mit anderer Dateiliste -> alte Partial-Datei verwerfen
+        "files_digest": hashlib.sha1(
+            "\n".join(e.get("full_path") or "" for e in files).encode("utf-8")
+        ).hexdigest(),
+    }
+    header.update(extra or {})
+
+    with JsonlResultWriter(partial, header, fsync_every=fsync_every) as writer:
+        todo = [e for e in files if (e.get("full_path") or "") not in writer.done]
+        if len(todo) < len(files):
+            print(f"[DF95 AIWorker UCS] Resume: {len(files) - len(todo)} Dateien bereits erledigt")
+        for res in iter_results(job, todo, cache):
+            if enrich is not None:
+                enrich(res)
+            writer.write(res)
+
+    payload = result_header(job, job_path, cache)
+    payload.update(extra or {})
+    return finalize_jsonl(partial, out_path, payload)
+
+
+def results_dir_for(job_path):
+    return os.path.join(os.path.dirname(os.path.dirname(job_path)), "Results")
+
+
+def main(job_path, use_cache=True, stream=False):
+    job = load_json(job_path)
+
+    root = results_dir_for(job_path)
+    os.makedirs(root, exist_ok=True)
+    ts = datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    out_name = f"DF95_AIWorker_UCSResult_{ts}.json"
+    out_path = os.path.join(root, out_name)
+
+    cache = cache_from_config({}) if use_cache else None
+    try:
+        if stream:
+            process_job_streaming(job, job_path, out_path, cache=cache)
+        else:
+            out = process_job(job, job_path, cache=cache)
+            save_json(out, out_path)
+    finally:
+        if cache is not None:
+            cache.close()
 
-    save_json(out, out_path)
     print(f"[DF95 AIWorker UCS] Wrote result: {out_path}")
 
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python df95_aiworker_ucsv1_example.py path/to/job.json")
+    flags = [a for a in sys.argv[1:] if a.startswith("--")]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 1:
+        print("Usage: python df95_aiworker_ucsv1_example.py path/to/job.json [--no-cache] [--stream]")
         sys.exit(1)
-    main(sys.argv[1])
+    main(args[0], use_cache="--no-cache" not in flags, stream="--stream" in flags)
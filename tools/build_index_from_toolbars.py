@@ -15,10 +15,40 @@ or:
   python build_index_from_toolbars.py   (if you keep it at repo root)
 
 It writes ./index.xml by default.
+
+Incremental builds:
+- A manifest (Reports/index_manifest.json, committed) remembers a content digest +
+  <version time=...> per package, so timestamps survive a fresh clone.
+- A local file cache (Reports/.index_file_cache.json, git-ignored) remembers
+  size/mtime/sha1 per file; files whose size and mtime are unchanged are not re-hashed.
+- Only packages whose content changed get a fresh timestamp; untouched packages
+  are written byte-identical, and index.xml is only rewritten if it changed.
+- Pass --rebuild to ignore the manifest (every package gets a new timestamp).
+- The file list comes from tools/repo_scan.py (one cached walk shared with the other tools),
+  restricted to files tracked by git: untracked local files (caches, build output) would
+  404 on the raw URL and change package digests from machine to machine.
+
+Mirror dedupe (content-addressed):
+- _payload/ mirrors the top-level tree. Copies identical to their top-level file are
+  never published; diverged copies are reported (the top-level file wins); files that
+  only exist in the mirror are installed at their top-level path with a mirror URL.
+- Files with identical content (sha1) share one <source> URL. That only makes the
+  index point at fewer distinct URLs: ReaPack still downloads every <source> into its
+  own file= path, so install size does not change. Details: Reports/payload_dedupe.md.
+
+The deployed index.xml comes from `reapack-index --scan` (deploy.yml), which skips
+_payload/ via `--ignore _payload` in .reapack-index.conf. That is only safe while every
+ReaPack package file in the mirror is an identical copy of its top-level file;
+`--check-mirror` verifies this (run in check.yml) and exits non-zero otherwise:
+
+  python tools/build_index_from_toolbars.py --check-mirror
 """
 
 from __future__ import annotations
 
+import hashlib
+import io
+import json
 import os
 import re
 import sys
@@ -27,6 +57,8 @@ from urllib.parse import quote
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
+from repo_scan import RepoScan, scan_repo
+
 # ----------------------------
 # Config (edit to match repo)
 # ----------------------------
@@ -81,6 +113,25 @@ ICONS_INCLUDE_DIRS = [
 OUT_INDEX = "index.xml"
 OUT_REPORT_DIR = "Reports"
 OUT_TOOLBAR_TARGETS_REPORT = "Reports/toolbar_script_targets.md"
+OUT_MANIFEST = "Reports/index_manifest.json"
+OUT_FILE_CACHE = "Reports/.index_file_cache.json"
+MANIFEST_FORMAT = 2
+OUT_DEDUPE_REPORT = "Reports/payload_dedupe.md"
+
+# Mirror trees: <mirror>/<path> duplicates the top-level <path>.
+# - identical copies are never published
+# - diverged copies are reported (the top-level file is published)
+# - mirror-only files are published at their top-level install path, sourced from the mirror
+MIRROR_DIRS = [
+    "_payload",
+]
+
+# Identical blobs installed at several paths share one source URL (content-addressed)
+DEDUPE_BLOBS = True
+
+# Metaheader reapack-index treats as a package file (--check-mirror)
+PACKAGE_HEADER_RE = re.compile(r"^\s*(?:--|//|#|;)?\s*@version\b", flags=re.M)
+PACKAGE_HEADER_LINES = 200
 
 # ----------------------------
 # Helpers
@@ -92,18 +143,6 @@ def to_posix_rel(p: Path, repo_root: Path) -> str:
 def now_rfc3339_utc() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
-def is_toolbar_file(p: Path) -> bool:
-    ext = p.suffix.lower()
-    if ext in (".reapermenusets", ".reapermenuset", ".reapermenu"):
-        return True
-    # Handle weird double extensions like ".Toolbar.ReaperMenu"
-    name_lower = p.name.lower()
-    if name_lower.endswith(".toolbar.reapermenu"):
-        return True
-    if name_lower.endswith(".reapermenuset"):
-        return True
-    return False
-
 SCRIPT_TARGET_RE = re.compile(r"^\s*SCRIPT:\s*(.+?)\s*$", re.IGNORECASE)
 
 def parse_script_targets_from_toolbar(toolbar_path: Path) -> list[str]:
@@ -126,7 +165,8 @@ def url_for_source(raw_base: str, rel_posix_path: str) -> str:
     # Encode spaces/special chars but keep slashes
     return raw_base + quote(rel_posix_path, safe="/")
 
-def add_pkg(category_el: ET.Element, name: str, desc: str, rel_files: list[str], raw_base: str) -> None:
+def add_pkg(category_el: ET.Element, name: str, desc: str, rel_files: list[str], raw_base: str,
+            time_str: str | None = None, url_paths: dict[str, str] | None = None) -> None:
     reapack = ET.SubElement(category_el, "reapack", attrib={"name": name, "type": "script"})
     ET.SubElement(reapack, "metadata").append(ET.Element("author", text=AUTHOR))  # placeholder; we will fix below
 
@@ -138,7 +178,7 @@ def add_pkg(category_el: ET.Element, name: str, desc: str, rel_files: list[str],
     a = ET.SubElement(md, "author")
     a.text = AUTHOR
 
-    v_el = ET.SubElement(reapack, "version", attrib={"name": VERSION, "time": now_rfc3339_utc()})
+    v_el = ET.SubElement(reapack, "version", attrib={"name": VERSION, "time": time_str or now_rfc3339_utc()})
 
     d = ET.SubElement(v_el, "desc")
     d.text = desc
@@ -146,28 +186,268 @@ def add_pkg(category_el: ET.Element, name: str, desc: str, rel_files: list[str],
     # Ensure deterministic ordering
     for rel in sorted(set(rel_files)):
         s = ET.SubElement(v_el, "source", attrib={"file": rel})
-        s.text = url_for_source(raw_base, rel)
-
-def collect_files_under(repo_root: Path, rel_dir: str) -> list[str]:
-    base = repo_root / rel_dir
-    if not base.exists():
-        return []
-    rels: list[str] = []
-    for p in base.rglob("*"):
-        if p.is_file():
-            rels.append(to_posix_rel(p, repo_root))
-    return rels
-
-def collect_toolbar_files(repo_root: Path) -> list[str]:
-    rels: list[str] = []
-    for d in TOOLBAR_DIRS:
-        base = repo_root / d
-        if not base.exists():
-            continue
-        for p in base.rglob("*"):
-            if p.is_file() and is_toolbar_file(p):
-                rels.append(to_posix_rel(p, repo_root))
-    return sorted(set(rels))
+        s.text = url_for_source(raw_base, (url_paths or {}).get(rel, rel))
+
+def collect_files_under(scan: RepoScan, rel_dir: str) -> list[str]:
+    return scan.under(rel_dir)
+
+def collect_toolbar_files(scan: RepoScan) -> list[str]:
+    # Toolbar kind covers .ReaperMenuSet(s) / .ReaperMenu incl. ".Toolbar.ReaperMenu"
+    return scan.of_kind("toolbar", under=TOOLBAR_DIRS)
+
+# ----------------------------
+# Manifest (incremental builds)
+# ----------------------------
+
+class IndexManifest:
+    """File hashes and per-package timestamps carried over between runs.
+
+    Package digests/timestamps live in the committed manifest; the size/mtime/sha1
+    file cache is machine-local (mtimes differ on every clone) and kept separately.
+    """
+
+    def __init__(self, repo_root: Path, data: dict | None = None, file_cache: dict | None = None):
+        self.repo_root = repo_root
+        self.path = repo_root / OUT_MANIFEST
+        self.cache_path = repo_root / OUT_FILE_CACHE
+        data = data if isinstance(data, dict) and data.get("format") == MANIFEST_FORMAT else {}
+        file_cache = file_cache if isinstance(file_cache, dict) and file_cache.get("format") == MANIFEST_FORMAT else {}
+        self.old_files: dict[str, list] = file_cache.get("files") or {}
+        self.old_packages: dict[str, dict] = data.get("packages") or {}
+        self.files: dict[str, list] = {}
+        self.packages: dict[str, dict] = {}
+        self.hashed = 0
+
+    @classmethod
+    def load(cls, repo_root: Path, rebuild: bool = False) -> "IndexManifest":
+        def read(rel: str) -> dict | None:
+            path = repo_root / rel
+            if rebuild or not path.is_file():
+                return None
+            try:
+                return json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return None
+
+        return cls(repo_root, read(OUT_MANIFEST), read(OUT_FILE_CACHE))
+
+    def file_sha(self, rel: str) -> str:
+        if rel in self.files:
+            # Already looked at in this run (dedupe + package digests ask for the same files)
+            return self.files[rel][2]
+        st = (self.repo_root / rel).stat()
+        old = self.old_files.get(rel)
+        if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+            sha = old[2]
+        else:
+            h = hashlib.sha1()
+            with open(self.repo_root / rel, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            sha = h.hexdigest()
+            self.hashed += 1
+        self.files[rel] = [st.st_size, st.st_mtime_ns, sha]
+        return sha
+
+    def package_time(self, key: str, desc: str, rel_files: list[str], raw_base: str,
+                     url_paths: dict[str, str] | None = None) -> str:
+        """Previous timestamp if the package content is unchanged, otherwise now."""
+        url_paths = url_paths or {}
+        h = hashlib.sha1()
+        for part in (VERSION, AUTHOR, raw_base, desc):
+            h.update(part.encode("utf-8") + b"\0")
+        for rel in sorted(set(rel_files)):
+            url_rel = url_paths.get(rel, rel)
+            h.update(rel.encode("utf-8") + b"\0" + url_rel.encode("utf-8") + b"\0")
+            h.update(self.file_sha(url_rel).encode("ascii") + b"\0")
+        digest = h.hexdigest()
+        old = self.old_packages.get(key)
+        time_str = old["time"] if old and old.get("digest") == digest else now_rfc3339_utc()
+        self.packages[key] = {"digest": digest, "time": time_str, "files": len(set(rel_files))}
+        return time_str
+
+    def summary(self) -> dict[str, list[str]]:
+        old_p, new_p = self.old_packages, self.packages
+        old_f, new_f = self.old_files, self.files
+        return {
+            "packages_added": sorted(k for k in new_p if k not in old_p),
+            "packages_changed": sorted(k for k in new_p if k in old_p and old_p[k].get("digest") != new_p[k]["digest"]),
+            "packages_removed": sorted(k for k in old_p if k not in new_p),
+            "files_added": sorted(k for k in new_f if k not in old_f),
+            "files_changed": sorted(k for k in new_f if k in old_f and old_f[k][2] != new_f[k][2]),
+            "files_removed": sorted(k for k in old_f if k not in new_f),
+        }
+
+    def save(self) -> None:
+        for path, payload in (
+            (self.path, {"format": MANIFEST_FORMAT, "packages": self.packages}),
+            (self.cache_path, {"format": MANIFEST_FORMAT, "files": self.files}),
+        ):
+            text = json.dumps(payload, indent=1, sort_keys=True) + "\n"
+            if path.is_file() and path.read_text(encoding="utf-8") == text:
+                continue  # keep the committed manifest untouched when nothing changed
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+
+
+def add_pkg_incremental(manifest: IndexManifest, category_el: ET.Element, name: str, desc: str,
+                        rel_files: list[str], raw_base: str, blobs: "BlobTable | None" = None) -> None:
+    key = f"{category_el.get('name')}/{name}"
+    if key in manifest.packages and rel_files:
+        # Same package name twice in one category: disambiguate by its first file
+        key += f"#{sorted(rel_files)[0]}"
+    url_paths = {rel: blobs.url_path(rel) for rel in rel_files} if blobs else None
+    add_pkg(category_el, name, desc, rel_files, raw_base,
+            time_str=manifest.package_time(key, desc, rel_files, raw_base, url_paths),
+            url_paths=url_paths)
+
+
+# ----------------------------
+# Content-addressed dedupe (_payload mirror + identical blobs)
+# ----------------------------
+
+def mirror_target(rel: str) -> str | None:
+    """Top-level path a mirror file duplicates (None if rel is not inside a mirror tree)."""
+    for m in MIRROR_DIRS:
+        if rel.startswith(m.rstrip("/") + "/"):
+            return rel[len(m.rstrip("/")) + 1:]
+    return None
+
+def compare_mirrors(scan: RepoScan, manifest: IndexManifest) -> dict[str, list]:
+    """Classify every mirror file: identical / diverged (vs. top-level) / mirror_only."""
+    present = set(scan.files)
+    out: dict[str, list] = {"identical": [], "diverged": [], "mirror_only": []}
+    for m in MIRROR_DIRS:
+        for rel in scan.under(m):
+            target = mirror_target(rel)
+            if target not in present:
+                out["mirror_only"].append((rel, target))
+            elif manifest.file_sha(rel) == manifest.file_sha(target):
+                out["identical"].append((rel, target))
+            else:
+                out["diverged"].append((rel, target))
+    return out
+
+class BlobTable:
+    """Install path -> storage path of the blob its <source> URL points to."""
+
+    def __init__(self, manifest: IndexManifest):
+        self.manifest = manifest
+        self.storage: dict[str, str] = {}
+        self.canonical: dict[str, str] = {}
+
+    def add(self, install_rel: str, storage_rel: str | None = None) -> None:
+        self.storage[install_rel] = storage_rel or install_rel
+
+    def finalize(self) -> None:
+        # One storage path per content hash: prefer top-level over mirror files, then shortest path
+        for storage_rel in sorted(set(self.storage.values()),
+                                  key=lambda r: (mirror_target(r) is not None, len(r), r)):
+            self.canonical.setdefault(self.manifest.file_sha(storage_rel), storage_rel)
+
+    def url_path(self, install_rel: str) -> str:
+        storage_rel = self.storage.get(install_rel, install_rel)
+        if not DEDUPE_BLOBS:
+            return storage_rel
+        return self.canonical.get(self.manifest.file_sha(storage_rel), storage_rel)
+
+    def stats(self) -> tuple[int, int]:
+        """(published sources, distinct blob URLs)."""
+        return len(self.storage), len({self.url_path(rel) for rel in self.storage})
+
+def is_package_file(path: Path) -> bool:
+    """Does the file carry a ReaPack metaheader (@version) that reapack-index would index?"""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            head = "".join(line for _, line in zip(range(PACKAGE_HEADER_LINES), f))
+    except OSError:
+        return False
+    return bool(PACKAGE_HEADER_RE.search(head))
+
+def check_mirror(repo_root: Path, scan: RepoScan, manifest: IndexManifest) -> int:
+    """Fail if a mirror package file is not an identical copy (it would be lost by --ignore _payload)."""
+    mirrors = compare_mirrors(scan, manifest)
+    problems = [(kind, rel, target) for kind in ("diverged", "mirror_only")
+                for rel, target in mirrors[kind] if is_package_file(repo_root / rel)]
+    packages = sum(1 for rel, _t in mirrors["identical"] if is_package_file(repo_root / rel))
+    print(f"Mirror:   {len(mirrors['identical'])} identical ({packages} package files), "
+          f"{len(mirrors['diverged'])} diverged, {len(mirrors['mirror_only'])} mirror-only")
+    for kind, rel, target in problems:
+        what = "differs from" if kind == "diverged" else "has no top-level copy at"
+        print(f"error: package file {rel} {what} {target}; reapack-index ignores _payload/, "
+              f"so move the change to the top-level file", file=sys.stderr)
+    return 1 if problems else 0
+
+def write_report_if_changed(out: Path, lines: list[str]) -> None:
+    """Write a report unless only its 'Generated: ...' line would change."""
+    def body(text_lines: list[str]) -> list[str]:
+        return [ln for ln in text_lines if not ln.startswith("Generated: ")]
+    if out.is_file():
+        try:
+            if body(out.read_text(encoding="utf-8").split("\n")) == body(lines):
+                return
+        except OSError:
+            pass
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text("\n".join(lines), encoding="utf-8")
+
+def write_dedupe_report(repo_root: Path, mirrors: dict[str, list], blobs: BlobTable) -> None:
+    def size(rel: str) -> int:
+        return blobs.manifest.files[rel][0] if rel in blobs.manifest.files else (repo_root / rel).stat().st_size
+
+    identical_bytes = sum(size(rel) for rel, _t in mirrors["identical"])
+    sources, distinct = blobs.stats()
+    lines = [
+        f"# Mirror dedupe report ({INDEX_NAME})",
+        "",
+        f"Generated: {now_rfc3339_utc()}",
+        "",
+        f"Mirror trees: {', '.join(f'`{m}/`' for m in MIRROR_DIRS)}",
+        "",
+        f"- Identical copies (not published): **{len(mirrors['identical'])}** ({identical_bytes / 1048576:.1f} MB)",
+        f"- Diverged copies (top-level file published): **{len(mirrors['diverged'])}**",
+        f"- Mirror-only files (published from the mirror): **{len(mirrors['mirror_only'])}**",
+        f"- Published sources: **{sources}**, distinct blob URLs: **{distinct}**"
+        + ("" if DEDUPE_BLOBS else " (blob dedupe disabled)")
+        + " (shared URLs are still downloaded once per source)",
+        "",
+    ]
+    if mirrors["diverged"]:
+        lines += ["## Diverged copies", ""]
+        for rel, target in mirrors["diverged"]:
+            lines.append(f"- `{target}` ({size(target)} bytes) vs. `{rel}` ({size(rel)} bytes)")
+        lines.append("")
+    if mirrors["mirror_only"]:
+        lines += ["## Mirror-only files", ""]
+        for rel, target in mirrors["mirror_only"]:
+            lines.append(f"- `{rel}` -> installed as `{target}`")
+        lines.append("")
+    shared: dict[str, list[str]] = {}
+    for install_rel in blobs.storage:
+        url_rel = blobs.url_path(install_rel)
+        if url_rel != install_rel:
+            shared.setdefault(url_rel, []).append(install_rel)
+    if DEDUPE_BLOBS and shared:
+        lines += ["## Shared blobs (several install paths, one source URL)", ""]
+        for url_rel in sorted(shared):
+            lines.append(f"- `{url_rel}`")
+            for install_rel in sorted(shared[url_rel]):
+                lines.append(f"  - `{install_rel}`")
+        lines.append("")
+    write_report_if_changed(repo_root / OUT_DEDUPE_REPORT, lines)
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.write_bytes(data)
+    return True
+
 
 def write_toolbar_targets_report(repo_root: Path, toolbar_rel_paths: list[str]) -> None:
     report_dir = repo_root / OUT_REPORT_DIR
@@ -195,7 +475,8 @@ def write_toolbar_targets_report(repo_root: Path, toolbar_rel_paths: list[str])
             lines.append(f"- `{t}`")
         lines.append("")
     lines.append(f"Total targets found: **{total}**")
-    out.write_text("\n".join(lines), encoding="utf-8")
+    # Keeps the previous file (and its Generated: stamp) if nothing else changed
+    write_report_if_changed(out, lines)
 
 def indent(elem: ET.Element, level: int = 0) -> None:
     # Pretty-print helper for xml.etree
@@ -210,47 +491,92 @@ def indent(elem: ET.Element, level: int = 0) -> None:
     if level and (not elem.tail or not elem.tail.strip()):
         elem.tail = i
 
-def main() -> int:
+def print_summary(manifest: IndexManifest, index_written: bool) -> None:
+    summary = manifest.summary()
+    print(
+        f"Packages: {len(manifest.packages)} total, "
+        f"{len(summary['packages_added'])} added, {len(summary['packages_changed'])} changed, "
+        f"{len(summary['packages_removed'])} removed"
+    )
+    print(
+        f"Files:    {len(manifest.files)} total, "
+        f"{len(summary['files_added'])} added, {len(summary['files_changed'])} changed, "
+        f"{len(summary['files_removed'])} removed ({manifest.hashed} hashed)"
+    )
+    for label in ("packages_added", "packages_changed", "packages_removed"):
+        for key in summary[label][:20]:
+            print(f"  {label.split('_')[1]:8s} {key}")
+    if not index_written:
+        print("index.xml unchanged")
+
+
+def main(scan: RepoScan | None = None) -> int:
+    rebuild = "--rebuild" in sys.argv[1:]
     repo_root = Path(__file__).resolve().parent
     # If this file is stored in tools/, repo root is parent
     if (repo_root / ".git").exists() is False and (repo_root.parent / ".git").exists():
         repo_root = repo_root.parent
+    if scan is None:
+        scan = scan_repo(repo_root)
+    scan = scan.tracked_only()
+
+    manifest = IndexManifest.load(repo_root, rebuild=rebuild)
+    if "--check-mirror" in sys.argv[1:]:
+        return check_mirror(repo_root, scan, manifest)
 
     # Build index
     idx = ET.Element("index", attrib={"name": INDEX_NAME})
 
-    # Core category/package
-    cat_core = ET.SubElement(idx, "category", attrib={"name": "DF95/00 Core"})
+    # Mirror trees: only files missing at top level are published (from the mirror)
+    mirrors = compare_mirrors(scan, manifest)
+    core_heads = tuple(d.strip("/") + "/" for d in CORE_INCLUDE_DIRS)
+    icon_heads = tuple(d.strip("/") + "/" for d in ICONS_INCLUDE_DIRS)
+    mirror_only = {target: rel for rel, target in mirrors["mirror_only"]}
+
+    # Collect every published file first, so identical blobs can share one source URL
     core_files: list[str] = []
     for d in CORE_INCLUDE_DIRS:
-        core_files.extend(collect_files_under(repo_root, d))
-    add_pkg(
+        core_files.extend(collect_files_under(scan, d))
+    core_files.extend(t for t in mirror_only if t.startswith(core_heads))
+    icon_files: list[str] = []
+    for d in ICONS_INCLUDE_DIRS:
+        icon_files.extend(collect_files_under(scan, d))
+    icon_files.extend(t for t in mirror_only if t.startswith(icon_heads))
+    # Only create if there are any icon files not already in core (avoid duplicates)
+    icon_only = sorted(set(icon_files) - set(core_files))
+    toolbar_rel_paths = collect_toolbar_files(scan)
+
+    blobs = BlobTable(manifest)
+    for rel in (*core_files, *icon_only, *toolbar_rel_paths):
+        blobs.add(rel, mirror_only.get(rel))
+    blobs.finalize()
+
+    # Core category/package
+    cat_core = ET.SubElement(idx, "category", attrib={"name": "DF95/00 Core"})
+    add_pkg_incremental(
+        manifest,
         cat_core,
         f"{REPO_NAME} – Core (Standalone)",
         "Standalone core: Scripts + framework + resources (install this first).",
         core_files,
         RAW_BASE,
+        blobs,
     )
 
     # Icons package (optional but useful) – keep it separate if paths exist
-    icon_files: list[str] = []
-    for d in ICONS_INCLUDE_DIRS:
-        icon_files.extend(collect_files_under(repo_root, d))
-    # Only create if there are any icon files not already in core (avoid duplicates)
-    icon_only = sorted(set(icon_files) - set(core_files))
     if icon_only:
         cat_icons = ET.SubElement(idx, "category", attrib={"name": "DF95/90 Icons"})
-        add_pkg(
+        add_pkg_incremental(
+            manifest,
             cat_icons,
             f"{REPO_NAME} – Icons",
             "Optional: toolbar/icon assets.",
             icon_only,
             RAW_BASE,
+            blobs,
         )
 
     # Toolbar packages: menu files only
-    toolbar_rel_paths = collect_toolbar_files(repo_root)
-
     cat_tb_df95 = ET.SubElement(idx, "category", attrib={"name": "DF95/10 Toolbars"})
     cat_tb_ifls = ET.SubElement(idx, "category", attrib={"name": "IFLS/10 Toolbars"})
 
@@ -261,12 +587,14 @@ def main() -> int:
         upper = rel.upper()
         cat = cat_tb_ifls if ("IFLS" in upper) else cat_tb_df95
 
-        add_pkg(
+        add_pkg_incremental(
+            manifest,
             cat,
             pkg_name,
             "Toolbar/MenuSet only (requires Core installed first). Import via REAPER: Options → Customize menus/toolbars → Import.",
             [rel],
             RAW_BASE,
+            blobs,
         )
 
     # Write audit report of script targets in toolbars (optional)
@@ -274,12 +602,27 @@ def main() -> int:
         write_toolbar_targets_report(repo_root, toolbar_rel_paths)
     except Exception as e:
         print(f"warning: failed to write toolbar targets report: {e}", file=sys.stderr)
+    try:
+        write_dedupe_report(repo_root, mirrors, blobs)
+    except Exception as e:
+        print(f"warning: failed to write mirror dedupe report: {e}", file=sys.stderr)
 
     # Write index.xml
     indent(idx)
     out_path = repo_root / OUT_INDEX
-    ET.ElementTree(idx).write(out_path, encoding="utf-8", xml_declaration=True)
-    print(f"Wrote {out_path}")
+    buf = io.BytesIO()
+    ET.ElementTree(idx).write(buf, encoding="utf-8", xml_declaration=True)
+    index_written = write_if_changed(out_path, buf.getvalue())
+    manifest.save()
+    if index_written:
+        print(f"Wrote {out_path}")
+    print_summary(manifest, index_written)
+    sources, distinct = blobs.stats()
+    print(
+        f"Mirror:   {len(mirrors['identical'])} identical (skipped), {len(mirrors['diverged'])} diverged, "
+        f"{len(mirrors['mirror_only'])} mirror-only; {sources} sources -> {distinct} blob URLs"
+        f" (see {OUT_DEDUPE_REPORT})"
+    )
     return 0
 
 if __name__ == "__main__":
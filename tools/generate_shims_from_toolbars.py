@@ -2,18 +2,14 @@
 import os, re
 from collections import defaultdict
 
+from repo_scan import scan_repo
+
 TOOLBAR_EXTS = (".ReaperMenuSet", ".Toolbar.ReaperMenu", ".ReaperMenu")
 SCRIPT_RE = re.compile(r'^\s*SCRIPT:\s*(.+?)\s*$', re.IGNORECASE)
 
-def iter_toolbar_files(repo_root: str):
-    for base in ("Menus", "MenuSets", "Toolbars"):
-        d = os.path.join(repo_root, base)
-        if not os.path.isdir(d):
-            continue
-        for dp, _, fns in os.walk(d):
-            for fn in fns:
-                if fn.endswith(TOOLBAR_EXTS):
-                    yield os.path.join(dp, fn)
+def iter_toolbar_files(repo_root: str, scan):
+    for rel in scan.of_kind("toolbar", under=("Menus", "MenuSets", "Toolbars")):
+        yield os.path.join(repo_root, rel)
 
 def parse_script_targets(toolbar_path: str):
     out = []
@@ -32,46 +28,146 @@ def normalize_target(t: str):
         return f"Scripts/IfeelLikeSnow/IFLS/{os.path.basename(t)}"
     return f"Scripts/IfeelLikeSnow/DF95/{os.path.basename(t)}"
 
-def find_candidate_by_basename(repo_root: str, basename: str):
-    scripts_root = os.path.join(repo_root, "Scripts")
-    hits = []
-    for dp, _, fns in os.walk(scripts_root):
-        for fn in fns:
-            if fn == basename:
-                rel = os.path.relpath(os.path.join(dp, fn), repo_root).replace("\\", "/")
-                if rel.startswith("Scripts/IfeelLikeSnow/"):
-                    continue
-                hits.append(rel)
-    return hits
-
-def write_shim(path_abs: str, target_rel: str, candidates: list):
+VERSION_RE = re.compile(r'[_\- ]?v(\d+)(?:[._]\d+)*$', re.IGNORECASE)
+SHIM_ROOT = "Scripts/IfeelLikeSnow/"
+MATCH_SCORE = {"exact": 100, "nocase": 80, "family": 40}
+
+def split_version(stem: str):
+    """'DF95_Foo_V3' -> ('DF95_Foo', 3); no version suffix -> (stem, None)."""
+    m = VERSION_RE.search(stem)
+    if not m or m.start() == 0:
+        return stem, None
+    return stem[:m.start()], int(m.group(1))
+
+def name_prefix(base_lower: str, dirs_lower):
+    """'df95' / 'ifls' from the file name, else from the deepest matching folder."""
+    for prefix in ("df95", "ifls"):
+        if base_lower.startswith(prefix):
+            return prefix
+    for d in reversed(dirs_lower):
+        if d in ("df95", "ifls"):
+            return d
+    return ""
+
+class ScriptIndex:
+    """Basename -> paths index over Scripts/ (the shim tree Scripts/IfeelLikeSnow/ is excluded).
+
+    Lookups: exact basename, case-insensitive basename, and "family" (same stem
+    without a _V<n> version suffix, same extension). Candidates are ranked by
+    match type, shared subfolders, DF95/IFLS prefix and version distance.
+    """
+
+    def __init__(self, rels):
+        self.by_name = defaultdict(list)
+        self.by_lower = defaultdict(list)
+        self.by_family = defaultdict(list)
+        for rel in rels:
+            if rel.startswith(SHIM_ROOT):
+                continue
+            base = rel.rsplit("/", 1)[-1]
+            self.by_name[base].append(rel)
+            self.by_lower[base.lower()].append(rel)
+            stem, ext = os.path.splitext(base.lower())
+            self.by_family[(split_version(stem)[0], ext)].append(rel)
+
+    @classmethod
+    def from_scan(cls, scan):
+        return cls(scan.under("Scripts"))
+
+    def candidates(self, target_rel: str):
+        """Ranked [(rel, match, score), ...] for a normalized target path."""
+        base = target_rel.rsplit("/", 1)[-1]
+        base_l = base.lower()
+        stem, ext = os.path.splitext(base_l)
+        family, version = split_version(stem)
+
+        found = {}
+        for rel in self.by_family.get((family, ext), ()):
+            found[rel] = "family"
+        for rel in self.by_lower.get(base_l, ()):
+            found[rel] = "nocase"
+        for rel in self.by_name.get(base, ()):
+            found[rel] = "exact"
+
+        tail = target_rel[len(SHIM_ROOT):] if target_rel.startswith(SHIM_ROOT) else target_rel
+        target_dir_list = [d.lower() for d in tail.split("/")[:-1]]
+        target_dirs = set(target_dir_list)
+        prefix = name_prefix(base_l, target_dir_list)
+
+        ranked = []
+        for rel, match in found.items():
+            parts = rel.split("/")
+            cand_dir_list = [d.lower() for d in parts[1:-1]]
+            cand_dirs = set(cand_dir_list)
+            cand_base = parts[-1].lower()
+            score = MATCH_SCORE[match]
+            # Same subfolder family (e.g. .../DF95/Design/)
+            score += 10 * len(target_dirs & cand_dirs)
+            if rel.lower().endswith("/" + tail.lower()):
+                score += 25
+            cand_prefix = name_prefix(cand_base, cand_dir_list)
+            if prefix and cand_prefix:
+                score += 15 if prefix == cand_prefix else -15
+            cand_version = split_version(os.path.splitext(cand_base)[0])[1]
+            if version is not None and cand_version is not None:
+                score += 20 - min(20, 5 * abs(version - cand_version))
+            elif version is None and cand_version is not None:
+                # Unversioned target: prefer the newest variant
+                score += min(cand_version, 10)
+            ranked.append((rel, match, score))
+        ranked.sort(key=lambda c: (-c[2], len(c[0]), c[0]))
+        return ranked
+
+    @staticmethod
+    def resolve(target_rel: str, ranked):
+        """Unique real script for a target, or None.
+
+        Resolved if exactly one exact-basename hit exists (else exactly one
+        case-insensitive hit); among several, the single one that mirrors the
+        target's subpath below Scripts/IfeelLikeSnow/ wins. Family matches never
+        resolve automatically.
+        """
+        tail = "/" + (target_rel[len(SHIM_ROOT):] if target_rel.startswith(SHIM_ROOT) else target_rel).lower()
+        for match in ("exact", "nocase"):
+            hits = [rel for rel, m, _score in ranked if m == match]
+            if len(hits) == 1:
+                return hits[0]
+            if hits:
+                mirrored = [rel for rel in hits if rel.lower().endswith(tail)]
+                return mirrored[0] if len(mirrored) == 1 else None
+        return None
+
+def write_shim(path_abs: str, target_rel: str, candidates: list, resolved=None):
     os.makedirs(os.path.dirname(path_abs), exist_ok=True)
-    if len(candidates) == 1:
-        real = candidates[0]
+    if resolved:
+        real = resolved
         code = f'''-- Auto-generated shim for toolbar compatibility
 -- Toolbar target: "{target_rel}"
-local real = reaper.GetResourcePath() .. "/Scripts/{real}"
+local real = reaper.GetResourcePath() .. "/{real}"
 dofile(real)
 '''
     else:
-        cand_lines = "\n".join([f"  - {c}" for c in candidates]) if candidates else "  (no candidates found)"
+        # Ranked best-first; every line stays a Lua comment
+        cand_lines = "\n".join([f"--  - {c}" for c in candidates]) if candidates else "--  (no candidates found)"
         code = f'''-- Auto-generated shim for toolbar compatibility
 -- Toolbar target: "{target_rel}"
 -- Could not uniquely resolve to a real script in this repo.
 -- Candidates:
---{cand_lines}
-reaper.ShowMessageBox("DF95 Toolbar Suite: Missing or ambiguous script target:\n{target_rel}\n\nSee Reports/unresolved_script_targets.md", "DF95 Toolbar Suite", 0)
+{cand_lines}
+reaper.ShowMessageBox("DF95 Toolbar Suite: Missing or ambiguous script target:\\n{target_rel}\\n\\nSee Reports/unresolved_script_targets.md", "DF95 Toolbar Suite", 0)
 '''
     with open(path_abs, "w", encoding="utf-8") as f:
         f.write(code)
 
-def main():
+def main(scan=None):
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    scan = scan or scan_repo(repo_root)
+    index = ScriptIndex.from_scan(scan)
     unresolved = []
     created = 0
     seen = set()
 
-    for tb in iter_toolbar_files(repo_root):
+    for tb in iter_toolbar_files(repo_root, scan):
         for raw in parse_script_targets(tb):
             norm = normalize_target(raw)
             if norm in seen:
@@ -82,12 +178,12 @@ def main():
             if os.path.exists(abs_path):
                 continue
 
-            basename = os.path.basename(norm)
-            candidates = find_candidate_by_basename(repo_root, basename)
-            write_shim(abs_path, norm, candidates)
+            ranked = index.candidates(norm)
+            resolved = index.resolve(norm, ranked)
+            write_shim(abs_path, norm, [rel for rel, _m, _s in ranked], resolved)
             created += 1
-            if len(candidates) != 1:
-                unresolved.append((norm, tb, candidates))
+            if not resolved:
+                unresolved.append((norm, tb, ranked))
 
     reports_dir = os.path.join(repo_root, "Reports")
     os.makedirs(reports_dir, exist_ok=True)
@@ -99,9 +195,9 @@ def main():
             f.write(f"## {target}\n")
             tb_rel = os.path.relpath(tb, repo_root).replace('\\\\','/')
             f.write(f"- Referenced in: `{tb_rel}`\n")
-            f.write(f"- Candidates found: {len(cands)}\n")
-            for c in cands[:30]:
-                f.write(f"  - `{c}`\n")
+            f.write(f"- Candidates found: {len(cands)} (ranked)\n")
+            for c, match, score in cands[:30]:
+                f.write(f"  - `{c}` ({match}, score {score})\n")
             if len(cands) > 30:
                 f.write(f"  - ... ({len(cands)-30} more)\n")
             f.write("\n")
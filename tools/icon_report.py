@@ -1,45 +1,197 @@
 #!/usr/bin/env python3
-import os, re
+"""
+icon_report.py - toolbar icon pipeline
+
+- Placeholder icons for ICON: references that have no file in Data/toolbar_icons
+  (rendered once per run, then written as bytes).
+- Content hashing of all raster icons under Icons/, Data/toolbar_icons and
+  DF95_MetaCore/UI/Icons: byte-identical and pixel-identical duplicates are
+  reported (Reports/icon_resolution_report.md). Hashes are cached in
+  Reports/.icon_hash_cache.json by size+mtime.
+- Packed sprite atlas of the unique icons plus a JSON coordinate map next to
+  Data/DF95/DF95_IconMap_v156.json (DF95_IconAtlas_v156.png / .json). Every icon
+  path (duplicates included) maps to its rectangle in the atlas. Both files are
+  only rewritten when their content changes.
+
+Usage: python tools/icon_report.py [--no-atlas]
+"""
+import os, re, io, sys, json, hashlib
+from functools import lru_cache
 from PIL import Image, ImageDraw
 
-ICON_RE = re.compile(r'^\s*ICON:\s*(.+?)\s*$', re.IGNORECASE)
+from repo_scan import scan_repo
+
+ICON_RE = re.compile(r'^\s*ICON:\s*(.+?)\s*$', re.IGNORECASE | re.MULTILINE)
 TOOLBAR_EXTS = (".ReaperMenuSet", ".Toolbar.ReaperMenu", ".ReaperMenu")
 
-def iter_toolbar_files(repo_root: str):
-    for base in ("Menus","MenuSets","Toolbars"):
-        d=os.path.join(repo_root, base)
-        if not os.path.isdir(d):
-            continue
-        for dp,_,fns in os.walk(d):
-            for fn in fns:
-                if fn.endswith(TOOLBAR_EXTS):
-                    yield os.path.join(dp, fn)
+ICON_DIRS = ("Icons", "Data/toolbar_icons", "DF95_MetaCore/UI/Icons")
+ATLAS_PNG = "Data/DF95/DF95_IconAtlas_v156.png"
+ATLAS_MAP = "Data/DF95/DF95_IconAtlas_v156.json"
+HASH_CACHE = "Reports/.icon_hash_cache.json"
+ATLAS_MAX_WIDTH = 1024
+ATLAS_MAX_ICON = 128   # larger images (preview sheets) stay out of the atlas
+ATLAS_PADDING = 1
+
+def iter_toolbar_files(repo_root: str, scan):
+    for rel in scan.of_kind("toolbar", under=("Menus","MenuSets","Toolbars")):
+        yield os.path.join(repo_root, rel)
 
 def parse_icons(path: str):
-    icons=[]
     with open(path,"r",encoding="utf-8",errors="ignore") as f:
-        for line in f:
-            m=ICON_RE.match(line)
-            if m:
-                icons.append(m.group(1).strip())
-    return icons
+        return [m.group(1).strip() for m in ICON_RE.finditer(f.read())]
 
-def make_placeholder(path: str):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+@lru_cache(maxsize=None)
+def placeholder_png() -> bytes:
     img=Image.new("RGBA",(64,64),(0,0,0,0))
     d=ImageDraw.Draw(img)
     d.rectangle([1,1,62,62], outline=(255,255,255,255))
     d.text((8,24), "ICON", fill=(255,255,255,255))
-    img.save(path)
+    buf=io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+def make_placeholder(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path,"wb") as f:
+        f.write(placeholder_png())
+
+# ----------------------------
+# Hashing / duplicates
+# ----------------------------
+
+def load_hash_cache(repo_root: str) -> dict:
+    try:
+        with open(os.path.join(repo_root, HASH_CACHE), "r", encoding="utf-8") as f:
+            data=json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_json(path: str, payload) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp=path+".tmp"
+    with open(tmp,"w",encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
 
-def main():
+def hash_icon(repo_root: str, rel: str, cache: dict):
+    """[size, mtime_ns, byte_sha1, pixel_sha1, w, h] (pixel_sha1 "" if PIL cannot decode it)."""
+    abs_p=os.path.join(repo_root, rel)
+    st=os.stat(abs_p)
+    old=cache.get(rel)
+    if old and old[0]==st.st_size and old[1]==st.st_mtime_ns:
+        return old
+    with open(abs_p,"rb") as f:
+        data=f.read()
+    pixel_sha, w, h = "", 0, 0
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            rgba=im.convert("RGBA")
+            w, h = rgba.size
+            pixel_sha=hashlib.sha1(f"{w}x{h}:".encode()+rgba.tobytes()).hexdigest()
+    except Exception:
+        pass
+    return [st.st_size, st.st_mtime_ns, hashlib.sha1(data).hexdigest(), pixel_sha, w, h]
+
+def canonical_key(rel: str):
+    # Prefer the REAPER toolbar icon location, then the shortest path
+    return (not rel.startswith("Data/toolbar_icons/"), len(rel), rel)
+
+def find_duplicates(hashes: dict):
+    """Groups of identical icons: [{"canonical", "copies", "identical", "bytes_saved"}]."""
+    by_pixels={}
+    for rel, h in hashes.items():
+        by_pixels.setdefault(h[3] or "bytes:"+h[2], []).append(rel)
+    groups=[]
+    for rels in by_pixels.values():
+        if len(rels)<2:
+            continue
+        rels=sorted(rels, key=canonical_key)
+        same_bytes=len({hashes[r][2] for r in rels})==1
+        groups.append({
+            "canonical": rels[0],
+            "copies": rels[1:],
+            "identical": "bytes" if same_bytes else "pixels",
+            "bytes_saved": sum(hashes[r][0] for r in rels[1:]),
+        })
+    groups.sort(key=lambda g: (-g["bytes_saved"], g["canonical"]))
+    return groups
+
+# ----------------------------
+# Atlas
+# ----------------------------
+
+def pack_shelves(sizes: dict, max_width: int = ATLAS_MAX_WIDTH, pad: int = ATLAS_PADDING):
+    """Simple shelf packer: {key: (w,h)} -> ({key: (x,y)}, atlas_w, atlas_h), tallest first."""
+    order=sorted(sizes, key=lambda k: (-sizes[k][1], -sizes[k][0], k))
+    pos={}
+    x=y=shelf_h=atlas_w=0
+    for k in order:
+        w, h = sizes[k]
+        if x and x+w > max_width:
+            x, y, shelf_h = 0, y+shelf_h+pad, 0
+        pos[k]=(x, y)
+        x+=w+pad
+        shelf_h=max(shelf_h, h)
+        atlas_w=max(atlas_w, x-pad)
+    return pos, atlas_w, y+shelf_h
+
+def write_if_changed(path: str, data: bytes) -> bool:
+    try:
+        with open(path,"rb") as f:
+            if f.read()==data:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path,"wb") as f:
+        f.write(data)
+    return True
+
+def build_atlas(repo_root: str, hashes: dict):
+    """Atlas PNG bytes + coordinate map for all decodable icons up to ATLAS_MAX_ICON."""
+    members={}
+    for rel, h in hashes.items():
+        if h[3] and 0 < max(h[4], h[5]) <= ATLAS_MAX_ICON:
+            members.setdefault(h[3], []).append(rel)
+    if not members:
+        return None, None
+    reps={px: sorted(rels, key=canonical_key)[0] for px, rels in members.items()}
+    pos, aw, ah = pack_shelves({px: (hashes[rep][4], hashes[rep][5]) for px, rep in reps.items()})
+
+    atlas=Image.new("RGBA",(aw, ah),(0,0,0,0))
+    for px, rep in reps.items():
+        with Image.open(os.path.join(repo_root, rep)) as im:
+            atlas.paste(im.convert("RGBA"), pos[px])
+    buf=io.BytesIO()
+    atlas.save(buf, format="PNG", optimize=True)
+
+    icons={}
+    for px, rels in members.items():
+        x, y = pos[px]
+        w, h = hashes[reps[px]][4], hashes[reps[px]][5]
+        for rel in rels:
+            icons[rel]={"x": x, "y": y, "w": w, "h": h}
+    atlas_map={
+        "atlas": os.path.basename(ATLAS_PNG),
+        "size": [aw, ah],
+        "padding": ATLAS_PADDING,
+        "unique": len(reps),
+        "icons": icons,
+    }
+    return buf.getvalue(), atlas_map
+
+def main(scan=None):
     repo_root=os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    scan=scan or scan_repo(repo_root)
+    with_atlas="--no-atlas" not in sys.argv[1:]
     icon_dir=os.path.join(repo_root,"Data","toolbar_icons")
     os.makedirs(icon_dir, exist_ok=True)
 
     missing=set()
     refs=[]
-    for tb in iter_toolbar_files(repo_root):
+    for tb in iter_toolbar_files(repo_root, scan):
         for ic in parse_icons(tb):
             if not ic.lower().endswith((".png",".ico",".bmp",".jpg",".jpeg")):
                 continue
@@ -52,6 +204,23 @@ def main():
     for fname in sorted(missing):
         make_placeholder(os.path.join(icon_dir,fname))
 
+    # Hash every raster icon (incl. the placeholders just written)
+    icon_rels=set(scan.of_kind("icon", under=ICON_DIRS))
+    icon_rels.update(f"Data/toolbar_icons/{fname}" for fname in missing)
+    cache=load_hash_cache(repo_root)
+    hashes={rel: hash_icon(repo_root, rel, cache) for rel in sorted(icon_rels)}
+    save_json(os.path.join(repo_root, HASH_CACHE), hashes)
+    dups=find_duplicates(hashes)
+
+    atlas_written=False
+    atlas_map=None
+    if with_atlas:
+        png, atlas_map = build_atlas(repo_root, hashes)
+        if png is not None:
+            atlas_written=write_if_changed(os.path.join(repo_root, ATLAS_PNG), png)
+            map_bytes=(json.dumps(atlas_map, indent=2, sort_keys=True)+"\n").encode("utf-8")
+            atlas_written=write_if_changed(os.path.join(repo_root, ATLAS_MAP), map_bytes) or atlas_written
+
     reports=os.path.join(repo_root,"Reports")
     os.makedirs(reports, exist_ok=True)
     rpt=os.path.join(reports,"icon_resolution_report.md")
@@ -60,11 +229,27 @@ def main():
         f.write(f"Placeholder icons created in `Data/toolbar_icons/`: **{len(missing)}**\n\n")
         for fname in sorted(missing):
             f.write(f"- `{fname}`\n")
+        f.write("\n## Duplicate icons\n\n")
+        redundant=sum(len(g["copies"]) for g in dups)
+        saved=sum(g["bytes_saved"] for g in dups)
+        f.write(f"Icons hashed: **{len(hashes)}**, duplicate groups: **{len(dups)}** "
+                f"({redundant} redundant files, {saved/1024:.1f} KB)\n\n")
+        for g in dups:
+            f.write(f"- `{g['canonical']}` ({g['identical']}-identical)\n")
+            for c in g["copies"]:
+                f.write(f"  - `{c}`\n")
+        if atlas_map:
+            f.write(f"\n## Atlas\n\n`{ATLAS_PNG}` ({atlas_map['size'][0]}x{atlas_map['size'][1]}, "
+                    f"{atlas_map['unique']} unique icons), map: `{ATLAS_MAP}`\n")
         f.write("\n## References (toolbar -> icon)\n\n")
         for tb, fname in refs:
             f.write(f"- `{tb}` -> `{fname}`\n")
 
     print(f"Placeholders created: {len(missing)}")
+    print(f"Icons hashed: {len(hashes)}, duplicate groups: {len(dups)}")
+    if atlas_map:
+        print(f"Atlas: {atlas_map['unique']} unique icons, {atlas_map['size'][0]}x{atlas_map['size'][1]}"
+              f"{' (written)' if atlas_written else ' (unchanged)'}")
     return 0
 
 if __name__=="__main__":
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DF95 Toolbar Suite - shared repository scanner for tools/
+
+One os.scandir pass over the repo (skipping .git, __pycache__ and the AIWorker runtime
+data dirs); every file is classified by kind:
+
+  toolbar  .ReaperMenuSet / .Toolbar.ReaperMenu / .ReaperMenu (case-insensitive)
+  script   .lua / .eel / .py
+  icon     .png / .ico / .bmp / .jpg / .jpeg
+  jsfx     .jsfx
+  text     .txt / .md / .ini / .cfg / .conf / .rpp, README
+  other    everything else
+
+Directory listings are cached in Reports/.repo_scan_cache.json keyed on the
+directory's mtime: a directory whose mtime is unchanged is not listed again
+(adding, removing or renaming an entry bumps the mtime of its parent). File
+contents are not cached - tools that need sizes/mtimes stat the files they use.
+
+Git-ignored files are dropped from the result (one `git ls-files` call, which also
+tells tracked from untracked files: scan.tracked_only() is what a clean clone sees).
+Without git (or outside a work tree) only the skip lists above apply.
+
+Usage (from other tools):
+  from repo_scan import scan_repo
+  scan = scan_repo()
+  scan.under("Scripts", "Data")      # sorted rel posix paths
+  scan.of_kind("toolbar", under=("Menus", "MenuSets", "Toolbars"))
+
+Usage (stand-alone): python tools/repo_scan.py [--no-cache]   (prints counts per kind)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = "Reports/.repo_scan_cache.json"
+CACHE_FORMAT = 2
+SKIP_DIRS = {".git", "__pycache__"}
+# Runtime data that is git-ignored anyway (fallback when git is not available)
+SKIP_PATHS = {"Support/DF95_AIWorker/Cache", "Support/DF95_AIWorker/bench/results"}
+
+# Directory mtimes younger than this are not trusted (same-tick modifications)
+RACY_SEC = 2.0
+
+TOOLBAR_SUFFIXES = (".reapermenuset", ".reapermenusets", ".reapermenu")
+SCRIPT_EXTS = {".lua", ".eel", ".py"}
+ICON_EXTS = {".png", ".ico", ".bmp", ".jpg", ".jpeg"}
+TEXT_EXTS = {".txt", ".md", ".ini", ".cfg", ".conf", ".rpp"}
+TEXT_NAMES = {"readme", "readme.txt"}
+
+KINDS = ("toolbar", "script", "icon", "jsfx", "text", "other")
+
+
+def classify(name: str) -> str:
+    lower = name.lower()
+    if lower.endswith(TOOLBAR_SUFFIXES):
+        return "toolbar"
+    ext = os.path.splitext(lower)[1]
+    if ext in SCRIPT_EXTS:
+        return "script"
+    if ext in ICON_EXTS:
+        return "icon"
+    if ext == ".jsfx":
+        return "jsfx"
+    if ext in TEXT_EXTS or lower in TEXT_NAMES:
+        return "text"
+    return "other"
+
+
+class RepoScan:
+    """Result of one walk: sorted rel posix paths, their kinds and the directory table."""
+
+    def __init__(self, root: Path, dirs: dict[str, dict], stats: dict[str, int] | None = None,
+                 git: tuple[set[str], set[str]] | None = None):
+        self.root = root
+        self.dirs = dirs
+        self.stats = stats or {}
+        files: list[str] = []
+        for rel_dir, entry in dirs.items():
+            prefix = f"{rel_dir}/" if rel_dir else ""
+            files.extend(prefix + name for name in entry["files"])
+        # git: (tracked, untracked-but-not-ignored); None = no git information
+        self.git = git
+        if git is not None:
+            tracked, untracked = git
+            files = [rel for rel in files if rel in tracked or rel in untracked]
+            self.stats["git_ignored"] = sum(len(e["files"]) for e in dirs.values()) - len(files)
+        self.files = sorted(files)
+        self.kinds = {rel: classify(rel.rsplit("/", 1)[-1]) for rel in self.files}
+
+    def abs(self, rel: str) -> Path:
+        return self.root / rel
+
+    def under(self, *prefixes: str) -> list[str]:
+        """Files below any of the given repo-relative directories (all files without prefixes)."""
+        if not prefixes:
+            return list(self.files)
+        heads = tuple(p.strip("/") + "/" for p in prefixes)
+        return [rel for rel in self.files if rel.startswith(heads)]
+
+    def of_kind(self, kind: str, under: tuple[str, ...] | list[str] = ()) -> list[str]:
+        return [rel for rel in self.under(*under) if self.kinds[rel] == kind]
+
+    def tracked_only(self) -> "RepoScan":
+        """Same scan restricted to files tracked by git (what a clean clone contains)."""
+        if self.git is None:
+            return self
+        view = RepoScan.__new__(RepoScan)
+        view.__dict__.update(self.__dict__)
+        view.files = [rel for rel in self.files if rel in self.git[0]]
+        view.kinds = {rel: self.kinds[rel] for rel in view.files}
+        return view
+
+    def refresh(self) -> "RepoScan":
+        """Re-validate against the file system; only directories whose mtime changed are listed again."""
+        return _walk(self.root, self.dirs)
+
+    def save_cache(self) -> None:
+        path = self.root / CACHE_PATH
+        now = time.time()
+        dirs = {
+            rel: entry if now - entry["mtime_ns"] / 1e9 > RACY_SEC else {**entry, "mtime_ns": -1}
+            for rel, entry in self.dirs.items()
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(json.dumps({"format": CACHE_FORMAT, "dirs": dirs}, separators=(",", ":")),
+                           encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"warning: could not write scan cache: {e}", file=sys.stderr)
+
+
+def _list_dir(abs_dir: str) -> tuple[list[str], list[str]]:
+    files: list[str] = []
+    subdirs: list[str] = []
+    with os.scandir(abs_dir) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        subdirs.append(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+            except OSError:
+                continue
+    return sorted(files), sorted(subdirs)
+
+
+def _git_files(root: Path) -> tuple[set[str], set[str]] | None:
+    """(tracked, untracked-not-ignored) rel posix paths, or None without a usable git."""
+    try:
+        out = subprocess.run(
+            ["git", "-C", str(root), "ls-files", "-z", "-t", "--cached", "--others", "--exclude-standard"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    tracked: set[str] = set()
+    untracked: set[str] = set()
+    for item in out.decode("utf-8", errors="surrogateescape").split("\0"):
+        if len(item) < 3:
+            continue
+        # "? " = untracked, any other tag (H, S, M, R, C, K) = in the index
+        (untracked if item[0] == "?" else tracked).add(item[2:])
+    return tracked, untracked
+
+
+def _walk(root: Path, cached: dict[str, dict]) -> RepoScan:
+    dirs: dict[str, dict] = {}
+    listed = 0
+    reused = 0
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        abs_dir = os.path.join(root, rel) if rel else str(root)
+        try:
+            mtime_ns = os.stat(abs_dir).st_mtime_ns
+        except OSError:
+            continue
+        old = cached.get(rel)
+        if old and old.get("mtime_ns") == mtime_ns:
+            entry = old
+            reused += 1
+        else:
+            try:
+                files, subdirs = _list_dir(abs_dir)
+            except OSError:
+                continue
+            entry = {"mtime_ns": mtime_ns, "files": files, "dirs": subdirs}
+            listed += 1
+        dirs[rel] = entry
+        stack.extend(sub for sub in (f"{rel}/{d}" if rel else d for d in entry["dirs"]) if sub not in SKIP_PATHS)
+    return RepoScan(root, dirs, {"dirs_listed": listed, "dirs_reused": reused}, git=_git_files(root))
+
+
+def _load_cache(root: Path) -> dict[str, dict]:
+    try:
+        data = json.loads((root / CACHE_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != CACHE_FORMAT:
+        return {}
+    return data.get("dirs") or {}
+
+
+def scan_repo(root: Path | str | None = None, use_cache: bool = True) -> RepoScan:
+    """Walk the repo once (reusing cached directory listings) and return the classified file list."""
+    root = Path(root).resolve() if root else REPO_ROOT
+    scan = _walk(root, _load_cache(root) if use_cache else {})
+    if use_cache:
+        scan.save_cache()
+    return scan
+
+
+def main() -> int:
+    use_cache = "--no-cache" not in sys.argv[1:]
+    t0 = time.perf_counter()
+    scan = scan_repo(use_cache=use_cache)
+    dt = time.perf_counter() - t0
+    counts = {k: 0 for k in KINDS}
+    for kind in scan.kinds.values():
+        counts[kind] += 1
+    print(f"Scanned {len(scan.files)} files in {len(scan.dirs)} dirs in {dt * 1000:.0f} ms "
+          f"({scan.stats['dirs_listed']} listed, {scan.stats['dirs_reused']} from cache"
+          + (f", {scan.stats['git_ignored']} git-ignored skipped)" if "git_ignored" in scan.stats else ", no git)"))
+    for kind in KINDS:
+        print(f"  {kind:8s} {counts[kind]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DF95 Toolbar Suite - run all tools/ maintenance steps off one repository scan
+
+Order:
+  1) sanitize_metaheaders        (rewrites file contents only)
+  2) generate_shims_from_toolbars (may create shim scripts)
+  3) icon_report                 (may create placeholder icons; needs Pillow)
+  4) build_index_from_toolbars   (writes index.xml)
+
+The repo is walked once (tools/repo_scan.py). After steps that can create files
+the scan is refreshed, which only re-lists directories whose mtime changed.
+
+Usage (from repo root):
+  python tools/run_all.py [--rebuild] [--skip sanitize,shims,icons,index]
+
+--rebuild is passed through to the index builder.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+from repo_scan import scan_repo
+
+STEPS = ("sanitize", "shims", "icons", "index")
+
+
+def _load_step(name: str):
+    if name == "sanitize":
+        import sanitize_metaheaders as mod
+    elif name == "shims":
+        import generate_shims_from_toolbars as mod
+    elif name == "icons":
+        import icon_report as mod
+    else:
+        import build_index_from_toolbars as mod
+    return mod
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    skip: set[str] = set()
+    if "--skip" in args:
+        i = args.index("--skip")
+        skip = {s.strip() for s in args[i + 1].split(",") if s.strip()}
+
+    t0 = time.perf_counter()
+    scan = scan_repo()
+    print(f"[scan] {len(scan.files)} files ({scan.stats['dirs_listed']} dirs listed, "
+          f"{scan.stats['dirs_reused']} from cache) in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    rc = 0
+    for name in STEPS:
+        if name in skip:
+            continue
+        try:
+            mod = _load_step(name)
+        except ImportError as e:
+            print(f"[{name}] skipped: {e}", file=sys.stderr)
+            continue
+        print(f"[{name}]")
+        t0 = time.perf_counter()
+        rc = max(rc, mod.main(scan) or 0)
+        print(f"[{name}] done in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        if name in ("shims", "icons"):
+            scan = scan.refresh()
+
+    scan.save_cache()
+    return rc
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -14,17 +14,55 @@ What it does:
    right after @description. (Strict mode requires version.)
 
 It never touches package files under DF95/ (your actual ReaPack packages).
+
+Incremental / parallel:
+- Only text/jsfx/lua files from the shared repo scan are candidates (no binary assets).
+- Reports/sanitize_manifest.json remembers clean files (size, mtime, sha1 of the checked head);
+  a file is skipped if its size+mtime match, or if they changed but the head hash did not.
+  The manifest and the per-run summary are local (git-ignored); a fresh clone rechecks everything.
+- Candidates are checked in a thread pool that reads only the first lines each rule needs;
+  a file is read completely only when it has to be rewritten.
+
+Usage:
+  python tools/sanitize_metaheaders.py [--dry-run] [--full] [--jobs N] [--summary PATH]
+
+  --dry-run   print a unified diff of all pending changes instead of writing
+  --full      ignore the manifest (check every candidate)
+  --summary   JSON summary path (default: Reports/sanitize_summary.json)
 """
 
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import difflib
+import hashlib
+import json
+import os
 import re
 import sys
 
+from repo_scan import scan_repo
+
 ROOT = Path(__file__).resolve().parents[1]
 
 TEXT_EXTS = {".txt",".md",".ini",".cfg",".conf",".rpp",".reapack-index.conf"}
 ESCAPE_MAX_LINES = 120
+LUA_HEAD_LINES = 200
+
+MANIFEST_PATH = "Reports/sanitize_manifest.json"
+SUMMARY_PATH = "Reports/sanitize_summary.json"
+MANIFEST_FORMAT = 1
+
+AT_RE = re.compile(r"^\s*@")
+DESC_RE = re.compile(r"^\s*--\s*@description\b")
+DESC_HEAD_RE = re.compile(r"^\s*--\s*@description\b", flags=re.M)
+VER_HEAD_RE = re.compile(r"^\s*--\s*@version\b", flags=re.M)
+
+JSFX_HEADER = [
+    "// JSFX asset (DF95/IFLS)",
+    "// Prefixed comment prevents reapack-index/metaheader strict validation from mis-parsing JSFX sections.",
+    ""
+]
 
 def first_nonempty_idx(lines):
     for i,l in enumerate(lines):
@@ -35,72 +73,183 @@ def first_nonempty_idx(lines):
 def escape_at_lines(lines, max_lines=ESCAPE_MAX_LINES):
     changed = False
     for i in range(min(len(lines), max_lines)):
-        if re.match(r"^\s*@", lines[i]):
+        if AT_RE.match(lines[i]):
             lines[i] = re.sub(r"^(\s*)@", r"\1[@]", lines[i])
             changed = True
     return changed, lines
 
-def main() -> int:
-    changed_files = 0
-    injected_versions = 0
-    escaped_text = 0
-    jsfx_patched = 0
+def rule_for(rel: str) -> str | None:
+    p = Path(rel)
+    suf = p.suffix.lower()
+    if suf in TEXT_EXTS or p.name.lower() in {"readme","readme.txt"}:
+        return "text"
+    if suf == ".jsfx":
+        return "jsfx"
+    if suf == ".lua":
+        return "lua"
+    return None
 
-    for p in ROOT.rglob("*"):
-        if not p.is_file():
-            continue
-        rel = p.relative_to(ROOT).as_posix()
+def read_head(path: Path, rule: str) -> bytes:
+    """Only the lines a rule looks at (complete lines, so no multi-byte char is cut)."""
+    out = []
+    with open(path, "rb") as f:
+        if rule == "jsfx":
+            # up to and including the first non-empty line
+            for raw in f:
+                out.append(raw)
+                if raw.strip():
+                    break
+        else:
+            limit = ESCAPE_MAX_LINES if rule == "text" else LUA_HEAD_LINES
+            for raw in f:
+                out.append(raw)
+                if len(out) >= limit:
+                    break
+    return b"".join(out)
+
+def head_needs_change(rule: str, head: str) -> bool:
+    lines = head.splitlines()
+    if rule == "text":
+        return any(AT_RE.match(l) for l in lines[:ESCAPE_MAX_LINES])
+    if rule == "jsfx":
+        idx = first_nonempty_idx(lines)
+        return idx is not None and bool(AT_RE.match(lines[idx]))
+    head = "\n".join(lines[:LUA_HEAD_LINES])
+    return bool(DESC_HEAD_RE.search(head)) and not VER_HEAD_RE.search(head)
+
+def rewrite(rule: str, txt: str) -> str | None:
+    """Full-file transformation (same output as the original in-place rewrite), None if unchanged."""
+    lines = txt.splitlines()
+    tail = "\n" if txt.endswith("\n") else "\n"
+    if rule == "text":
+        ch, new_lines = escape_at_lines(lines)
+        return "\n".join(new_lines) + tail if ch else None
+    if rule == "jsfx":
+        idx = first_nonempty_idx(lines)
+        if idx is not None and AT_RE.match(lines[idx]):
+            return "\n".join(JSFX_HEADER + lines) + tail
+        return None
+    head = "\n".join(lines[:LUA_HEAD_LINES])
+    if DESC_HEAD_RE.search(head) and not VER_HEAD_RE.search(head):
+        for i in range(min(len(lines), LUA_HEAD_LINES)):
+            if DESC_RE.match(lines[i]):
+                lines.insert(i+1, "-- @version 0.0.0")
+                return "\n".join(lines) + tail
+    return None
 
+def check_file(rel: str, rule: str, known) -> dict:
+    """Worker: decide whether a candidate needs a rewrite (reads the head, the full file only if needed)."""
+    p = ROOT / rel
+    st = p.stat()
+    if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+        return {"rel": rel, "status": "skipped", "entry": known}
+    head = read_head(p, rule)
+    head_sha = hashlib.sha1(head).hexdigest()
+    entry = [st.st_size, st.st_mtime_ns, head_sha]
+    if known and known[2] == head_sha:
+        return {"rel": rel, "status": "clean", "entry": entry}
+    if not head_needs_change(rule, head.decode("utf-8", errors="replace")):
+        return {"rel": rel, "status": "clean", "entry": entry}
+    txt = p.read_text(encoding="utf-8", errors="replace")
+    new_txt = rewrite(rule, txt)
+    if new_txt is None:
+        return {"rel": rel, "status": "clean", "entry": entry}
+    return {"rel": rel, "status": "change", "rule": rule, "old": txt, "new": new_txt}
+
+def load_manifest(full: bool) -> dict:
+    if full:
+        return {}
+    try:
+        data = json.loads((ROOT / MANIFEST_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != MANIFEST_FORMAT:
+        return {}
+    return data.get("files") or {}
+
+def write_json(rel_path: str, payload: dict) -> Path:
+    path = Path(rel_path) if os.path.isabs(rel_path) else ROOT / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+def main(scan=None) -> int:
+    args = sys.argv[1:]
+    dry_run = "--dry-run" in args
+    full = "--full" in args
+    jobs = 0
+    summary_path = SUMMARY_PATH
+    if "--jobs" in args:
+        jobs = int(args[args.index("--jobs") + 1])
+    if "--summary" in args:
+        summary_path = args[args.index("--summary") + 1]
+
+    scan = scan or scan_repo(ROOT)
+    candidates = []
+    for rel in scan.files:
         # Never touch package files
         if rel.startswith("DF95/"):
             continue
+        if scan.kinds[rel] not in ("text", "jsfx", "script"):
+            continue
+        rule = rule_for(rel)
+        if rule:
+            candidates.append((rel, rule))
+
+    manifest = load_manifest(full)
+    jobs = jobs or min(8, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(lambda c: check_file(c[0], c[1], manifest.get(c[0])), candidates))
+
+    counts = {"text": 0, "jsfx": 0, "lua": 0}
+    changed = []
+    new_manifest = {}
+    skipped = 0
+    for res in results:
+        if res["status"] == "change":
+            counts[res["rule"]] += 1
+            changed.append(res)
+            continue
+        if res["status"] == "skipped":
+            skipped += 1
+        new_manifest[res["rel"]] = res["entry"]
+
+    for res in changed:
+        if dry_run:
+            sys.stdout.writelines(difflib.unified_diff(
+                res["old"].splitlines(keepends=True), res["new"].splitlines(keepends=True),
+                fromfile=f"a/{res['rel']}", tofile=f"b/{res['rel']}",
+            ))
+        else:
+            (ROOT / res["rel"]).write_text(res["new"], encoding="utf-8")
+
+    if not dry_run:
+        # Rewritten files are re-checked (and recorded as clean) on the next run
+        write_json(MANIFEST_PATH, {"format": MANIFEST_FORMAT, "files": new_manifest})
+
+    summary = {
+        "dry_run": dry_run,
+        "candidates": len(candidates),
+        "skipped_unchanged": skipped,
+        "checked": len(candidates) - skipped,
+        "changed_files": len(changed),
+        "escaped_text": counts["text"],
+        "jsfx_patched": counts["jsfx"],
+        "lua_versions_injected": counts["lua"],
+        "files": [{"path": res["rel"], "rule": res["rule"]} for res in changed],
+    }
+    out = write_json(summary_path, summary)
 
-        suf = p.suffix.lower()
-
-        if suf in TEXT_EXTS or p.name.lower() in {"readme","readme.txt"}:
-            txt = p.read_text(encoding="utf-8", errors="replace")
-            lines = txt.splitlines()
-            ch, new_lines = escape_at_lines(lines)
-            if ch:
-                p.write_text("\n".join(new_lines) + ("\n" if txt.endswith("\n") else "\n"), encoding="utf-8")
-                changed_files += 1
-                escaped_text += 1
-
-        elif suf == ".jsfx":
-            txt = p.read_text(encoding="utf-8", errors="replace")
-            lines = txt.splitlines()
-            idx = first_nonempty_idx(lines)
-            if idx is not None and re.match(r"^\s*@", lines[idx]):
-                header = [
-                    "// JSFX asset (DF95/IFLS)",
-                    "// Prefixed comment prevents reapack-index/metaheader strict validation from mis-parsing JSFX sections.",
-                    ""
-                ]
-                p.write_text("\n".join(header + lines) + ("\n" if txt.endswith("\n") else "\n"), encoding="utf-8")
-                changed_files += 1
-                jsfx_patched += 1
-
-        elif suf == ".lua":
-            txt = p.read_text(encoding="utf-8", errors="replace")
-            lines = txt.splitlines()
-            head = "\n".join(lines[:200])
-
-            has_desc = re.search(r"^\s*--\s*@description\b", head, flags=re.M)
-            has_ver = re.search(r"^\s*--\s*@version\b", head, flags=re.M)
-
-            if has_desc and not has_ver:
-                for i in range(min(len(lines), 200)):
-                    if re.match(r"^\s*--\s*@description\b", lines[i]):
-                        lines.insert(i+1, "-- @version 0.0.0")
-                        p.write_text("\n".join(lines) + ("\n" if txt.endswith("\n") else "\n"), encoding="utf-8")
-                        changed_files += 1
-                        injected_versions += 1
-                        break
-
-    print(f"Sanitizer done. Changed files: {changed_files}")
-    print(f" - escaped text metaheaders: {escaped_text}")
-    print(f" - jsfx patched: {jsfx_patched}")
-    print(f" - lua versions injected: {injected_versions}")
+    log = sys.stderr if dry_run else sys.stdout
+    print(f"Sanitizer {'dry run' if dry_run else 'done'}. "
+          f"{'Would change' if dry_run else 'Changed'} files: {len(changed)}", file=log)
+    print(f" - escaped text metaheaders: {counts['text']}", file=log)
+    print(f" - jsfx patched: {counts['jsfx']}", file=log)
+    print(f" - lua versions injected: {counts['lua']}", file=log)
+    print(f" - candidates: {len(candidates)} ({skipped} unchanged since last run)", file=log)
+    print(f" - summary: {out}", file=log)
     return 0
 
 if __name__ == "__main__":